@@ -1,12 +1,47 @@
 from django.contrib import admin
+from django.db.models import Avg, Count, Sum
 
-from .models import AIAnalysis
+from .models import AIAnalysis, AIUsage
 
 # Register your models here.
 @admin.register(AIAnalysis)
 class AIAnalysisAdmin(admin.ModelAdmin):
-    list_display = ['id', 'analysis_type', 'problem', 'submission', 'created_at']
-    search_fields = ['problem__title', 'submission__user__username']
-    list_filter = ['analysis_type', 'created_at']
+    list_display = ['id', 'analysis_type', 'problem', 'submission', 'model_name', 'created_at', 'expires_at']
+    search_fields = ['problem__title', 'submission__user__username', 'prompt_hash']
+    list_filter = ['analysis_type', 'model_name', 'created_at']
     raw_id_fields = ['problem', 'submission']
-    readonly_fields = ['created_at', 'processing_time']
+    readonly_fields = ['created_at', 'processing_time', 'prompt_hash']
+
+
+@admin.register(AIUsage)
+class AIUsageAdmin(admin.ModelAdmin):
+    """Model calls, with their cost per analysis type for the current filters above the list."""
+    change_list_template = 'admin/ai_service/aiusage/change_list.html'
+    list_display = ['id', 'analysis_type', 'model_name', 'user', 'prompt_tokens', 'response_tokens', 'latency', 'cost', 'created_at']
+    list_filter = ['analysis_type', 'model_name', 'created_at']
+    search_fields = ['user__username', 'operation']
+    raw_id_fields = ['user']
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        changelist = getattr(response, 'context_data', {}).get('cl')
+        if changelist is not None:
+            queryset = changelist.queryset.order_by()
+            response.context_data['cost_report'] = queryset.values('analysis_type').annotate(
+                calls=Count('id'),
+                prompt=Sum('prompt_tokens'),
+                response=Sum('response_tokens'),
+                avg_latency=Avg('latency'),
+                total_cost=Sum('cost'),
+            ).order_by('-total_cost')
+            response.context_data['cost_total'] = queryset.aggregate(
+                calls=Count('id'), prompt=Sum('prompt_tokens'), response=Sum('response_tokens'), total_cost=Sum('cost')
+            )
+        return response
@@ -0,0 +1,276 @@
+"""
+Async variants of the AI endpoints under /api/ai/async/.
+
+They are meant to be served by backend/asgi.py, where a request waiting on the
+model holds no worker thread, so a few ASGI processes can keep hundreds of AI
+requests open while the WSGI workers stay free for judging. They are plain
+Django views (DRF has no async views): the JWT is checked by hand, model calls
+go through the async Gemini client (bounded by AI_MAX_CONCURRENCY per process),
+and every request counts against a per-user (or per-IP for anonymous callers)
+quota of AI_USER_QUOTA requests per AI_USER_QUOTA_WINDOW seconds.
+
+The /stream/ variants answer with server-sent events while the model is still
+generating: `delta` events carry raw text, `field` events each top-level field of
+the result once it is complete, and a final `result` (or `error`) event the whole
+response.
+"""
+import json
+import time
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from judge.models import Problem, Submission
+
+from .client import AIBusyError
+from .services import AIAnalysisService
+from .usage import AIBudgetExceeded, count_request
+
+
+class AuthenticationFailed(Exception):
+    pass
+
+
+async def authenticate(request):
+    """The user of a `Bearer` access token, None without one; AuthenticationFailed for a bad token."""
+    header = request.headers.get('Authorization', '').split()
+    if not header:
+        return None
+    if len(header) != 2 or header[0] not in jwt_settings.AUTH_HEADER_TYPES:
+        raise AuthenticationFailed("Authorization header must contain two space-delimited values")
+    try:
+        token = AccessToken(header[1])
+        user_id = token[jwt_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        raise AuthenticationFailed("Given token not valid for any token type")
+    user = await get_user_model().objects.filter(
+        **{jwt_settings.USER_ID_FIELD: user_id}, is_active=True
+    ).afirst()
+    if user is None:
+        raise AuthenticationFailed("User not found")
+    return user
+
+
+async def quota_wait(request, user) -> Optional[int]:
+    """Counts a request against the caller's quota; seconds until it resets when exhausted, else None."""
+    limit = getattr(settings, 'AI_USER_QUOTA', 60)
+    window = getattr(settings, 'AI_USER_QUOTA_WINDOW', 3600)
+    if not limit:
+        return None
+    caller = f"user:{user.pk}" if user else f"ip:{request.META.get('REMOTE_ADDR', '')}"
+    now = int(time.time())
+    # Counted in AI_BUDGET_STORE, which unlike the default cache is shared by every worker
+    count = await sync_to_async(count_request)(caller, now // window, window)
+    if count > limit:
+        return window - now % window
+    return None
+
+
+def ai_view(login_required: bool = False):
+    """Authentication, quota and error handling shared by the async AI views."""
+    def decorator(view):
+        @csrf_exempt
+        @require_POST
+        async def wrapper(request, *args, **kwargs):
+            try:
+                user = await authenticate(request)
+            except AuthenticationFailed as e:
+                return JsonResponse({'detail': str(e)}, status=401)
+            if login_required and user is None:
+                return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+            retry_after = await quota_wait(request, user)
+            if retry_after is not None:
+                response = JsonResponse({'error': 'AI request quota exceeded, please try again later.'}, status=429)
+                response['Retry-After'] = str(retry_after)
+                return response
+
+            if request.content_type == 'application/json':
+                try:
+                    data = json.loads(request.body or b'{}')
+                except ValueError:
+                    return JsonResponse({'error': 'Request body must be JSON.'}, status=400)
+                if not isinstance(data, dict):
+                    return JsonResponse({'error': 'Request body must be a JSON object.'}, status=400)
+            else:
+                data = request.POST.dict()
+
+            try:
+                return await view(request, user, data, *args, **kwargs)
+            except AIBusyError as e:
+                response = JsonResponse({'error': str(e)}, status=503)
+                response['Retry-After'] = '1'
+                return response
+            except AIBudgetExceeded as e:
+                return JsonResponse({'error': str(e)}, status=429)
+        return wrapper
+    return decorator
+
+
+async def get_problem(problem_id, user):
+    """The problem, or None when it does not exist or is still hidden from `user` (see Problem.visible_from)."""
+    try:
+        problem = await Problem.objects.filter(id=problem_id).afirst()
+    except (TypeError, ValueError):
+        return None
+    if problem is not None and not problem.is_visible() and not problem.can_preview(user):
+        return None
+    return problem
+
+
+def not_found(model):
+    return JsonResponse({'detail': f'No {model.__name__} matches the given query.'}, status=404)
+
+
+def event_stream(events):
+    async def body():
+        async for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    response = StreamingHttpResponse(body(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keeps nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def unavailable(fallback, error):
+    return JsonResponse({**fallback(error), 'error': f'AI Service Unavailable: {error}'}, status=503)
+
+
+@ai_view(login_required=True)
+async def analyze_submission(request, user, data, problem_id):
+    """Analyze complexity for existing submission"""
+    submission_id = data.get('submission_id')
+    problem = await get_problem(problem_id, user)
+    if problem is None:
+        return not_found(Problem)
+    if not submission_id:
+        return JsonResponse({'error': 'Submission ID is required'}, status=400)
+    try:
+        submission = await Submission.objects.select_related('problem').filter(id=submission_id, user_id=user.id).afirst()
+    except (TypeError, ValueError):
+        submission = None
+    if submission is None:
+        return not_found(Submission)
+
+    try:
+        service = AIAnalysisService()
+    except Exception as e:
+        return unavailable(AIAnalysisService._analyze_complexity_fallback, e)
+    result = await service.aanalyze_complexity(
+        submission.code, submission.language, problem.description,
+        context={
+            'user': user,
+            'submission': submission,
+            'problem': submission.problem,
+            'user_code': submission.code,
+            'programming_language': submission.language,
+        }
+    )
+    return JsonResponse(result, safe=False)
+
+
+@ai_view()
+async def explain_problem(request, user, data, problem_id):
+    """Explain problem statement"""
+    problem = await get_problem(problem_id, user)
+    if problem is None:
+        return not_found(Problem)
+
+    try:
+        service = AIAnalysisService()
+    except Exception as e:
+        return unavailable(AIAnalysisService._explain_problem_fallback, e)
+    result = await service.aexplain_problem(problem.description, context={'problem': problem, 'user': user})
+    return JsonResponse(result, safe=False)
+
+
+@ai_view()
+async def get_hint(request, user, data):
+    """get coding hint"""
+    code = data.get('code')
+    language = data.get('language')
+    problem = await get_problem(data.get('problem_id'), user)
+    if problem is None:
+        return not_found(Problem)
+
+    try:
+        service = AIAnalysisService()
+    except Exception as e:
+        return unavailable(AIAnalysisService._provide_hint_fallback, e)
+    result = await service.aprovide_hint(
+        problem.description, code, language,
+        context={
+            'problem': problem,
+            'user_code': code or '',
+            'programming_language': (language or '')[:20],
+            'user': user,
+        }
+    )
+    return JsonResponse(result, safe=False)
+
+
+@ai_view()
+async def analyze_code(request, user, data):
+    """Analyze custom code snippet input directly by the user"""
+    code = data.get('code')
+    language = data.get('language', 'python')
+    if not code:
+        return JsonResponse({'error': 'Code is required'}, status=400)
+
+    try:
+        service = AIAnalysisService()
+    except Exception as e:
+        return unavailable(lambda error: AIAnalysisService._analyze_code_fallback(error, language), e)
+    result = await service.aanalyze_code(
+        code, language,
+        context={'user_code': code, 'programming_language': language[:20], 'user': user}
+    )
+    return JsonResponse(result, safe=False)
+
+
+@ai_view()
+async def stream_explain_problem(request, user, data, problem_id):
+    """Explain problem statement, streamed as server-sent events"""
+    problem = await get_problem(problem_id, user)
+    if problem is None:
+        return not_found(Problem)
+
+    try:
+        service = AIAnalysisService()
+    except Exception as e:
+        return unavailable(AIAnalysisService._explain_problem_fallback, e)
+    return event_stream(service.astream_explain_problem(problem.description, context={'problem': problem, 'user': user}))
+
+
+@ai_view()
+async def stream_get_hint(request, user, data):
+    """get coding hint, streamed as server-sent events"""
+    code = data.get('code')
+    language = data.get('language')
+    problem = await get_problem(data.get('problem_id'), user)
+    if problem is None:
+        return not_found(Problem)
+
+    try:
+        service = AIAnalysisService()
+    except Exception as e:
+        return unavailable(AIAnalysisService._provide_hint_fallback, e)
+    return event_stream(service.astream_provide_hint(
+        problem.description, code, language,
+        context={
+            'problem': problem,
+            'user_code': code or '',
+            'programming_language': (language or '')[:20],
+            'user': user,
+        }
+    ))
@@ -0,0 +1,298 @@
+"""
+Model backends behind the AI client.
+
+An LLMBackend makes single calls to a model; ai_service/client.py adds the
+retries, circuit breaker and async concurrency limit on top, so every backend
+gets the same policies. AI_BACKEND selects one per process: 'gemini' (the
+default, needs GEMINI_API_KEY), 'fake', or a dotted path to an LLMBackend
+subclass.
+
+FakeBackend needs no key and no network. It answers each operation with a
+schema-valid JSON object derived from a hash of the prompt, so identical prompts
+get identical answers, after AI_FAKE_LATENCY seconds (plus up to
+AI_FAKE_LATENCY_JITTER, also derived from the prompt). A share AI_FAKE_ERROR_RATE
+of calls fails with AI_FAKE_ERROR: 'timeout' or 'server' (transient, retried and
+counted by the breaker) or 'bad_request' (not retried), drawn from a generator
+seeded with AI_FAKE_SEED. That is enough to load-test caching, coalescing,
+circuit breaking and the async endpoints on a machine without network. Its calls
+are recorded (and cached) under the model name 'fake', at no cost and outside the
+daily token budgets.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+from django.conf import settings
+from django.utils.module_loading import import_string
+from google import genai
+from google.genai import errors, types
+
+
+class LLMBackend:
+    """One model call per method; raising is left to the client's retry policy."""
+
+    # Whether calls count against the daily token budgets
+    billed = True
+
+    def model_name(self, model: str) -> str:
+        """The name calls to `model` are cached, priced and recorded under."""
+        return model
+
+    def generate(self, model: str, contents: str, timeout: Optional[float] = None, operation: str = ''):
+        """A response with `.text` and `.usage_metadata`."""
+        raise NotImplementedError
+
+    async def agenerate(self, model: str, contents: str, timeout: Optional[float] = None, operation: str = ''):
+        raise NotImplementedError
+
+    async def astream(self, model: str, contents: str, timeout: Optional[float] = None,
+                      operation: str = '') -> AsyncIterator[Any]:
+        """Opens a streamed response: an async iterator of chunks shaped like generate()'s response."""
+        raise NotImplementedError
+
+
+class GeminiBackend(LLMBackend):
+    """google-genai with pooled, kept-alive connections shared by the whole process."""
+
+    def __init__(self):
+        api_key = getattr(settings, 'GEMINI_API_KEY', '')
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY environment variable is not configured on the server. Please add it to your server configuration/environment variables.")
+        timeout = getattr(settings, 'AI_REQUEST_TIMEOUT', 30)
+        pool_size = getattr(settings, 'AI_POOL_SIZE', 20)
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size, keepalive_expiry=60)
+        async_limits = httpx.Limits(
+            max_connections=getattr(settings, 'AI_MAX_CONCURRENCY', 200),
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=60,
+        )
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                timeout=int(timeout * 1000),
+                client_args={'limits': limits},
+                async_client_args={'limits': async_limits},
+            ),
+        )
+
+    def _config(self, timeout: Optional[float]):
+        if timeout is None:
+            return None
+        return types.GenerateContentConfig(http_options=types.HttpOptions(timeout=int(timeout * 1000)))
+
+    def generate(self, model, contents, timeout=None, operation=''):
+        return self.client.models.generate_content(model=model, contents=contents, config=self._config(timeout))
+
+    async def agenerate(self, model, contents, timeout=None, operation=''):
+        return await self.client.aio.models.generate_content(model=model, contents=contents, config=self._config(timeout))
+
+    async def astream(self, model, contents, timeout=None, operation=''):
+        return await self.client.aio.models.generate_content_stream(
+            model=model, contents=contents, config=self._config(timeout)
+        )
+
+
+@dataclass
+class FakeUsage:
+    prompt_token_count: int = 0
+    candidates_token_count: int = 0
+    thoughts_token_count: int = 0
+
+
+@dataclass
+class FakeResponse:
+    text: str
+    usage_metadata: Optional[FakeUsage] = field(default=None)
+
+
+def _fake_complexity(rng, digest, prompt):
+    return {
+        "time_complexity": "O(N) - a single pass over the input",
+        "space_complexity": "O(1) - a constant number of variables",
+        "explanation": f"Offline analysis {digest}.",
+        "optimization": "None needed for the stated constraints.",
+        "errors": [],
+    }
+
+
+def _fake_explanation(rng, digest, prompt):
+    return {
+        "problem_summary": f"Offline explanation {digest}.",
+        "approach": "Read the input, process it in one pass and print the answer.",
+        "algorithms": ["Linear scan"],
+        "example": "For the first sample, follow the statement step by step.",
+    }
+
+
+def _fake_hint(rng, digest, prompt):
+    return {
+        "hint": f"Offline hint {digest}: look at what changes between consecutive elements.",
+        "approach": ["Start from the brute force solution.", "Remove the repeated work."],
+        "derivation": [
+            {"step": 1, "content": "Write down the naive nested loop."},
+            {"step": 2, "content": "Keep a running value instead of recomputing it."},
+        ],
+        "complexity": {"time": "O(N)", "space": "O(1)"},
+    }
+
+
+def _fake_error_report(rng, digest, prompt):
+    language = re.search(r"Language: (\S+)", prompt)
+    kind = re.search(r"Analyze this (Compilation|Runtime) Error", prompt)
+    return {
+        "type": f"{kind.group(1) if kind else 'Runtime'} Error",
+        "language": language.group(1) if language else "",
+        "message": f"Offline error report {digest}.",
+        "line": None,
+        "suggestion": "Read the first error in the log and fix it before the others.",
+    }
+
+
+def _fake_tests(rng, digest, prompt):
+    return {
+        category: [
+            {"input": f"{a} {b}\n", "output": f"{a + b}\n", "explanation": f"{category} case"}
+            for a, b in ((rng.randint(0, 1000), rng.randint(0, 1000)) for _ in range(2))
+        ]
+        for category in ('sample', 'edge', 'corner', 'stress', 'random')
+    }
+
+
+def _fake_test_inputs(rng, digest, prompt):
+    keys = re.search(r"keys EXACTLY: ([\w, ]+)\.", prompt)
+    count = re.search(r"list of (\d+) objects", prompt)
+    categories = [key.strip() for key in keys.group(1).split(',')] if keys else ['random']
+    return {
+        category: [
+            {"input": f"{rng.randint(0, 10 ** 6)} {rng.randint(0, 10 ** 6)}\n", "explanation": f"{category} case"}
+            for _ in range(int(count.group(1)) if count else 3)
+        ]
+        for category in categories
+    }
+
+
+def _fake_code_review(rng, digest, prompt):
+    language = re.search(r'"language": "([^"]*)"', prompt)
+    return {
+        "language": language.group(1) if language else "",
+        "timeComplexity": "O(N)",
+        "spaceComplexity": "O(1)",
+        "syntaxErrors": "None detected",
+        "codeQuality": {
+            "maintainability": "Good",
+            "readability": "Good",
+            "style": f"Offline review {digest}.",
+        },
+        "optimizations": [],
+    }
+
+
+def _fake_summary(rng, digest, prompt):
+    return {"summary": f"Offline summary {digest}."}
+
+
+FAKE_RESPONSES: Dict[str, Callable[[random.Random, str, str], Any]] = {
+    'analyze_complexity': _fake_complexity,
+    'explain_problem': _fake_explanation,
+    'provide_hint': _fake_hint,
+    'generate_error_report': _fake_error_report,
+    'generate_test_cases': _fake_tests,
+    'generate_test_inputs': _fake_test_inputs,
+    'analyze_code': _fake_code_review,
+    'summarize_problem': _fake_summary,
+}
+
+
+class FakeBackend(LLMBackend):
+    """Deterministic offline stand-in for Gemini, see the module docstring."""
+
+    # Characters per streamed chunk
+    chunk_size = 40
+    billed = False
+
+    def model_name(self, model):
+        return 'fake'
+
+    def __init__(self):
+        self.latency = getattr(settings, 'AI_FAKE_LATENCY', 0.2)
+        self.jitter = getattr(settings, 'AI_FAKE_LATENCY_JITTER', 0.1)
+        self.error_rate = getattr(settings, 'AI_FAKE_ERROR_RATE', 0.0)
+        self.error = getattr(settings, 'AI_FAKE_ERROR', 'server')
+        self.timeout = getattr(settings, 'AI_REQUEST_TIMEOUT', 30)
+        self._errors = random.Random(getattr(settings, 'AI_FAKE_SEED', 0))
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _answer(self, contents: str, operation: str):
+        """(delay in seconds, response text) for a prompt; raises the injected error instead when one is drawn."""
+        with self._lock:
+            self.calls += 1
+            failed = self.error_rate and self._errors.random() < self.error_rate
+        if failed:
+            raise self._injected_error()
+        digest = hashlib.sha256(f"{operation}\x1f{contents}".encode('utf-8')).hexdigest()
+        rng = random.Random(digest)
+        delay = self.latency + self.jitter * rng.random()
+        build = FAKE_RESPONSES.get(operation, lambda rng, digest, prompt: {"result": f"Offline response {digest}."})
+        return delay, json.dumps(build(rng, digest[:8], contents))
+
+    def _injected_error(self) -> Exception:
+        if self.error == 'timeout':
+            return httpx.ReadTimeout("Injected timeout")
+        if self.error == 'bad_request':
+            return errors.ClientError(400, {'error': {'code': 400, 'message': 'Injected bad request', 'status': 'INVALID_ARGUMENT'}})
+        return errors.ServerError(503, {'error': {'code': 503, 'message': 'Injected outage', 'status': 'UNAVAILABLE'}})
+
+    def _usage(self, contents: str, text: str) -> FakeUsage:
+        return FakeUsage(prompt_token_count=-(-len(contents) // 4), candidates_token_count=-(-len(text) // 4))
+
+    def generate(self, model, contents, timeout=None, operation=''):
+        delay, text = self._answer(contents, operation)
+        timeout = timeout or self.timeout
+        if delay > timeout:
+            time.sleep(timeout)
+            raise httpx.ReadTimeout("Fake response slower than the timeout")
+        time.sleep(delay)
+        return FakeResponse(text, self._usage(contents, text))
+
+    async def agenerate(self, model, contents, timeout=None, operation=''):
+        delay, text = self._answer(contents, operation)
+        timeout = timeout or self.timeout
+        if delay > timeout:
+            await asyncio.sleep(timeout)
+            raise httpx.ReadTimeout("Fake response slower than the timeout")
+        await asyncio.sleep(delay)
+        return FakeResponse(text, self._usage(contents, text))
+
+    async def astream(self, model, contents, timeout=None, operation=''):
+        delay, text = self._answer(contents, operation)
+        pieces: List[str] = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+        usage = self._usage(contents, text)
+
+        async def chunks():
+            for piece in pieces:
+                await asyncio.sleep(delay / len(pieces))
+                yield FakeResponse(piece)
+            yield FakeResponse('', usage)
+
+        return chunks()
+
+
+BACKENDS = {
+    'gemini': GeminiBackend,
+    'fake': FakeBackend,
+}
+
+
+def create_backend() -> LLMBackend:
+    """A new backend of the kind selected by AI_BACKEND."""
+    name = getattr(settings, 'AI_BACKEND', 'gemini') or 'gemini'
+    factory = BACKENDS.get(name) or import_string(name)
+    return factory()
@@ -0,0 +1,278 @@
+"""
+Two-tier cache of parsed AI results, keyed by (operation, model, prompt).
+
+The key is a SHA-256 of the three and is stored in the unique
+AIAnalysis.prompt_hash column. The front tier is a per-process LRU; the second
+tier is an AIAnalysis row of its own, so results are shared by every worker and
+survive restarts. Cache rows carry no user, submission or code (only the columns
+in CACHE_FIELDS); the history rows AIAnalysisService keeps for submissions have
+no prompt_hash and are never pruned. Entries expire AI_CACHE_TTL seconds after
+they were generated. The LRU holds at most AI_CACHE_LOCAL_MAX_ENTRIES results;
+cached rows beyond AI_CACHE_DB_MAX_ENTRIES (and expired ones) are removed by
+`prune()`, see `manage.py prune_ai_cache`.
+
+Misses are coalesced by `SingleFlight`: concurrent identical requests in one
+process wait on the first one's future, and other workers wait for its cache lock
+to be released and then read the stored result. Waiting is bounded by
+AI_SINGLEFLIGHT_TIMEOUT, after which a request calls the model itself.
+"""
+import asyncio
+import copy
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, IntegrityError
+from django.utils import timezone
+
+from backend.metrics import AI_COALESCED, record_cache
+
+from .models import AIAnalysis
+
+logger = logging.getLogger(__name__)
+
+# AIAnalysis columns a cache row keeps; the rest describe one request, not the prompt's answer
+CACHE_FIELDS = ('analysis_type', 'model_name', 'processing_time', 'problem', 'programming_language')
+
+
+def prompt_hash(operation: str, model: str, prompt: str) -> str:
+    return hashlib.sha256('\x1f'.join((operation, model, prompt)).encode('utf-8')).hexdigest()
+
+
+class AIResultCache:
+    def __init__(self, ttl: Optional[int] = None, local_max_entries: Optional[int] = None,
+                 db_max_entries: Optional[int] = None):
+        self.ttl = ttl if ttl is not None else getattr(settings, 'AI_CACHE_TTL', 7 * 24 * 3600)
+        self.local_max_entries = (
+            local_max_entries if local_max_entries is not None
+            else getattr(settings, 'AI_CACHE_LOCAL_MAX_ENTRIES', 256)
+        )
+        self.db_max_entries = (
+            db_max_entries if db_max_entries is not None
+            else getattr(settings, 'AI_CACHE_DB_MAX_ENTRIES', 50000)
+        )
+        self._local = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        result = self._get_local(key)
+        if result is not None:
+            return result
+        return self._get_db(key)
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        # Local hits never leave the event loop
+        result = self._get_local(key)
+        if result is not None:
+            return result
+        return await sync_to_async(self._get_db)(key)
+
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        now = timezone.now()
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._local.move_to_end(key)
+                else:
+                    del self._local[key]
+                    entry = None
+        record_cache('ai_local', entry is not None)
+        return copy.deepcopy(entry[1]) if entry is not None else None
+
+    def _get_db(self, key: str) -> Optional[Dict[str, Any]]:
+        now = timezone.now()
+        try:
+            row = (
+                AIAnalysis.objects
+                .filter(prompt_hash=key, expires_at__gt=now)
+                .values_list('expires_at', 'analysis_result')
+                .first()
+            )
+        except DatabaseError:
+            logger.exception("AI result cache lookup failed")
+            row = None
+        record_cache('ai_db', row is not None)
+        if row is None:
+            return None
+        self._remember(key, *row)
+        return copy.deepcopy(row[1])
+
+    def set(self, key: str, result: Dict[str, Any], **fields) -> None:
+        """Stores a result; `fields` are further AIAnalysis columns, of which those in CACHE_FIELDS are kept."""
+        expires_at = timezone.now() + timedelta(seconds=self.ttl)
+        self._remember(key, expires_at, copy.deepcopy(result))
+        fields = {name: value for name, value in fields.items() if name in CACHE_FIELDS}
+        try:
+            AIAnalysis.objects.update_or_create(
+                prompt_hash=key,
+                defaults={**fields, 'analysis_result': result, 'expires_at': expires_at},
+            )
+        except IntegrityError:
+            # Another worker stored the same prompt first; its result is as good as ours
+            pass
+        except DatabaseError:
+            logger.exception("AI result cache write failed")
+
+    async def aset(self, key: str, result: Dict[str, Any], **fields) -> None:
+        await sync_to_async(self.set)(key, result, **fields)
+
+    def _remember(self, key: str, expires_at, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._local[key] = (expires_at, result)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    def prune(self) -> Dict[str, int]:
+        """Deletes expired cached rows, then the oldest ones beyond db_max_entries."""
+        cached = AIAnalysis.objects.filter(prompt_hash__isnull=False)
+        expired, _ = cached.filter(expires_at__lte=timezone.now()).delete()
+        evicted = 0
+        # The newest row that no longer fits, in (expires_at, pk) order
+        rows = list(
+            cached.order_by('-expires_at', '-pk')
+            .values_list('expires_at', 'pk')[self.db_max_entries:self.db_max_entries + 1]
+        )
+        if rows:
+            cutoff = rows[0]
+            evicted, _ = cached.filter(expires_at__lte=cutoff[0]).exclude(
+                expires_at=cutoff[0], pk__gt=cutoff[1]
+            ).delete()
+        return {'expired': expired, 'evicted': evicted}
+
+
+class _LeaderCancelled(Exception):
+    """Published to followers instead of the leader's CancelledError: their own requests are still wanted."""
+
+
+class SingleFlight:
+    def __init__(self, results: AIResultCache, timeout: Optional[float] = None):
+        self.results = results
+        self.timeout = timeout if timeout is not None else getattr(settings, 'AI_SINGLEFLIGHT_TIMEOUT', 30)
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, generate: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """generate()'s result, shared with every identical call made while it runs."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            try:
+                result = future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                AI_COALESCED.labels('timeout').inc()
+                return generate()
+            except _LeaderCancelled:
+                return generate()
+            AI_COALESCED.labels('process').inc()
+            return copy.deepcopy(result)
+
+        try:
+            result = self._run_once(key, generate)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def _run_once(self, key: str, generate: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Calls generate() unless another worker is already answering the same prompt."""
+        lock_key = f"ai:inflight:{key}"
+        if cache.add(lock_key, 1, self.timeout):
+            try:
+                return generate()
+            finally:
+                cache.delete(lock_key)
+
+        deadline = time.monotonic() + self.timeout
+        while cache.get(lock_key) is not None:
+            if time.monotonic() >= deadline:
+                AI_COALESCED.labels('timeout').inc()
+                return generate()
+            time.sleep(0.05)
+        result = self.results.get(key)
+        if result is None:
+            # The other worker failed or got an uncacheable response
+            return generate()
+        AI_COALESCED.labels('worker').inc()
+        return result
+
+    async def arun(self, key: str, generate: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """run() for coroutines; shares in-flight calls with sync callers in the same process."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            try:
+                result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+            except asyncio.TimeoutError:
+                AI_COALESCED.labels('timeout').inc()
+                return await generate()
+            except _LeaderCancelled:
+                return await generate()
+            AI_COALESCED.labels('process').inc()
+            return copy.deepcopy(result)
+
+        try:
+            result = await self._arun_once(key, generate)
+        except asyncio.CancelledError:
+            # Only the leader's client went away; its followers make the call themselves
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def _arun_once(self, key: str, generate: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        lock_key = f"ai:inflight:{key}"
+        if await cache.aadd(lock_key, 1, self.timeout):
+            try:
+                return await generate()
+            finally:
+                await cache.adelete(lock_key)
+
+        deadline = time.monotonic() + self.timeout
+        while await cache.aget(lock_key) is not None:
+            if time.monotonic() >= deadline:
+                AI_COALESCED.labels('timeout').inc()
+                return await generate()
+            await asyncio.sleep(0.05)
+        result = await self.results.aget(key)
+        if result is None:
+            return await generate()
+        AI_COALESCED.labels('worker').inc()
+        return result
+
+
+result_cache = AIResultCache()
+in_flight = SingleFlight(result_cache)
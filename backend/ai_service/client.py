@@ -0,0 +1,224 @@
+"""
+The process-wide AI client.
+
+One client, around the model backend selected by AI_BACKEND (see
+ai_service/backends.py), is created per process on first use and shared by every
+AIAnalysisService, so HTTP connections are pooled and kept alive instead of
+being opened per request. Each attempt is bounded by a timeout; transient
+failures (timeouts, connection errors, 429 and 5xx responses) are retried with
+exponentially growing, fully jittered sleeps. A circuit breaker opens after
+AI_BREAKER_THRESHOLD consecutive failed calls: for the next AI_BREAKER_RESET
+seconds calls fail immediately with CircuitOpenError, then a single trial call
+decides whether it closes again.
+
+Async callers (ai_service/async_views.py) share the same pool. At most
+AI_MAX_CONCURRENCY of their calls are in flight per event loop; a call that
+cannot start within AI_QUEUE_TIMEOUT seconds fails with AIBusyError.
+"""
+import asyncio
+import random
+import threading
+import time
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+import httpx
+from django.conf import settings
+from google.genai import errors
+
+from .backends import LLMBackend, create_backend
+
+
+class CircuitOpenError(Exception):
+    """The AI provider failed repeatedly; calls are refused until the breaker resets."""
+
+
+class AIBusyError(Exception):
+    """Too many AI calls are already in flight on this event loop."""
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return 'open'
+        return 'half-open'
+
+    def before_call(self) -> bool:
+        """Raises CircuitOpenError while open; True when this call is the half-open trial."""
+        with self._lock:
+            state = self.state
+            if state == 'open' or (state == 'half-open' and self._trial_running):
+                raise CircuitOpenError("AI service temporarily unavailable after repeated failures.")
+            if state == 'half-open':
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def end_trial(self):
+        """Frees the trial slot of a call that ended without a verdict (e.g. cancelled), so the next call can try."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, errors.ServerError):
+        return True
+    return isinstance(error, errors.APIError) and error.code in (408, 429)
+
+
+class AIClient:
+    def __init__(self, backend: LLMBackend):
+        self.backend = backend
+        self.max_retries = getattr(settings, 'AI_MAX_RETRIES', 2)
+        self.backoff = getattr(settings, 'AI_RETRY_BACKOFF', 0.5)
+        self.backoff_max = getattr(settings, 'AI_RETRY_BACKOFF_MAX', 4)
+        self.breaker = CircuitBreaker(
+            getattr(settings, 'AI_BREAKER_THRESHOLD', 5),
+            getattr(settings, 'AI_BREAKER_RESET', 30),
+        )
+        self.max_concurrency = getattr(settings, 'AI_MAX_CONCURRENCY', 200)
+        self.queue_timeout = getattr(settings, 'AI_QUEUE_TIMEOUT', 5)
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    def generate(self, model: str, contents: str, timeout: Optional[float] = None, operation: str = ''):
+        """The backend's generate() with retries; `timeout` (seconds) overrides AI_REQUEST_TIMEOUT per attempt."""
+        trial = self.breaker.before_call()
+        # The trial call after an outage gets a single attempt
+        retries = 0 if trial else self.max_retries
+        attempt = 0
+        try:
+            while True:
+                try:
+                    response = self.backend.generate(model, contents, timeout=timeout, operation=operation)
+                except Exception as e:
+                    if not is_transient(e):
+                        # The provider answered, so it is up; the request itself was bad
+                        self.breaker.record_success()
+                        raise
+                    if attempt >= retries:
+                        self.breaker.record_failure()
+                        raise
+                    time.sleep(self._delay(attempt))
+                    attempt += 1
+                else:
+                    self.breaker.record_success()
+                    return response
+        finally:
+            if trial:
+                self.breaker.end_trial()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Semaphores are bound to one event loop (scripts and tests may run several)
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _acquire(self) -> asyncio.Semaphore:
+        semaphore = self._semaphore()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise AIBusyError("Too many AI requests in progress, please retry shortly.")
+        return semaphore
+
+    async def _aretry(self, call: Callable[[], Awaitable]):
+        """Awaits call() with the breaker and retry policy of generate()."""
+        trial = self.breaker.before_call()
+        retries = 0 if trial else self.max_retries
+        attempt = 0
+        try:
+            while True:
+                try:
+                    result = await call()
+                except Exception as e:
+                    if not is_transient(e):
+                        self.breaker.record_success()
+                        raise
+                    if attempt >= retries:
+                        self.breaker.record_failure()
+                        raise
+                    await asyncio.sleep(self._delay(attempt))
+                    attempt += 1
+                else:
+                    self.breaker.record_success()
+                    return result
+        finally:
+            # A cancelled trial (the client went away) skips the handlers above
+            if trial:
+                self.breaker.end_trial()
+
+    async def agenerate(self, model: str, contents: str, timeout: Optional[float] = None, operation: str = ''):
+        """generate() for coroutines, bounded by AI_MAX_CONCURRENCY in-flight calls."""
+        semaphore = await self._acquire()
+        try:
+            return await self._aretry(
+                lambda: self.backend.agenerate(model, contents, timeout=timeout, operation=operation)
+            )
+        finally:
+            semaphore.release()
+
+    async def astream(self, model: str, contents: str, timeout: Optional[float] = None,
+                      operation: str = '') -> AsyncIterator[Any]:
+        """
+        The response chunks as they are generated (the last one carries the usage
+        metadata). Only opening the stream is retried: once a chunk has been passed
+        on, a failure ends the stream.
+        """
+        semaphore = await self._acquire()
+        try:
+            stream = await self._aretry(
+                lambda: self.backend.astream(model, contents, timeout=timeout, operation=operation)
+            )
+            try:
+                async for chunk in stream:
+                    yield chunk
+            except Exception as e:
+                if is_transient(e):
+                    self.breaker.record_failure()
+                raise
+        finally:
+            semaphore.release()
+
+_client: Optional[AIClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> AIClient:
+    """The shared client; raises ValueError when the backend is not configured (no GEMINI_API_KEY for Gemini)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = AIClient(create_backend())
+    return _client
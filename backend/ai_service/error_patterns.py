@@ -0,0 +1,393 @@
+"""
+Rule-based reports for common compilation and runtime errors.
+
+Most failed submissions hit a small set of errors (a missing semicolon, an
+undeclared name, an index out of range, a segfault). classify_error() parses the
+g++, javac/JVM or Python output, takes the first error and its line number,
+and matches it against the patterns below. A match produces the same report
+schema as AIAnalysisService.generate_error_report() without calling the model;
+only unrecognised errors go to Gemini. Hits and misses are counted in
+error_classifier_requests_total.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from backend.metrics import ERROR_CLASSIFIER
+from judge.languages import get_language
+
+# g++ quotes names with ‘…’ under a UTF-8 locale and with '…' otherwise
+_OPEN = "[‘'`]"
+_CLOSE = "[’']"
+
+
+@dataclass(frozen=True)
+class Pattern:
+    regex: str
+    # Formatted with the regex's named groups
+    message: str
+    suggestion: str
+
+    def match(self, text: str) -> Optional[Dict[str, str]]:
+        found = re.search(self.regex, text)
+        if found is None:
+            return None
+        return {name: value or '' for name, value in found.groupdict().items()}
+
+
+GCC_COMPILE = [
+    Pattern(
+        rf"expected ({_OPEN},{_CLOSE} or )?{_OPEN};{_CLOSE}",
+        "Missing semicolon: a statement is not terminated with ';'.",
+        "Add the missing ';' at the end of the statement just before the reported position (usually the end of the previous line).",
+    ),
+    Pattern(
+        rf"{_OPEN}(?P<name>[^’']+){_CLOSE} was not declared in this scope",
+        "'{name}' is used but never declared.",
+        "Declare '{name}' before using it, check its spelling, and make sure the header or namespace (e.g. std::) it comes from is included.",
+    ),
+    Pattern(
+        rf"{_OPEN}(?P<name>[^’']+){_CLOSE} does not name a type",
+        "'{name}' is used as a type but no such type is declared.",
+        "Check the spelling of the type and include the header that defines it (or qualify it with std::).",
+    ),
+    Pattern(
+        rf"{_OPEN}(?P<name>[^’']+){_CLOSE} is not a member of {_OPEN}(?P<scope>[^’']+){_CLOSE}",
+        "'{scope}' has no member named '{name}'.",
+        "Check the spelling of '{name}' and the header that declares it.",
+    ),
+    Pattern(
+        r"(?P<header>\S+): No such file or directory",
+        "The header '{header}' cannot be found.",
+        "Use a standard header (for example <bits/stdc++.h>, <vector>, <algorithm>); third-party headers are not available.",
+    ),
+    Pattern(
+        rf"expected {_OPEN}\}}{_CLOSE} at end of input",
+        "A '{{' is never closed: the file ends inside a block.",
+        "Add the missing '}}' and check that every block is closed where you intended.",
+    ),
+    Pattern(
+        rf"expected {_OPEN}\){_CLOSE}",
+        "Unbalanced parentheses: a ')' is missing.",
+        "Count the parentheses in the reported expression and close each '(' that is opened.",
+    ),
+    Pattern(
+        r"expected primary-expression before",
+        "An expression is incomplete or contains a stray token.",
+        "Look for a missing operand, an extra operator or comma, or a type name used where a value is expected.",
+    ),
+    Pattern(
+        r"no matching function for call to",
+        "No function with this name accepts the given arguments.",
+        "Check the number and types of the arguments against the function's declaration.",
+    ),
+    Pattern(
+        r"(invalid conversion from|cannot convert) ",
+        "A value has the wrong type for where it is used.",
+        "Check the types on both sides of the assignment or call, and convert explicitly where needed.",
+    ),
+    Pattern(
+        r"(redeclaration of|conflicting declaration|redefinition of)",
+        "A name is declared twice in the same scope.",
+        "Rename or remove one of the declarations.",
+    ),
+    Pattern(
+        r"lvalue required as left operand of assignment",
+        "Something that cannot be assigned to is on the left of '='.",
+        "Use '==' for comparisons; '=' assigns.",
+    ),
+]
+
+JAVAC_COMPILE = [
+    Pattern(
+        r"';' expected",
+        "Missing semicolon: a statement is not terminated with ';'.",
+        "Add the missing ';' at the end of the reported statement.",
+    ),
+    Pattern(
+        r"cannot find symbol[\s\S]*?symbol:\s+(?P<kind>\w+) (?P<name>[^\s(]+)",
+        "The {kind} '{name}' is used but never declared.",
+        "Declare '{name}' before using it, check its spelling and capitalisation, and import the class it belongs to.",
+    ),
+    Pattern(
+        r"cannot find symbol",
+        "A name is used but never declared.",
+        "Check the spelling and capitalisation of the reported name and import the class it belongs to.",
+    ),
+    Pattern(
+        r"incompatible types: (?P<detail>.+)",
+        "Incompatible types: {detail}.",
+        "Convert the value explicitly (for example a cast, Integer.parseInt or String.valueOf) or change the variable's type.",
+    ),
+    Pattern(
+        r"class (?P<name>\w+) is public, should be declared in a file named",
+        "The public class '{name}' does not match the file name the judge uses.",
+        "Keep a single public class containing main, or make '{name}' non-public.",
+    ),
+    Pattern(
+        r"missing return statement",
+        "A method can finish without returning a value.",
+        "Make sure every path through the method ends with a return statement.",
+    ),
+    Pattern(
+        r"variable (?P<name>\w+) might not have been initialized",
+        "'{name}' may be read before it is assigned.",
+        "Give '{name}' an initial value where it is declared.",
+    ),
+    Pattern(
+        r"variable (?P<name>\w+) is already defined",
+        "'{name}' is declared twice in the same scope.",
+        "Rename or remove one of the declarations of '{name}'.",
+    ),
+    Pattern(
+        r"reached end of file while parsing",
+        "A '{{' is never closed: the file ends inside a block.",
+        "Add the missing '}}' and check that every block is closed where you intended.",
+    ),
+    Pattern(
+        r"unreported exception (?P<name>[\w.]+); must be caught or declared to be thrown",
+        "The checked exception {name} is neither caught nor declared.",
+        "Add 'throws {name}' (or 'throws Exception') to the method, or wrap the call in try/catch.",
+    ),
+    Pattern(
+        r"'(?P<token>[)\]}])' expected",
+        "Unbalanced brackets: a '{token}' is missing.",
+        "Close every bracket that is opened in the reported statement.",
+    ),
+]
+
+JAVA_RUNTIME = [
+    Pattern(
+        r"java\.lang\.(Array|String)?IndexOutOfBoundsException(: (?P<detail>.*))?",
+        "Index out of bounds ({detail}).",
+        "Check loop bounds and indices: valid indices run from 0 to length - 1.",
+    ),
+    Pattern(
+        r"java\.lang\.NullPointerException",
+        "A null reference was used (NullPointerException).",
+        "Initialise objects and arrays before using them and check values that may be null.",
+    ),
+    Pattern(
+        r"java\.lang\.ArithmeticException: / by zero",
+        "Integer division by zero.",
+        "Check the divisor before dividing or taking a remainder.",
+    ),
+    Pattern(
+        r"java\.lang\.NumberFormatException(: (?P<detail>.*))?",
+        "A string could not be parsed as a number ({detail}).",
+        "Trim the input and split it into tokens before parsing; check you are reading the field you expect.",
+    ),
+    Pattern(
+        r"java\.util\.(InputMismatchException|NoSuchElementException)",
+        "The program read input that is not there or has a different type.",
+        "Read exactly the values the input format describes, in order, and with the right types.",
+    ),
+    Pattern(
+        r"java\.lang\.StackOverflowError",
+        "Stack overflow: recursion is too deep or never terminates.",
+        "Check the recursion's base case, or rewrite it iteratively.",
+    ),
+    Pattern(
+        r"java\.lang\.NegativeArraySizeException",
+        "An array was created with a negative size.",
+        "Check the expression used as the array size.",
+    ),
+    Pattern(
+        r"java\.lang\.ClassCastException(: (?P<detail>.*))?",
+        "An object was cast to a type it does not have ({detail}).",
+        "Check the declared types of the collection or variable before casting.",
+    ),
+    Pattern(
+        r"java\.util\.ConcurrentModificationException",
+        "A collection was modified while it was being iterated.",
+        "Iterate over a copy, or use an Iterator's remove() method.",
+    ),
+]
+
+PYTHON = [
+    Pattern(
+        r"^(?P<error>IndentationError|TabError): (?P<detail>.*)",
+        "{error}: {detail}.",
+        "Indent blocks consistently, with spaces only (4 per level).",
+    ),
+    Pattern(
+        r"^SyntaxError: (?P<detail>.*)",
+        "Syntax error: {detail}.",
+        "Check the reported line and the one before it for missing colons, brackets or quotes.",
+    ),
+    Pattern(
+        r"^IndexError: (?P<detail>.*)",
+        "Index out of range ({detail}).",
+        "Check loop bounds and indices: valid indices run from 0 to len - 1.",
+    ),
+    Pattern(
+        r"^KeyError: (?P<key>.*)",
+        "The key {key} is not in the dictionary.",
+        "Check membership with 'in' or use dict.get() / collections.defaultdict.",
+    ),
+    Pattern(
+        r"^ZeroDivisionError: (?P<detail>.*)",
+        "Division by zero ({detail}).",
+        "Check the divisor before dividing or taking a remainder.",
+    ),
+    Pattern(
+        r"^ValueError: invalid literal for int\(\) with base \d+: (?P<value>.*)",
+        "{value} could not be converted to an integer.",
+        "Split the input line into tokens (input().split()) and convert each token, not the whole line.",
+    ),
+    Pattern(
+        r"^ValueError: (?P<detail>(not enough|too many) values to unpack.*)",
+        "The number of values read does not match the variables ({detail}).",
+        "Check how many values each input line holds, and split the right line.",
+    ),
+    Pattern(
+        r"^EOFError",
+        "The program tried to read more input than was provided.",
+        "Read exactly the lines the input format describes; don't call input() in an unbounded loop.",
+    ),
+    Pattern(
+        r"^RecursionError: (?P<detail>.*)",
+        "Recursion is too deep ({detail}).",
+        "Raise the limit with sys.setrecursionlimit, or rewrite the recursion iteratively.",
+    ),
+    Pattern(
+        r"^UnboundLocalError: (?P<detail>.*)",
+        "A local variable is read before it is assigned ({detail}).",
+        "Assign the variable first, or declare it 'global'/'nonlocal' if you meant the outer one.",
+    ),
+    Pattern(
+        r"^NameError: name '(?P<name>[^']+)' is not defined",
+        "'{name}' is used but never defined.",
+        "Define '{name}' before using it, check its spelling, and import the module it comes from.",
+    ),
+    Pattern(
+        r"^(ModuleNotFoundError|ImportError): (?P<detail>.*)",
+        "Import failed: {detail}.",
+        "Only the standard library is available on the judge.",
+    ),
+    Pattern(
+        r"^AttributeError: (?P<detail>.*)",
+        "Attribute error: {detail}.",
+        "Check the object's type (often it is None or a different type than expected) and the attribute's spelling.",
+    ),
+    Pattern(
+        r"^TypeError: (?P<detail>.*)",
+        "Type error: {detail}.",
+        "Check the types of the values involved; input() returns strings, convert them with int() or float().",
+    ),
+]
+
+NATIVE_RUNTIME = [
+    Pattern(
+        rf"terminate called after throwing an instance of {_OPEN}(?P<name>[^’']+){_CLOSE}(\s+what\(\):\s*(?P<detail>.*))?",
+        "Uncaught C++ exception {name} ({detail}).",
+        "std::out_of_range usually comes from .at() or substr() with a bad index; std::invalid_argument from stoi/stol on non-numeric text.",
+    ),
+    Pattern(
+        r"Assertion `(?P<expr>.+)' failed",
+        "The assertion '{expr}' failed.",
+        "Check the values that make the assertion false.",
+    ),
+]
+
+# Fatal signals of native programs, by exit code (negative signal number or 128 + signal)
+NATIVE_SIGNALS = {
+    11: Pattern(
+        "",
+        "Segmentation fault: the program accessed memory it does not own.",
+        "Check array and vector indices, uninitialised or dangling pointers, and recursion depth (a stack overflow also ends in a segfault).",
+    ),
+    8: Pattern(
+        "",
+        "Arithmetic exception (SIGFPE), almost always an integer division or modulo by zero.",
+        "Check the divisor before dividing or taking a remainder.",
+    ),
+    6: Pattern(
+        "",
+        "The program aborted (SIGABRT).",
+        "A failed assert, an uncaught exception or a corrupted heap (for example writing past the end of an array) end this way.",
+    ),
+}
+
+_GCC_ERROR = re.compile(r"^(?P<file>[^:\n]+):(?P<line>\d+):(?:\d+:)? (?:fatal )?error: (?P<text>.*)$", re.MULTILINE)
+_JAVAC_ERROR = re.compile(r"^(?P<file>[^:\n]+\.java):(?P<line>\d+): error: (?P<text>[\s\S]*?)(?=^\S[^:\n]*\.java:\d+:|\Z)", re.MULTILINE)
+_JAVA_FRAME = re.compile(r"^\s+at (?!java\.|javax\.|jdk\.|sun\.)[\w.$<>]+\([\w$]+\.java:(?P<line>\d+)\)", re.MULTILINE)
+_PYTHON_FRAME = re.compile(r'^\s*File "(?P<file>[^"]+)", line (?P<line>\d+)', re.MULTILINE)
+
+
+def _first(patterns: List[Pattern], text: str) -> Optional[Tuple[Pattern, Dict[str, str]]]:
+    for pattern in patterns:
+        groups = pattern.match(text)
+        if groups is not None:
+            return pattern, groups
+    return None
+
+
+def _native_compile(logs: str, exit_code: Optional[int]):
+    error = _GCC_ERROR.search(logs)
+    if error is None:
+        return None
+    return _first(GCC_COMPILE, error.group('text')), int(error.group('line'))
+
+
+def _java_compile(logs: str, exit_code: Optional[int]):
+    error = _JAVAC_ERROR.search(logs)
+    if error is None:
+        return None
+    return _first(JAVAC_COMPILE, error.group('text')), int(error.group('line'))
+
+
+def _java_runtime(logs: str, exit_code: Optional[int]):
+    frame = _JAVA_FRAME.search(logs)
+    return _first(JAVA_RUNTIME, logs), int(frame.group('line')) if frame else None
+
+
+def _python(logs: str, exit_code: Optional[int]):
+    # The last non-blank line of a traceback names the exception
+    lines = [line for line in logs.strip().splitlines() if line.strip()]
+    if not lines:
+        return None
+    frames = [frame for frame in _PYTHON_FRAME.finditer(logs) if '/lib/python' not in frame.group('file')]
+    line = int(frames[-1].group('line')) if frames else None
+    return _first(PYTHON, lines[-1].strip()), line
+
+
+def _native_runtime(logs: str, exit_code: Optional[int]):
+    found = _first(NATIVE_RUNTIME, logs)
+    if found is None and exit_code is not None:
+        signal = -exit_code if exit_code < 0 else exit_code - 128
+        if signal in NATIVE_SIGNALS:
+            found = NATIVE_SIGNALS[signal], {}
+    return found, None
+
+
+PARSERS = {
+    ('native', True): _native_compile,
+    ('native', False): _native_runtime,
+    ('jvm', True): _java_compile,
+    ('jvm', False): _java_runtime,
+    ('python', True): _python,
+    ('python', False): _python,
+}
+
+
+def classify_error(raw_logs: str, language: str, is_compile: bool, exit_code: Optional[int] = None) -> Optional[Dict]:
+    """A report for a recognised error, in generate_error_report()'s schema; None when unrecognised."""
+    lang = get_language(language)
+    parser = PARSERS.get((lang.family, is_compile)) if lang else None
+    parsed = parser(raw_logs or '', exit_code) if parser else None
+    found, line = parsed if parsed else (None, None)
+
+    kind = 'compile' if is_compile else 'runtime'
+    ERROR_CLASSIFIER.labels(lang.key if lang else 'other', kind, 'hit' if found else 'miss').inc()
+    if found is None:
+        return None
+    pattern, groups = found
+    return {
+        "type": "Compilation Error" if is_compile else "Runtime Error",
+        "language": language,
+        # Optional details that were not captured leave an empty "()" behind
+        "message": pattern.message.format(**groups).replace(' ()', ''),
+        "line": line,
+        "suggestion": pattern.suggestion.format(**groups),
+    }
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from ai_service.cache import prompt_hash, result_cache
+from ai_service.client import AIBusyError, get_client
+from ai_service.models import AIAnalysis, AIUsage
+from ai_service.services import AIAnalysisService
+from ai_service.usage import AIBudgetExceeded
+
+
+def _failure(result):
+    """The error behind analyze_code()'s fallback, None for a real review."""
+    message = str(result.get('syntaxErrors', ''))
+    if not message.startswith('Error during analysis: '):
+        return None
+    return message[len('Error during analysis: '):][:80]
+
+
+def _latency_summary(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+    pick = lambda pct: ordered[max(0, -(-len(ordered) * pct // 100) - 1)]
+    return {
+        'p50': round(pick(50), 1),
+        'p95': round(pick(95), 1),
+        'p99': round(pick(99), 1),
+        'mean': round(statistics.mean(values), 1),
+        'max': round(max(values), 1),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends code-review requests through AIAnalysisService, with --distinct different prompts among --requests, "
+        "from threads (sync) or one event loop (async); reports latency percentiles, throughput, backend calls, "
+        "failures and the breaker state as JSON. Run it with AI_BACKEND=fake to measure caching, coalescing, "
+        "retries and the breaker without network."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests sent in total')
+        parser.add_argument('--distinct', type=int, default=20, help='Different prompts among them (the rest repeat them)')
+        parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight at once')
+        parser.add_argument('--mode', choices=['sync', 'async'], default='sync')
+        parser.add_argument('--output', help='Also write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['distinct'] < 1 or options['concurrency'] < 1:
+            raise CommandError("--requests, --distinct and --concurrency must be positive.")
+        try:
+            service = AIAnalysisService()
+        except ValueError as e:
+            raise CommandError(f"{e} Set AI_BACKEND=fake to benchmark offline.")
+
+        # A fresh run id keeps earlier runs' cached results out of the measurement
+        run = uuid.uuid4().hex[:8]
+        codes = [
+            f"# benchmark {run} variant {index}\nprint(sum(map(int, input().split())))\n"
+            for index in range(options['distinct'])
+        ]
+        jobs = [codes[index % len(codes)] for index in range(options['requests'])]
+        result_cache.clear_local()
+        backend = get_client().backend
+        calls_before = getattr(backend, 'calls', None)
+
+        started_at = timezone.now()
+        start = time.perf_counter()
+        try:
+            if options['mode'] == 'sync':
+                outcomes = self._run_sync(service, jobs, options['concurrency'])
+            else:
+                outcomes = asyncio.run(self._run_async(service, jobs, options['concurrency']))
+        finally:
+            wall_s = time.perf_counter() - start
+            self._cleanup(service, codes, started_at)
+
+        latencies = [latency for latency, _ in outcomes]
+        failures = {}
+        for _, failure in outcomes:
+            if failure:
+                failures[failure] = failures.get(failure, 0) + 1
+        report = {
+            'backend': type(backend).__name__,
+            'mode': options['mode'],
+            'requests': len(jobs),
+            'distinct_prompts': len(codes),
+            'concurrency': options['concurrency'],
+            'wall_s': round(wall_s, 2),
+            'throughput_rps': round(len(jobs) / wall_s, 1) if wall_s else None,
+            'latency_ms': _latency_summary(latencies),
+            'backend_calls': None if calls_before is None else backend.calls - calls_before,
+            'failures': failures,
+            'breaker': get_client().breaker.state,
+        }
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+        self.stdout.write(output)
+
+    def _cleanup(self, service, codes, started_at):
+        """Deletes the cached results and usage rows the run wrote, so they skew neither the cache nor the cost report."""
+        keys = [prompt_hash('analyze_code', service.model_name, service._analyze_code_prompt(code, 'python')) for code in codes]
+        AIAnalysis.objects.filter(prompt_hash__in=keys).delete()
+        AIUsage.objects.filter(
+            operation='analyze_code', model_name=service.model_name, user__isnull=True, created_at__gte=started_at,
+        ).delete()
+        result_cache.clear_local()
+
+    def _run_sync(self, service, jobs, concurrency):
+        def review(code):
+            started = time.perf_counter()
+            try:
+                # analyze_code() reports failures other than a spent budget in its fallback instead of raising
+                try:
+                    failure = _failure(service.analyze_code(code, 'python'))
+                except AIBudgetExceeded as e:
+                    failure = type(e).__name__
+                return (time.perf_counter() - started) * 1000, failure
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(review, jobs))
+
+    async def _run_async(self, service, jobs, concurrency):
+        slots = asyncio.Semaphore(concurrency)
+
+        async def review(code):
+            async with slots:
+                started = time.perf_counter()
+                try:
+                    failure = _failure(await service.aanalyze_code(code, 'python'))
+                except (AIBusyError, AIBudgetExceeded) as e:
+                    failure = type(e).__name__
+                return (time.perf_counter() - started) * 1000, failure
+
+        return await asyncio.gather(*(review(code) for code in jobs))
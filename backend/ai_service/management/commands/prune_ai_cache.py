@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from ai_service.cache import result_cache
+
+
+class Command(BaseCommand):
+    help = "Deletes expired AI result cache rows and the oldest ones beyond AI_CACHE_DB_MAX_ENTRIES."
+
+    def handle(self, *args, **options):
+        removed = result_cache.prune()
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {removed['expired']} expired and {removed['evicted']} evicted cached AI results."
+        ))
@@ -10,14 +10,15 @@ class AIAnalysis(models.Model):
         ('debug', 'Debug Analysis'),
         ('explanation', 'Code Explanation'),
         ('hint', 'Code Hint'),
-        ('review', 'Code Review')
+        ('review', 'Code Review'),
+        ('testcases', 'Test Case Generation'),
     ]
 
     analysis_type = models.CharField(max_length=20, choices=ANALYSIS_TYPE)
-    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='ai_analyses')
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='ai_analyses', null=True, blank=True)
     submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='ai_analyses', null=True, blank=True)
-    user_code = models.TextField()
-    programming_language = models.CharField(max_length=20)
+    user_code = models.TextField(blank=True, default='')
+    programming_language = models.CharField(max_length=20, blank=True, default='')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
 
     #AI response
@@ -26,8 +27,46 @@ class AIAnalysis(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     processing_time = models.FloatField(null=True, blank=True)  # Time taken for AI to process the request
 
+    # Result cache (see ai_service/cache.py): SHA-256 of (operation, model, prompt)
+    prompt_hash = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    model_name = models.CharField(max_length=64, blank=True, default='')
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
     class Meta:
         indexes = [
             models.Index(fields=['problem', 'analysis_type']),
             models.Index(fields=['submission']),
-        ]
\ No newline at end of file
+        ]
+
+class AIBudgetCounter(models.Model):
+    """
+    Tokens used on one UTC day by one budget scope ('global' or 'user:<id>'), or
+    requests in one AI_USER_QUOTA window ('quota:<caller>:<window>'), when
+    AI_BUDGET_STORE is 'db'.
+    """
+    scope = models.CharField(max_length=64)
+    day = models.DateField()
+    tokens = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'day'], name='unique_ai_budget_counter'),
+        ]
+
+
+class AIUsage(models.Model):
+    """One model call: tokens, latency and cost, recorded by ai_service/usage.py (cache hits cost nothing and are not recorded)."""
+    analysis_type = models.CharField(max_length=20, choices=AIAnalysis.ANALYSIS_TYPE)
+    operation = models.CharField(max_length=64)
+    model_name = models.CharField(max_length=64)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    response_tokens = models.PositiveIntegerField(default=0)  # candidates plus thinking tokens, both billed as output
+    latency = models.FloatField()  # seconds
+    cost = models.DecimalField(max_digits=12, decimal_places=6, default=0)  # USD at the prices configured when recorded
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['analysis_type', 'created_at']),
+        ]
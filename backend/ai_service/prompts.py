@@ -0,0 +1,129 @@
+"""
+Prompt size control.
+
+Prompts used to carry the full problem statement, the full user code and the
+full compiler or runtime output, so a multi-kilobyte template error made a call
+slower and dearer without telling the model anything more. PromptBuilder puts
+each part through a compactor before it goes into the prompt:
+
+- compact_logs() drops repeated lines, compiler notes and include/instantiation
+  chains, and library frames of Java and Python stack traces; the rest is cut to
+  the first and last lines within AI_PROMPT_MAX_LOG_LINES / AI_PROMPT_MAX_LOG_CHARS.
+- cap_code() trims trailing whitespace and blank runs, then keeps the head and
+  tail of code longer than AI_PROMPT_MAX_CODE_CHARS.
+- problem statements longer than AI_PROMPT_SUMMARY_THRESHOLD are replaced by a
+  summary (AIAnalysisService makes it once per Problem.updated_at, see
+  summary_key()).
+
+ai_prompt_tokens_total counts the estimated tokens of every prompt as it would
+have been (`raw`) and as it was sent (`sent`), per operation.
+"""
+import re
+import tempfile
+from typing import List, Optional
+
+from django.conf import settings
+
+from backend.metrics import AI_PROMPT_TOKENS
+
+# Rough size of a token in English text and code, good enough to compare prompts
+CHARS_PER_TOKEN = 4
+
+# Per-submission sandbox directories make otherwise identical lines differ
+_SANDBOX_DIR = re.compile(re.escape(tempfile.gettempdir()) + r"/tmp[\w-]+/")
+_LOG_NOISE = [
+    re.compile(r"^\s*In file included from "),
+    re.compile(r"^\s*from \S+:\d+[:,]$"),
+    # "required from here" is the line of the submission that started an instantiation chain
+    re.compile(r"(In instantiation of|In function|In member function|In constructor|required from(?! here)|required by)"),
+    re.compile(r": note: "),
+    re.compile(r"^\s*at (java|javax|jdk|sun)\."),
+    re.compile(r"^\s*\.\.\. \d+ more$"),
+]
+# A Python frame outside the submission, followed by its source line
+_PYTHON_LIBRARY_FRAME = re.compile(r'^\s*File "(/usr/|.*/lib/python|.*site-packages|<frozen)')
+# g++ quotes the source under a diagnostic as `  12 | code` and `     |   ^~~`
+_GCC_SNIPPET = re.compile(r"^\s*\d*\s*\|")
+_OMITTED = "... [{} lines omitted] ..."
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def compact_logs(raw_logs: str, max_lines: Optional[int] = None, max_chars: Optional[int] = None) -> str:
+    """The lines of a compiler or runtime log that say what went wrong, within the configured limits."""
+    max_lines = max_lines or getattr(settings, 'AI_PROMPT_MAX_LOG_LINES', 40)
+    max_chars = max_chars or getattr(settings, 'AI_PROMPT_MAX_LOG_CHARS', 4000)
+    kept: List[str] = []
+    seen = set()
+    # Set after a dropped line, so the source quoted under it goes too
+    dropped = False
+    for line in (raw_logs or '').splitlines():
+        line = _SANDBOX_DIR.sub('', line.rstrip())
+        if dropped and (_GCC_SNIPPET.match(line) or line.startswith('    ')):
+            continue
+        dropped = bool(_PYTHON_LIBRARY_FRAME.match(line) or any(noise.search(line) for noise in _LOG_NOISE))
+        if dropped or not line.strip() or line in seen:
+            continue
+        seen.add(line)
+        kept.append(line)
+
+    if len(kept) > max_lines:
+        # The first error (compilers) and the exception line (tracebacks) sit at the two ends
+        tail = min(5, max_lines // 4)
+        head = max_lines - tail
+        kept = kept[:head] + [_OMITTED.format(len(kept) - head - tail)] + kept[-tail:]
+    text = '\n'.join(kept)
+    if len(text) > max_chars:
+        half = max_chars // 2
+        text = f"{text[:half]}\n{_OMITTED.format(text[half:-half].count(chr(10)) + 1)}\n{text[-half:]}"
+    return text
+
+
+def cap_code(code: str, max_chars: Optional[int] = None) -> str:
+    """The code without trailing whitespace or blank runs, and only its head and tail when still too long."""
+    max_chars = max_chars or getattr(settings, 'AI_PROMPT_MAX_CODE_CHARS', 12000)
+    lines = [line.rstrip() for line in (code or '').splitlines()]
+    text = re.sub(r"\n{3,}", "\n\n", '\n'.join(lines)).strip('\n')
+    if len(text) <= max_chars:
+        return text
+    head = text[:max_chars * 2 // 3].rsplit('\n', 1)[0]
+    tail = text[-(max_chars // 3):].split('\n', 1)[-1]
+    omitted = text.count('\n') - head.count('\n') - tail.count('\n') - 1
+    return f"{head}\n{_OMITTED.format(omitted)}\n{tail}"
+
+
+def summary_key(problem) -> str:
+    """Cache key of a problem's statement summary; editing the problem moves it on."""
+    return f"ai:problem_summary:{problem.pk}:{problem.updated_at.timestamp():.6f}"
+
+
+def needs_summary(statement: str) -> bool:
+    return len(statement or '') > getattr(settings, 'AI_PROMPT_SUMMARY_THRESHOLD', 2000)
+
+
+class PromptBuilder:
+    """Compacts the parts of one prompt and records its size before and after."""
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.saved = 0
+
+    def _replace(self, raw: str, compact: str) -> str:
+        self.saved += len(raw or '') - len(compact)
+        return compact
+
+    def code(self, code: str) -> str:
+        return self._replace(code, cap_code(code))
+
+    def logs(self, raw_logs: str) -> str:
+        return self._replace(raw_logs, compact_logs(raw_logs))
+
+    def statement(self, problem_statement: str, summary: Optional[str] = None) -> str:
+        return self._replace(problem_statement, summary) if summary else problem_statement
+
+    def build(self, prompt: str) -> str:
+        AI_PROMPT_TOKENS.labels(self.operation, 'raw').inc(-(-(len(prompt) + self.saved) // CHARS_PER_TOKEN))
+        AI_PROMPT_TOKENS.labels(self.operation, 'sent').inc(estimate_tokens(prompt))
+        return prompt
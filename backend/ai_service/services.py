@@ -1,19 +1,238 @@
-from google import genai
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+import asyncio
 import json
+import logging
+import time
 
-import os
-from dotenv import load_dotenv
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from backend.metrics import record_cache, track_ai_call
+from .cache import in_flight, prompt_hash, result_cache
+from .client import AIBusyError, get_client
+from .models import AIAnalysis
+from .prompts import PromptBuilder, needs_summary, summary_key
+from .streaming import IncrementalJSONParser
+from .usage import AIBudgetExceeded, acheck_budget, arecord_usage, check_budget, estimated_response, record_usage
+
+# AIAnalysis.analysis_type recorded with each operation's cached results
+ANALYSIS_TYPES = {
+    'analyze_complexity': 'complexity',
+    'explain_problem': 'explanation',
+    'provide_hint': 'hint',
+    'generate_error_report': 'debug',
+    'generate_test_cases': 'testcases',
+    'generate_test_inputs': 'testcases',
+    'summarize_problem': 'explanation',
+    'analyze_code': 'review',
+}
+
+logger = logging.getLogger(__name__)
 
-load_dotenv()
 
 class AIAnalysisService:
     def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable is not configured on the server. Please add it to your server configuration/environment variables.")
-        self.client = genai.Client(api_key=api_key)
-        self.model_name = "gemini-3-flash-preview"
+        # Cheap: the client (and its connection pool) is shared by the whole process
+        self.client = get_client()
+        self.model_name = self.client.backend.model_name(getattr(settings, 'GEMINI_MODEL', 'gemini-3-flash-preview'))
+        self.billed = self.client.backend.billed
+
+    def _generate(self, operation: str, prompt: str, user=None):
+        """
+        Calls the model once `user` and the site are within their daily token
+        budgets, recording latency, errors and token usage per operation.
+        """
+        check_budget(user)
+        timeout = getattr(settings, 'AI_OPERATION_TIMEOUTS', {}).get(operation)
+        start = time.perf_counter()
+        with track_ai_call(operation):
+            response = self.client.generate(self.model_name, prompt, timeout=timeout, operation=operation)
+        record_usage(
+            operation, ANALYSIS_TYPES[operation], self.model_name, response, time.perf_counter() - start, user,
+            billed=self.billed,
+        )
+        return response
+
+    async def _agenerate(self, operation: str, prompt: str, user=None):
+        """_generate() for coroutines."""
+        await acheck_budget(user)
+        timeout = getattr(settings, 'AI_OPERATION_TIMEOUTS', {}).get(operation)
+        start = time.perf_counter()
+        with track_ai_call(operation):
+            response = await self.client.agenerate(self.model_name, prompt, timeout=timeout, operation=operation)
+        await arecord_usage(
+            operation, ANALYSIS_TYPES[operation], self.model_name, response, time.perf_counter() - start, user,
+            billed=self.billed,
+        )
+        return response
+
+    def _complete(self, operation: str, prompt: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        The parsed response to a prompt, served from the result cache when the same
+        operation, model and prompt were answered before, or shared with an identical
+        request that is already waiting for the model. `context` holds AIAnalysis
+        fields (problem, submission, user, user_code, programming_language) for the
+        submission's history row, see _record().
+        """
+        key = prompt_hash(operation, self.model_name, prompt)
+        cached = result_cache.get(key)
+        if cached is not None:
+            self._record(operation, cached, context)
+            return cached
+
+        def generate():
+            start = time.perf_counter()
+            response = self._generate(operation, prompt, (context or {}).get('user'))
+            output = self._clean_and_parse_response(response.text)
+            # Unparseable responses are not cached, so the next request tries again
+            if 'raw_response' not in output:
+                result_cache.set(
+                    key,
+                    output,
+                    analysis_type=ANALYSIS_TYPES[operation],
+                    model_name=self.model_name,
+                    processing_time=time.perf_counter() - start,
+                    **(context or {}),
+                )
+            return output
+
+        # Concurrent identical requests share one model call
+        output = in_flight.run(key, generate)
+        self._record(operation, output, context)
+        return output
+
+    async def _acomplete(self, operation: str, prompt: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """_complete() on the event loop, using the async client."""
+        key = prompt_hash(operation, self.model_name, prompt)
+        cached = await result_cache.aget(key)
+        if cached is not None:
+            await self._arecord(operation, cached, context)
+            return cached
+
+        async def generate():
+            start = time.perf_counter()
+            response = await self._agenerate(operation, prompt, (context or {}).get('user'))
+            output = self._clean_and_parse_response(response.text)
+            if 'raw_response' not in output:
+                await result_cache.aset(
+                    key,
+                    output,
+                    analysis_type=ANALYSIS_TYPES[operation],
+                    model_name=self.model_name,
+                    processing_time=time.perf_counter() - start,
+                    **(context or {}),
+                )
+            return output
+
+        output = await in_flight.arun(key, generate)
+        await self._arecord(operation, output, context)
+        return output
+
+    async def _astream(self, operation: str, prompt: str,
+                       context: Optional[Dict[str, Any]] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        _acomplete() as (event, data) pairs: 'delta' carries raw text as it is
+        generated, 'field' each top-level key of the JSON object once its value is
+        complete, and 'result' the parsed response, which is cached like any other.
+        A cached result, or one shared with an identical request already streaming
+        (see SingleFlight), is replayed as its fields.
+        """
+        key = prompt_hash(operation, self.model_name, prompt)
+        cached = await result_cache.aget(key)
+        if cached is not None:
+            for event in self._replay(cached):
+                yield event
+            await self._arecord(operation, cached, context)
+            yield 'result', cached
+            return
+
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def generate():
+            user = (context or {}).get('user')
+            await acheck_budget(user)
+            parser = IncrementalJSONParser()
+            start = time.perf_counter()
+            timeout = getattr(settings, 'AI_OPERATION_TIMEOUTS', {}).get(operation)
+            chunk = None
+            try:
+                with track_ai_call(operation):
+                    async for chunk in self.client.astream(self.model_name, prompt, timeout=timeout, operation=operation):
+                        if not chunk.text:
+                            continue
+                        events.put_nowait(('delta', {'text': chunk.text}))
+                        for field, value in parser.feed(chunk.text):
+                            events.put_nowait(('field', {'key': field, 'value': value}))
+            finally:
+                # Usage arrives with the last chunk; a stream cut short (the client went away) is estimated instead
+                response = chunk if getattr(chunk, 'usage_metadata', None) else estimated_response(prompt, parser.text)
+                await arecord_usage(
+                    operation, ANALYSIS_TYPES[operation], self.model_name, response, time.perf_counter() - start, user,
+                    billed=self.billed,
+                )
+            output = self._clean_and_parse_response(parser.text)
+            if 'raw_response' not in output:
+                await result_cache.aset(
+                    key,
+                    output,
+                    analysis_type=ANALYSIS_TYPES[operation],
+                    model_name=self.model_name,
+                    processing_time=time.perf_counter() - start,
+                    **(context or {}),
+                )
+            return output
+
+        # The leader's events are streamed as they arrive; identical requests wait for its result instead
+        call = asyncio.ensure_future(in_flight.arun(key, generate))
+        streamed = False
+        try:
+            while not call.done() or not events.empty():
+                next_event = asyncio.ensure_future(events.get())
+                await asyncio.wait({next_event, call}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_event.done():
+                    next_event.cancel()
+                    continue
+                streamed = True
+                yield next_event.result()
+            output = call.result()
+        finally:
+            # Stops the model call when our client goes away; coalesced requests then make their own
+            call.cancel()
+        if not streamed:
+            for event in self._replay(output):
+                yield event
+        await self._arecord(operation, output, context)
+        yield 'result', output
+
+    @staticmethod
+    def _replay(result: Any):
+        if isinstance(result, dict):
+            for field, value in result.items():
+                yield 'field', {'key': field, 'value': value}
+
+    def _record(self, operation: str, output: Dict[str, Any], context: Optional[Dict[str, Any]]) -> None:
+        """
+        Keeps a history row of an answered request about a submission, whether or not
+        it was served from the cache; cache entries are separate rows (see
+        ai_service/cache.py). Requests about problems alone (explanations, hints)
+        only have the cache entry, so they add no writes to cache hits.
+        """
+        context = context or {}
+        if not context.get('submission'):
+            return
+        try:
+            AIAnalysis.objects.create(
+                analysis_type=ANALYSIS_TYPES[operation],
+                model_name=self.model_name,
+                analysis_result=output,
+                **context,
+            )
+        except DatabaseError:
+            logger.exception("Could not record AI analysis for %s", operation)
+
+    async def _arecord(self, operation: str, output: Dict[str, Any], context: Optional[Dict[str, Any]]) -> None:
+        await sync_to_async(self._record)(operation, output, context)
 
     def _clean_and_parse_response(self, output: str) -> Dict[str, Any]:
         """Helper method to clean and parse AI response."""
@@ -33,16 +252,76 @@ class AIAnalysisService:
                 "raw_response": output
             }
 
-    def analyze_complexity(self, code: str, language: str, problem_statement: str) -> Dict[str, Any]:
-        """Analyze the time and space complexity of the given code."""
-        prompt = f"""
+    def _summarize_problem_prompt(self, problem_statement: str) -> str:
+        return f"""
+        Summarize this programming problem statement for a reviewer of solutions to it:
+        {problem_statement}
+
+        Keep the task, the input and output format, every constraint and limit, and one example exactly;
+        drop the story, repetition and formatting.
+
+        Respond with ONLY a raw JSON object of the form {{"summary": "..."}}, no markdown or additional text.
+        """
+
+    def _cached_summary(self, problem_statement: str, context: Optional[Dict[str, Any]]):
+        """(cache key, cached summary) for a statement worth summarizing; (None, None) otherwise."""
+        problem = (context or {}).get('problem')
+        if problem is None or not needs_summary(problem_statement):
+            return None, None
+        key = summary_key(problem)
+        return key, cache.get(key)
+
+    def _store_summary(self, key: str, result: Any) -> Optional[str]:
+        summary = result.get('summary') if isinstance(result, dict) else None
+        if not isinstance(summary, str) or not summary.strip():
+            return None
+        cache.set(key, summary, getattr(settings, 'AI_PROBLEM_SUMMARY_TTL', 7 * 24 * 3600))
+        return summary
+
+    def _problem_summary(self, problem_statement: str, context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        A compact summary of a long statement of context['problem'], made once per
+        Problem.updated_at; None to send the statement as it is.
+        """
+        key, summary = self._cached_summary(problem_statement, context)
+        if key is None:
+            return None
+        record_cache('ai_problem_summary', summary is not None)
+        if summary is not None:
+            return summary
+        try:
+            result = self._complete('summarize_problem', self._summarize_problem_prompt(problem_statement),
+                                    {'problem': context['problem']})
+        except Exception:
+            return None
+        return self._store_summary(key, result)
+
+    async def _aproblem_summary(self, problem_statement: str, context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """_problem_summary() for coroutines."""
+        key, summary = self._cached_summary(problem_statement, context)
+        if key is None:
+            return None
+        record_cache('ai_problem_summary', summary is not None)
+        if summary is not None:
+            return summary
+        try:
+            result = await self._acomplete('summarize_problem', self._summarize_problem_prompt(problem_statement),
+                                           {'problem': context['problem']})
+        except Exception:
+            return None
+        return self._store_summary(key, result)
+
+    def _analyze_complexity_prompt(self, code: str, language: str, problem_statement: str,
+                                   summary: Optional[str] = None) -> str:
+        prompt = PromptBuilder('analyze_complexity')
+        return prompt.build(f"""
         Analyze the following {language} code and problem statement:
         
         Problem:
-        {problem_statement}
+        {prompt.statement(problem_statement, summary)}
         
         Code:
-        {code}
+        {prompt.code(code)}
 
         Provide response as pure JSON with these keys:
         - time_complexity: Big O notation with explanation
@@ -52,23 +331,44 @@ class AIAnalysisService:
         - errors: List of errors if any (empty list if none)
         
         Respond with only the JSON object, no markdown or additional text.
-        """
+        """)
+
+    @staticmethod
+    def _analyze_complexity_fallback(e: Exception) -> Dict[str, Any]:
+        return {
+            "time_complexity": "N/A",
+            "space_complexity": "N/A",
+            "explanation": "Complexity analysis failed. Please verify your AI API key and connection.",
+            "optimization": "N/A",
+            "errors": [str(e)]
+        }
+
+    def analyze_complexity(self, code: str, language: str, problem_statement: str,
+                           context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Analyze the time and space complexity of the given code; raises AIBudgetExceeded when the budget is used up."""
+        summary = self._problem_summary(problem_statement, context)
+        prompt = self._analyze_complexity_prompt(code, language, problem_statement, summary)
         try:
-            response = self.client.models.generate_content(model=self.model_name, contents=prompt)
-            output = self._clean_and_parse_response(response.text)
-            return output
+            return self._complete('analyze_complexity', prompt, context)
+        except AIBudgetExceeded:
+            raise
         except Exception as e:
-            return {
-                "time_complexity": "N/A",
-                "space_complexity": "N/A",
-                "explanation": "Complexity analysis failed. Please verify your AI API key and connection.",
-                "optimization": "N/A",
-                "errors": [str(e)]
-            }
+            return self._analyze_complexity_fallback(e)
 
-    def explain_problem(self, problem_statement: str) -> Dict[str, Any]:
-        """Provide a detailed explanation of the problem statement."""
-        prompt = f"""
+    async def aanalyze_complexity(self, code: str, language: str, problem_statement: str,
+                                  context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async analyze_complexity(); raises AIBusyError and AIBudgetExceeded instead of falling back when the model is saturated or the budget used up."""
+        summary = await self._aproblem_summary(problem_statement, context)
+        prompt = self._analyze_complexity_prompt(code, language, problem_statement, summary)
+        try:
+            return await self._acomplete('analyze_complexity', prompt, context)
+        except (AIBusyError, AIBudgetExceeded):
+            raise
+        except Exception as e:
+            return self._analyze_complexity_fallback(e)
+
+    def _explain_problem_prompt(self, problem_statement: str) -> str:
+        return f"""
         Explain this programming problem:
         {problem_statement}
 
@@ -80,29 +380,60 @@ class AIAnalysisService:
         
         Respond with only the JSON object, no markdown or additional text.
         """
+
+    @staticmethod
+    def _explain_problem_fallback(e: Exception) -> Dict[str, Any]:
+        return {
+            "problem_summary": "Failed to generate AI explanation. Please check your API key and connection.",
+            "approach": "Check configuration.",
+            "algorithms": [],
+            "example": None,
+            "error": str(e)
+        }
+
+    def explain_problem(self, problem_statement: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Provide a detailed explanation of the problem statement; raises AIBudgetExceeded when the budget is used up."""
+        prompt = self._explain_problem_prompt(problem_statement)
         try:
-            response = self.client.models.generate_content(model=self.model_name, contents=prompt)
-            output = self._clean_and_parse_response(response.text)
-            return output
+            return self._complete('explain_problem', prompt, context)
+        except AIBudgetExceeded:
+            raise
         except Exception as e:
-            return {
-                "problem_summary": "Failed to generate AI explanation. Please check your API key and connection.",
-                "approach": "Check configuration.",
-                "algorithms": [],
-                "example": None,
-                "error": str(e)
-            }
+            return self._explain_problem_fallback(e)
 
-    def provide_hint(self, problem_statement: str, user_code: str, language: str) -> Dict[str, Any]:
-        """Provide hints for the given problem and user code."""
-        prompt = f"""
+    async def aexplain_problem(self, problem_statement: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async explain_problem(); raises AIBusyError and AIBudgetExceeded instead of falling back when the model is saturated or the budget used up."""
+        prompt = self._explain_problem_prompt(problem_statement)
+        try:
+            return await self._acomplete('explain_problem', prompt, context)
+        except (AIBusyError, AIBudgetExceeded):
+            raise
+        except Exception as e:
+            return self._explain_problem_fallback(e)
+
+    async def astream_explain_problem(self, problem_statement: str,
+                                      context: Optional[Dict[str, Any]] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """explain_problem() as a stream of events (see _astream()); failures end it with an 'error' event."""
+        prompt = self._explain_problem_prompt(problem_statement)
+        try:
+            async for event in self._astream('explain_problem', prompt, context):
+                yield event
+        except AIBudgetExceeded as e:
+            yield 'error', {'error': str(e)}
+        except Exception as e:
+            yield 'error', self._explain_problem_fallback(e)
+
+    def _provide_hint_prompt(self, problem_statement: str, user_code: str, language: str,
+                             summary: Optional[str] = None) -> str:
+        prompt = PromptBuilder('provide_hint')
+        return prompt.build(f"""
         Provide progressive hints for this programming problem and user's draft code.
         
         Problem Description:
-        {problem_statement}
+        {prompt.statement(problem_statement, summary)}
         
         User's Draft Code (Language: {language}):
-        {user_code}
+        {prompt.code(user_code)}
 
         Return a JSON object matching this structure EXACTLY. Never reveal the complete solution or full code.
         
@@ -130,31 +461,68 @@ class AIAnalysisService:
         }}
         
         Respond with ONLY the raw JSON object, no markdown block formatting, no ```json formatting, and no additional text.
-        """
+        """)
+
+    @staticmethod
+    def _provide_hint_fallback(e: Exception) -> Dict[str, Any]:
+        return {
+            "hint": "Could not retrieve progressive hints. Please check server settings.",
+            "approach": ["Verify API key configured on the server."],
+            "derivation": [],
+            "complexity": {
+                "time": "N/A",
+                "space": "N/A"
+            },
+            "error": str(e)
+        }
+
+    def provide_hint(self, problem_statement: str, user_code: str, language: str,
+                     context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Provide hints for the given problem and user code; raises AIBudgetExceeded when the budget is used up."""
+        summary = self._problem_summary(problem_statement, context)
+        prompt = self._provide_hint_prompt(problem_statement, user_code, language, summary)
         try:
-            response = self.client.models.generate_content(model=self.model_name, contents=prompt)
-            output = self._clean_and_parse_response(response.text)
-            return output
+            return self._complete('provide_hint', prompt, context)
+        except AIBudgetExceeded:
+            raise
         except Exception as e:
-            return {
-                "hint": "Could not retrieve progressive hints. Please check server settings.",
-                "approach": ["Verify API key configured on the server."],
-                "derivation": [],
-                "complexity": {
-                    "time": "N/A",
-                    "space": "N/A"
-                },
-                "error": str(e)
-            }
+            return self._provide_hint_fallback(e)
+
+    async def aprovide_hint(self, problem_statement: str, user_code: str, language: str,
+                            context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async provide_hint(); raises AIBusyError and AIBudgetExceeded instead of falling back when the model is saturated or the budget used up."""
+        summary = await self._aproblem_summary(problem_statement, context)
+        prompt = self._provide_hint_prompt(problem_statement, user_code, language, summary)
+        try:
+            return await self._acomplete('provide_hint', prompt, context)
+        except (AIBusyError, AIBudgetExceeded):
+            raise
+        except Exception as e:
+            return self._provide_hint_fallback(e)
+
+    async def astream_provide_hint(self, problem_statement: str, user_code: str, language: str,
+                                   context: Optional[Dict[str, Any]] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """provide_hint() as a stream of events (see _astream()); failures end it with an 'error' event."""
+        try:
+            summary = await self._aproblem_summary(problem_statement, context)
+            prompt = self._provide_hint_prompt(problem_statement, user_code, language, summary)
+            async for event in self._astream('provide_hint', prompt, context):
+                yield event
+        except AIBudgetExceeded as e:
+            yield 'error', {'error': str(e)}
+        except Exception as e:
+            yield 'error', self._provide_hint_fallback(e)
 
-    def generate_error_report(self, raw_logs: str, language: str, is_compile: bool) -> Dict[str, Any]:
+    def generate_error_report(self, raw_logs: str, language: str, is_compile: bool,
+                              context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze compiler or runtime logs and return a user-friendly structured error report."""
         error_type = "Compilation Error" if is_compile else "Runtime Error"
-        prompt = f"""
+        builder = PromptBuilder('generate_error_report')
+        prompt = builder.build(f"""
         Analyze this {error_type} message from code execution on an online judge:
         Language: {language}
         Raw Logs:
-        {raw_logs}
+        {builder.logs(raw_logs)}
 
         Provide a structured response in raw JSON format with the following keys:
         - type: The error type ("Compilation Error" or "Runtime Error")
@@ -164,10 +532,9 @@ class AIAnalysisService:
         - suggestion: An actionable, helpful tip or checklist to fix this specific issue
 
         Respond with ONLY the raw JSON object, no markdown or additional text.
-        """
+        """)
         try:
-            response = self.client.models.generate_content(model=self.model_name, contents=prompt)
-            return self._clean_and_parse_response(response.text)
+            return self._complete('generate_error_report', prompt, context)
         except Exception as e:
             return {
                 "type": error_type,
@@ -177,7 +544,7 @@ class AIAnalysisService:
                 "suggestion": "Review your code syntax and logic."
             }
 
-    def generate_test_cases(self, title: str, description: str) -> Dict[str, Any]:
+    def generate_test_cases(self, title: str, description: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Generate test cases for a given problem statement using Gemini."""
         prompt = f"""
         Generate test cases for this programming problem:
@@ -196,8 +563,7 @@ class AIAnalysisService:
         Respond with ONLY the raw JSON object, no markdown or additional text.
         """
         try:
-            response = self.client.models.generate_content(model=self.model_name, contents=prompt)
-            return self._clean_and_parse_response(response.text)
+            return self._complete('generate_test_cases', prompt, context)
         except Exception as e:
             return {
                 "sample": [],
@@ -208,9 +574,41 @@ class AIAnalysisService:
                 "error": str(e)
             }
 
-    def analyze_code(self, code: str, language: str) -> Dict[str, Any]:
-        """Analyze the given code and return structural code quality, complexity and optimizations suggestions."""
+    def generate_test_inputs(self, title: str, description: str, categories: List[str], per_category: int,
+                             batch: int = 1, known_inputs: Optional[List[str]] = None,
+                             context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Generate test inputs (without outputs) for every category in one request.
+        Outputs come from running a reference solution, so the model is not asked
+        for them. `batch` and `known_inputs` make follow-up requests ask for new
+        inputs instead of being answered from the cache.
+        """
+        known = ''
+        if known_inputs:
+            shown = '\n'.join(f"- {json.dumps(text[:200])}" for text in known_inputs[:20])
+            known = f"""
+        These inputs already exist, do not repeat them:
+        {shown}
+        """
         prompt = f"""
+        Generate test inputs for this programming problem (batch {batch}):
+        Title: {title}
+        Description:
+        {description}
+        {known}
+        Provide a structured response in raw JSON format with these keys EXACTLY: {', '.join(categories)}.
+        Each key maps to a list of {per_category} objects with "input" (the complete stdin for one run, as a string)
+        and "explanation" (string, what the test covers). Inputs must follow the input format and constraints
+        of the problem exactly; keep stress inputs under 100KB.
+        Respond with ONLY the raw JSON object, no markdown or additional text.
+        """
+        try:
+            return self._complete('generate_test_inputs', prompt, context)
+        except Exception as e:
+            return {**{category: [] for category in categories}, "error": str(e)}
+
+    def _analyze_code_prompt(self, code: str, language: str) -> str:
+        return f"""
         Analyze this code thoroughly and return ONLY pure JSON with this structure:
         {{
           "language": "{language}",
@@ -231,19 +629,38 @@ class AIAnalysisService:
         Code:
         {code}
         """
+
+    @staticmethod
+    def _analyze_code_fallback(e: Exception, language: str) -> Dict[str, Any]:
+        return {
+            "language": language,
+            "timeComplexity": "N/A",
+            "spaceComplexity": "N/A",
+            "syntaxErrors": f"Error during analysis: {str(e)}",
+            "codeQuality": {
+                "maintainability": "N/A",
+                "readability": "N/A",
+                "style": "N/A"
+            },
+            "optimizations": []
+        }
+
+    def analyze_code(self, code: str, language: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Analyze the given code and return structural code quality, complexity and optimizations suggestions; raises AIBudgetExceeded when the budget is used up."""
+        prompt = self._analyze_code_prompt(code, language)
         try:
-            response = self.client.models.generate_content(model=self.model_name, contents=prompt)
-            return self._clean_and_parse_response(response.text)
+            return self._complete('analyze_code', prompt, context)
+        except AIBudgetExceeded:
+            raise
         except Exception as e:
-            return {
-                "language": language,
-                "timeComplexity": "N/A",
-                "spaceComplexity": "N/A",
-                "syntaxErrors": f"Error during analysis: {str(e)}",
-                "codeQuality": {
-                    "maintainability": "N/A",
-                    "readability": "N/A",
-                    "style": "N/A"
-                },
-                "optimizations": []
-            }
\ No newline at end of file
+            return self._analyze_code_fallback(e, language)
+
+    async def aanalyze_code(self, code: str, language: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async analyze_code(); raises AIBusyError and AIBudgetExceeded instead of falling back when the model is saturated or the budget used up."""
+        prompt = self._analyze_code_prompt(code, language)
+        try:
+            return await self._acomplete('analyze_code', prompt, context)
+        except (AIBusyError, AIBudgetExceeded):
+            raise
+        except Exception as e:
+            return self._analyze_code_fallback(e, language)
@@ -0,0 +1,89 @@
+"""
+Incremental parsing of a streamed JSON object.
+
+The model is asked for a single JSON object, possibly wrapped in a ```json
+fence. IncrementalJSONParser is fed the text as it arrives and returns each
+top-level field as soon as its value is complete, so a streaming endpoint can
+show the hint before the derivation has been generated.
+"""
+import json
+from typing import Any, List, Tuple
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self.text = ''
+        self.pos = 0
+        self.started = False
+        self.done = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.state = 'key'  # at depth 1: 'key', 'colon' or 'value'
+        self.key = None
+        self.token_start = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Appends a chunk; returns the (key, value) pairs completed by it."""
+        self.text += chunk
+        fields = []
+        text = self.text
+        while self.pos < len(text) and not self.done:
+            ch = text[self.pos]
+            if not self.started:
+                # Skips a markdown fence or any other preamble
+                if ch == '{':
+                    self.started = True
+                    self.depth = 1
+            elif self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.state == 'key':
+                        self.key = self._load(self.token_start, self.pos + 1)
+                        self.state = 'colon'
+            elif self.state == 'key':
+                if ch == '"':
+                    self.in_string = True
+                    self.token_start = self.pos
+                elif ch == '}':
+                    self.done = True
+            elif self.state == 'colon':
+                if ch == ':':
+                    self.state = 'value'
+                    self.token_start = None
+            else:
+                if self.token_start is None and not ch.isspace():
+                    self.token_start = self.pos
+                if ch == '"':
+                    self.in_string = True
+                elif ch in '{[':
+                    self.depth += 1
+                elif ch in '}]' and self.depth > 1:
+                    self.depth -= 1
+                elif self.depth == 1 and ch in ',}':
+                    self._finish_value(fields)
+                    self.done = ch == '}'
+            self.pos += 1
+        return fields
+
+    def _finish_value(self, fields):
+        if self.token_start is not None and isinstance(self.key, str):
+            value = self._load(self.token_start, self.pos)
+            if value is not _INVALID:
+                fields.append((self.key, value))
+        self.state = 'key'
+        self.key = None
+        self.token_start = None
+
+    def _load(self, start, end):
+        try:
+            return json.loads(self.text[start:end])
+        except ValueError:
+            return _INVALID
+
+
+_INVALID = object()
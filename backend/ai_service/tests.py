@@ -1,3 +1,61 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from .error_patterns import classify_error
+
+GCC_MISSING_SEMICOLON = """\
+solution.cpp: In function ‘int main()’:
+solution.cpp:5:14: error: expected ‘;’ before ‘return’
+    5 |     int x = 1
+      |              ^
+      |              ;
+    6 |     return 0;
+"""
+
+GCC_UNDECLARED = """\
+solution.cpp: In function 'int main()':
+solution.cpp:7:5: error: 'cout' was not declared in this scope; did you mean 'std::cout'?
+"""
+
+JAVAC_CANNOT_FIND_SYMBOL = """\
+Main.java:4: error: cannot find symbol
+        int y = count + 1;
+                ^
+  symbol:   variable count
+  location: class Main
+1 error
+"""
+
+PYTHON_INDEX_ERROR = """\
+Traceback (most recent call last):
+  File "/tmp/run/solution.py", line 9, in <module>
+    main()
+  File "/tmp/run/solution.py", line 6, in main
+    print(values[3])
+          ~~~~~~^^^
+IndexError: list index out of range
+"""
+
+
+class ClassifyErrorTests(SimpleTestCase):
+    # (language, is_compile, raw logs, exit code, expected message, expected line)
+    CASES = [
+        ('cpp', True, GCC_MISSING_SEMICOLON, 1, "Missing semicolon: a statement is not terminated with ';'.", 5),
+        ('cpp', True, GCC_UNDECLARED, 1, "'cout' is used but never declared.", 7),
+        ('java', True, JAVAC_CANNOT_FIND_SYMBOL, 1, "The variable 'count' is used but never declared.", 4),
+        ('python', False, PYTHON_INDEX_ERROR, 1, "Index out of range (list index out of range).", 6),
+        ('cpp', False, '', -11, "Segmentation fault: the program accessed memory it does not own.", None),
+        ('cpp', False, 'Segmentation fault (core dumped)\n', 139, "Segmentation fault: the program accessed memory it does not own.", None),
+    ]
+
+    def test_recognised_errors(self):
+        for language, is_compile, logs, exit_code, message, line in self.CASES:
+            with self.subTest(language=language, message=message, exit_code=exit_code):
+                report = classify_error(logs, language, is_compile, exit_code)
+                self.assertIsNotNone(report)
+                self.assertEqual(report['type'], 'Compilation Error' if is_compile else 'Runtime Error')
+                self.assertEqual(report['message'], message)
+                self.assertEqual(report['line'], line)
+
+    def test_unrecognised_error_is_left_to_the_model(self):
+        self.assertIsNone(classify_error('solution.cpp:3:1: error: something new\n', 'cpp', True, 1))
+        self.assertIsNone(classify_error('', 'cpp', False, 1))
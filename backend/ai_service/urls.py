@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     # Code analysis endpoints
@@ -9,4 +9,12 @@ urlpatterns = [
     # Problem explanation and hints
     path('explain-problem/<int:problem_id>/', views.explain_problem, name='explain_problem'),
     path('get-hint/', views.get_hint, name='get_hint'),
-]
\ No newline at end of file
+
+    # Async variants, for the ASGI deployment (see backend/asgi.py)
+    path('async/analyze-submission/<int:problem_id>/', async_views.analyze_submission, name='analyze_submission_async'),
+    path('async/analyze-code/', async_views.analyze_code, name='analyze_code_async'),
+    path('async/explain-problem/<int:problem_id>/', async_views.explain_problem, name='explain_problem_async'),
+    path('async/get-hint/', async_views.get_hint, name='get_hint_async'),
+    path('async/explain-problem/<int:problem_id>/stream/', async_views.stream_explain_problem, name='explain_problem_stream'),
+    path('async/get-hint/stream/', async_views.stream_get_hint, name='get_hint_stream'),
+]
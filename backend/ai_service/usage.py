@@ -0,0 +1,176 @@
+"""
+Token accounting and daily AI budgets.
+
+Every model call (cache hits cost nothing) is checked against two daily token
+budgets before it is made: AI_USER_DAILY_TOKENS for the calling user and
+AI_GLOBAL_DAILY_TOKENS for the whole site. Both are counters keyed by the UTC day
+and bumped atomically after each call, so the check is one lookup rather than an
+aggregate over AIUsage. AI_BUDGET_STORE picks where they live: 'cache' (add()/incr()
+on the default cache, right when it is shared such as Redis) or 'db' (an
+AIBudgetCounter row per scope and day, the default without CACHE_REDIS_URL). A
+call that starts under budget may overshoot it by its own size; the next one is
+refused with AIBudgetExceeded. The request quota of the async endpoints
+(AI_USER_QUOTA) is counted in the same store, see count_request().
+
+Each call is also written to AIUsage (tokens, latency, model and its cost at the
+AI_TOKEN_PRICES in force) for the cost report in the admin, and counted in the
+ai_tokens_total metric.
+"""
+import logging
+from datetime import timedelta
+from types import SimpleNamespace
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import F
+from django.utils import timezone
+
+from backend.metrics import AI_TOKENS
+
+from .models import AIBudgetCounter, AIUsage
+from .prompts import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Counters outlive their day a little so late increments do not recreate them
+COUNTER_TIMEOUT = 2 * 24 * 3600
+
+
+class AIBudgetExceeded(Exception):
+    """A daily token budget is used up."""
+
+
+def incr_counter(key: str, amount: int, timeout: int) -> int:
+    """Atomically adds `amount` to a cache counter, creating it with `timeout`; the new value."""
+    if cache.add(key, amount, timeout):
+        return amount
+    try:
+        return cache.incr(key, amount)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.add(key, amount, timeout)
+        return amount
+
+
+def _scopes(user_id: Optional[int]) -> List[str]:
+    return ['global'] + ([f"user:{user_id}"] if user_id else [])
+
+
+def _uses_db() -> bool:
+    return getattr(settings, 'AI_BUDGET_STORE', 'cache') == 'db'
+
+
+def _tokens_used(scopes: List[str]) -> Dict[str, int]:
+    """Today's tokens per scope; scopes without any are left out."""
+    day = timezone.now().date()
+    if _uses_db():
+        rows = AIBudgetCounter.objects.filter(scope__in=scopes, day=day).values_list('scope', 'tokens')
+        return dict(rows)
+    keys = {f"ai:tokens:{scope}:{day.isoformat()}": scope for scope in scopes}
+    return {keys[key]: value for key, value in cache.get_many(list(keys)).items()}
+
+
+def _add_tokens(scope: str, amount: int):
+    day = timezone.now().date()
+    if not _uses_db():
+        incr_counter(f"ai:tokens:{scope}:{day.isoformat()}", amount, COUNTER_TIMEOUT)
+        return
+    _incr_row(scope, day, amount)
+
+
+def _incr_row(scope: str, day, amount: int) -> int:
+    """Atomically adds `amount` to the AIBudgetCounter of `scope` and `day`, creating it; the new value."""
+    counter = AIBudgetCounter.objects.filter(scope=scope, day=day)
+    if not counter.update(tokens=F('tokens') + amount):
+        _, created = AIBudgetCounter.objects.get_or_create(scope=scope, day=day, defaults={'tokens': amount})
+        if created:
+            # First counter of the day; neither the budgets nor the quota look further back than today
+            AIBudgetCounter.objects.filter(day__lt=day - timedelta(days=1)).delete()
+            return amount
+        # Lost the race to create it; the row exists now
+        counter.update(tokens=F('tokens') + amount)
+    return counter.values_list('tokens', flat=True).first() or amount
+
+
+def count_request(caller: str, slot: int, window: int) -> int:
+    """
+    Counts one request by `caller` ('user:<id>' or 'ip:<address>') in AI_USER_QUOTA
+    window number `slot`, `window` seconds long; the window's requests so far.
+    """
+    scope = f"quota:{caller}:{slot}"
+    if not _uses_db():
+        return incr_counter(f"ai:{scope}", 1, window)
+    return _incr_row(scope, timezone.now().date(), 1)
+
+
+def check_budget(user=None):
+    """Raises AIBudgetExceeded when the site's or `user`'s tokens for today are used up."""
+    user_limit = getattr(settings, 'AI_USER_DAILY_TOKENS', 0)
+    global_limit = getattr(settings, 'AI_GLOBAL_DAILY_TOKENS', 0)
+    scopes = _scopes(getattr(user, 'pk', None))
+    used = _tokens_used(scopes)
+    if global_limit and used.get('global', 0) >= global_limit:
+        raise AIBudgetExceeded("The daily AI budget for the site has been used up, please try again tomorrow.")
+    if len(scopes) > 1 and user_limit and used.get(scopes[1], 0) >= user_limit:
+        raise AIBudgetExceeded("Your daily AI budget has been used up, please try again tomorrow.")
+
+
+def token_counts(response: Any) -> Tuple[int, int]:
+    """(prompt, response) tokens of a generate_content response or final stream chunk."""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return 0, 0
+    prompt = usage.prompt_token_count or 0
+    output = (usage.candidates_token_count or 0) + (usage.thoughts_token_count or 0)
+    return prompt, output
+
+
+def estimated_response(prompt: str, text: str) -> Any:
+    """Stands in for a response whose usage never arrived (a stream cut short), sized from the text."""
+    usage = SimpleNamespace(
+        prompt_token_count=estimate_tokens(prompt),
+        candidates_token_count=estimate_tokens(text),
+        thoughts_token_count=0,
+    )
+    return SimpleNamespace(usage_metadata=usage)
+
+
+def call_cost(model_name: str, prompt_tokens: int, response_tokens: int) -> Decimal:
+    """USD for one call at AI_TOKEN_PRICES (per million input and output tokens)."""
+    input_price, output_price = getattr(settings, 'AI_TOKEN_PRICES', {}).get(model_name, (0, 0))
+    cost = (Decimal(str(input_price)) * prompt_tokens + Decimal(str(output_price)) * response_tokens) / 1_000_000
+    return cost.quantize(Decimal('0.000001'))
+
+
+def record_usage(operation: str, analysis_type: str, model_name: str, response: Any, latency: float, user=None,
+                 billed: bool = True):
+    """Counts one call's tokens against the budgets (unless not `billed`) and stores it in AIUsage."""
+    prompt_tokens, response_tokens = token_counts(response)
+    AI_TOKENS.labels(operation, 'prompt').inc(prompt_tokens)
+    AI_TOKENS.labels(operation, 'response').inc(response_tokens)
+    user_id = getattr(user, 'pk', None)
+    total = prompt_tokens + response_tokens
+    try:
+        if total and billed:
+            for scope in _scopes(user_id):
+                _add_tokens(scope, total)
+        AIUsage.objects.create(
+            analysis_type=analysis_type,
+            operation=operation,
+            model_name=model_name,
+            user_id=user_id,
+            prompt_tokens=prompt_tokens,
+            response_tokens=response_tokens,
+            latency=latency,
+            cost=call_cost(model_name, prompt_tokens, response_tokens),
+        )
+    except DatabaseError:
+        logger.exception("Could not record AI usage for %s", operation)
+
+
+acheck_budget = sync_to_async(check_budget)
+arecord_usage = sync_to_async(record_usage)
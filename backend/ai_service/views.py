@@ -2,10 +2,19 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from judge.models import Problem, Submission
 from .services import AIAnalysisService
-from .models import AIAnalysis
+from .usage import AIBudgetExceeded
+
+
+def get_visible_problem(request, problem_id):
+    """The problem, or 404 while it is hidden from the caller (see Problem.visible_from)."""
+    problem = get_object_or_404(Problem, id=problem_id)
+    if not problem.is_visible() and not problem.can_preview(request.user):
+        raise Http404
+    return problem
 
 
 @api_view(['POST'])
@@ -13,7 +22,7 @@ from .models import AIAnalysis
 def analyze_submission(request, problem_id):
     """Analyze complexity for existing submission"""
     submission_id = request.data.get('submission_id')
-    problem = get_object_or_404(Problem, id=problem_id)
+    problem = get_visible_problem(request, problem_id)
     
     if not submission_id:
         return Response({'error': 'Submission ID is required'}, status=status.HTTP_400_BAD_REQUEST)
@@ -22,7 +31,18 @@ def analyze_submission(request, problem_id):
     
     try:
         service = AIAnalysisService()
-        result = service.analyze_complexity(submission.code, submission.language, problem.description)
+        result = service.analyze_complexity(
+            submission.code, submission.language, problem.description,
+            context={
+                'user': request.user,
+                'submission': submission,
+                'problem': submission.problem,
+                'user_code': submission.code,
+                'programming_language': submission.language,
+            }
+        )
+    except AIBudgetExceeded as e:
+        return Response({'error': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
     except Exception as e:
         return Response({
             'error': f'AI Service Unavailable: {str(e)}',
@@ -32,18 +52,7 @@ def analyze_submission(request, problem_id):
             'optimization': 'N/A',
             'errors': [str(e)]
         }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
-    
-    user = request.user
-    # Save analysis linked to submission
-    AIAnalysis.objects.create(
-        analysis_type='complexity',
-        user=user,
-        submission=submission,
-        problem=submission.problem,
-        programming_language=submission.language,
-        analysis_result=result,
-    )
-    
+
     return Response(result)
 
 
@@ -51,28 +60,16 @@ def analyze_submission(request, problem_id):
 @permission_classes([AllowAny])
 def explain_problem(request, problem_id):
     """Explain problem statement"""
-    problem = get_object_or_404(Problem, id=problem_id)
-
-    #Check if explanation already exists
-    existing_analysis = AIAnalysis.objects.filter(
-        problem=problem, analysis_type='explanation'
-    ).first()
+    problem = get_visible_problem(request, problem_id)
 
-    if existing_analysis:
-        return Response(existing_analysis.analysis_result)
-    
+    # Explanations are cached per problem statement (see ai_service/cache.py)
     try:
         service = AIAnalysisService()
-        result = service.explain_problem(problem.description)
-        
         user = request.user if request.user.is_authenticated else None
-        AIAnalysis.objects.create(
-            analysis_type='explanation',
-            problem=problem,
-            analysis_result = result,
-            user=user
-        )
+        result = service.explain_problem(problem.description, context={'problem': problem, 'user': user})
         return Response(result)
+    except AIBudgetExceeded as e:
+        return Response({'error': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
     except Exception as e:
         return Response({
             'error': f'AI Service Unavailable: {str(e)}',
@@ -91,22 +88,23 @@ def get_hint(request):
     code = request.data.get('code')
     language = request.data.get('language')
 
-    problem = get_object_or_404(Problem, id=problem_id)
+    problem = get_visible_problem(request, problem_id)
 
     try:
         service = AIAnalysisService()
-        result = service.provide_hint(problem.description, code, language)
-        
         user = request.user if request.user.is_authenticated else None
-        AIAnalysis.objects.create(
-            analysis_type='hint',
-            problem=problem,
-            user_code=code,
-            programming_language=language,
-            analysis_result=result,
-            user=user
+        result = service.provide_hint(
+            problem.description, code, language,
+            context={
+                'problem': problem,
+                'user_code': code or '',
+                'programming_language': (language or '')[:20],
+                'user': user,
+            }
         )
         return Response(result)
+    except AIBudgetExceeded as e:
+        return Response({'error': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
     except Exception as e:
         return Response({
             'error': f'AI Service Unavailable: {str(e)}',
@@ -128,8 +126,14 @@ def analyze_code_view(request):
 
     try:
         service = AIAnalysisService()
-        result = service.analyze_code(code, language)
+        user = request.user if request.user.is_authenticated else None
+        result = service.analyze_code(
+            code, language,
+            context={'user_code': code, 'programming_language': language[:20], 'user': user}
+        )
         return Response(result)
+    except AIBudgetExceeded as e:
+        return Response({'error': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
     except Exception as e:
         return Response({
             'error': f'AI Service Unavailable: {str(e)}',
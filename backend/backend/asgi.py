@@ -3,6 +3,13 @@ ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The async AI endpoints (/api/ai/async/, see ai_service/async_views.py) only pay
+off when served from here, e.g. behind a proxy that routes that prefix to
+
+    gunicorn backend.asgi:application -k uvicorn.workers.UvicornWorker --config gunicorn.conf.py
+
+while everything else stays on the WSGI workers (backend/wsgi.py).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,196 @@
+"""
+Backend-wide Prometheus metrics.
+
+Metrics live in prometheus_client's default registry. Under gunicorn set
+PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py) so every worker writes its
+samples to a shared directory and /metrics/ aggregates all of them; without it
+the endpoint reports the serving process only, which is fine for runserver.
+"""
+import hmac
+import os
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# prometheus_client writes per-process files there as soon as metrics are defined
+if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Request latency by resolved view.',
+    ['view', 'method', 'status'],
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries',
+    'ORM queries executed per request by resolved view.',
+    ['view'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144),
+)
+JUDGE_QUEUE_DEPTH = Gauge(
+    'judge_queue_depth',
+    'Submissions accepted but not yet picked up by a runner.',
+    multiprocess_mode='livesum',
+)
+SANDBOXES_ACTIVE = Gauge(
+    'judge_sandboxes_active',
+    'Sandbox directories currently in use for compiling or running code.',
+    multiprocess_mode='livesum',
+)
+JUDGE_PHASE_SECONDS = Histogram(
+    'judge_phase_duration_seconds',
+    'Time spent in each judging phase.',
+    ['phase', 'language'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+JUDGE_VERDICTS = Counter(
+    'judge_verdicts_total',
+    'Judged submissions by final verdict.',
+    ['language', 'verdict'],
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Cache lookups by cache and result (hit or miss).',
+    ['cache', 'result'],
+)
+AI_LATENCY = Histogram(
+    'ai_request_duration_seconds',
+    'Latency of calls to the Gemini API by operation.',
+    ['operation'],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0),
+)
+AI_ERRORS = Counter(
+    'ai_request_errors_total',
+    'Failed Gemini API calls by operation and exception type.',
+    ['operation', 'error'],
+)
+ERROR_CLASSIFIER = Counter(
+    'error_classifier_requests_total',
+    'Compilation/runtime error reports by language, kind and whether a rule recognised the error (hit) or it went to the model (miss).',
+    ['language', 'kind', 'result'],
+)
+AI_TOKENS = Counter(
+    'ai_tokens_total',
+    'Tokens sent to (prompt) and generated by (response, including thinking) the Gemini API, by operation.',
+    ['operation', 'kind'],
+)
+AI_PROMPT_TOKENS = Counter(
+    'ai_prompt_tokens_total',
+    'Estimated prompt tokens by operation, before (raw) and after (sent) code, logs and problem statements were compacted.',
+    ['operation', 'stage'],
+)
+AI_COALESCED = Counter(
+    'ai_requests_coalesced_total',
+    'AI requests answered by an identical in-flight call, by where it ran (or timeout when waiting gave up).',
+    ['scope'],
+)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+@contextmanager
+def track_sandbox():
+    SANDBOXES_ACTIVE.inc()
+    try:
+        yield
+    finally:
+        SANDBOXES_ACTIVE.dec()
+
+
+@contextmanager
+def track_ai_call(operation: str):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        AI_ERRORS.labels(operation, type(e).__name__).inc()
+        raise
+    finally:
+        AI_LATENCY.labels(operation).observe(time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """Records latency and ORM query count of every request, labelled by resolved view name."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            response = self.get_response(request)
+        self._observe(request, response, time.perf_counter() - start, queries)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        # Under ASGI queries run on executor threads with their own connections, so only latency is recorded
+        self._observe(request, response, time.perf_counter() - start, None)
+        return response
+
+    def _observe(self, request, response, elapsed, queries):
+        # Unresolved paths share one label so scanners cannot explode label cardinality
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+        REQUEST_LATENCY.labels(view, request.method, str(response.status_code)).observe(elapsed)
+        if queries is not None:
+            REQUEST_QUERIES.labels(view).observe(queries)
+
+
+def metrics_authorized(request) -> bool:
+    """The bearer token must match METRICS_TOKEN; without one, metrics are only served with DEBUG on."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        return settings.DEBUG
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}")
+
+
+def render_metrics() -> bytes:
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def metrics_view(request):
+    if not metrics_authorized(request):
+        return HttpResponse(status=401)
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
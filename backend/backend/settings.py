@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from datetime import timedelta
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -56,12 +57,15 @@ INSTALLED_APPS = [
     'ai_service', #Added ai_service app
     'articles',  # Added articles app
     'compilers', # Added compilers app
+    'contests',
+    'plagiarism',
     'rest_framework',
 ]
 
 MIDDLEWARE = [
+    'backend.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware', 
+    'backend.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -109,6 +113,138 @@ DATABASES = {
 }
 
 
+# Judge toolchain
+# Shared build artifacts (precompiled headers, compile cache) live here
+JUDGE_TOOLCHAIN_CACHE_DIR = os.getenv('JUDGE_TOOLCHAIN_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'judge_toolchain'))
+JUDGE_CPP_PCH = os.getenv('JUDGE_CPP_PCH', 'True').lower() == 'true'
+JUDGE_COMPILE_CACHE = os.getenv('JUDGE_COMPILE_CACHE', 'False').lower() == 'true'
+JUDGE_COMPILE_CACHE_MAX_ENTRIES = int(os.getenv('JUDGE_COMPILE_CACHE_MAX_ENTRIES', '512'))
+# 'plain' launches a stock JVM per test; 'cds' adds a per-JDK class-data sharing archive
+JUDGE_JAVA_RUNNER = os.getenv('JUDGE_JAVA_RUNNER', 'plain')
+# Compile Java through one long-lived javac JVM per process instead of a javac process per submission
+JUDGE_JAVA_COMPILE_SERVER = os.getenv('JUDGE_JAVA_COMPILE_SERVER', 'False').lower() == 'true'
+JUDGE_JAVA_COMPILE_SERVER_CONCURRENCY = int(os.getenv('JUDGE_JAVA_COMPILE_SERVER_CONCURRENCY', '2'))
+JUDGE_JAVA_COMPILE_SERVER_HEALTH_INTERVAL = int(os.getenv('JUDGE_JAVA_COMPILE_SERVER_HEALTH_INTERVAL', '30'))
+# 'plain' starts python3 per test; 'forkserver' forks each test from a warmed, pre-imported interpreter
+JUDGE_PYTHON_RUNNER = os.getenv('JUDGE_PYTHON_RUNNER', 'plain')
+
+# Judge phase timing: 'none', 'log', 'prometheus' or a dotted path to a judge.metrics.MetricsSink
+JUDGE_METRICS_SINK = os.getenv('JUDGE_METRICS_SINK', 'none')
+
+# Prometheus metrics at /metrics/; under gunicorn also set PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+# Metrics endpoints require `Authorization: Bearer <METRICS_TOKEN>`; without a token they are only served when DEBUG is on
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+
+# Cache: per-process local memory by default; set CACHE_REDIS_URL to share entries
+# (and invalidations) across gunicorn workers and hosts
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'online-judge',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+if os.getenv('CACHE_REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('CACHE_REDIS_URL'),
+    }
+
+# Leaderboards: 'local' keeps a skip list per process (rebuilt from the database every
+# LEADERBOARD_LOCAL_REFRESH seconds); 'redis' shares sorted sets between all workers
+# (rebuilt every LEADERBOARD_REDIS_REFRESH seconds)
+LEADERBOARD_BACKEND = os.getenv('LEADERBOARD_BACKEND', 'local')
+LEADERBOARD_REDIS_URL = os.getenv('LEADERBOARD_REDIS_URL', os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+LEADERBOARD_LOCAL_REFRESH = int(os.getenv('LEADERBOARD_LOCAL_REFRESH', '60'))
+LEADERBOARD_REDIS_REFRESH = int(os.getenv('LEADERBOARD_REDIS_REFRESH', '600'))
+# 'score' ranks by difficulty points, 'icpc' by solved count then penalty
+LEADERBOARD_GLOBAL_MODE = os.getenv('LEADERBOARD_GLOBAL_MODE', 'score')
+LEADERBOARD_PENALTY_MINUTES = int(os.getenv('LEADERBOARD_PENALTY_MINUTES', '20'))
+
+# Contest scoreboards are re-rendered at most once per this many seconds per contest and freeze state
+CONTEST_SCOREBOARD_REFRESH = int(os.getenv('CONTEST_SCOREBOARD_REFRESH', '10'))
+
+# Plagiarism detection: k-gram length and winnowing window (in normalized tokens), and the
+# minimum similarity / shared fingerprints for a pair to be flagged
+PLAGIARISM_K = int(os.getenv('PLAGIARISM_K', '5'))
+PLAGIARISM_WINDOW = int(os.getenv('PLAGIARISM_WINDOW', '4'))
+PLAGIARISM_THRESHOLD = float(os.getenv('PLAGIARISM_THRESHOLD', '0.6'))
+PLAGIARISM_MIN_SHARED = int(os.getenv('PLAGIARISM_MIN_SHARED', '8'))
+# Fingerprints found in more than this share of a problem's submissions are treated as boilerplate
+PLAGIARISM_COMMON_RATIO = float(os.getenv('PLAGIARISM_COMMON_RATIO', '0.1'))
+
+# AI model backend: 'gemini', 'fake' (offline, see ai_service/backends.py) or a dotted path to an LLMBackend
+AI_BACKEND = os.getenv('AI_BACKEND', 'gemini')
+# Gemini: one pooled client per process. AI_REQUEST_TIMEOUT bounds each attempt (seconds) unless
+# AI_OPERATION_TIMEOUTS overrides it; transient failures are retried AI_MAX_RETRIES times with jittered
+# exponential backoff, and AI_BREAKER_THRESHOLD consecutive failed calls make calls fail fast for AI_BREAKER_RESET seconds
+GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-3-flash-preview')
+AI_REQUEST_TIMEOUT = float(os.getenv('AI_REQUEST_TIMEOUT', '30'))
+AI_OPERATION_TIMEOUTS = {
+    # Error reports hold up a judging worker
+    'generate_error_report': float(os.getenv('AI_ERROR_REPORT_TIMEOUT', '10')),
+}
+AI_MAX_RETRIES = int(os.getenv('AI_MAX_RETRIES', '2'))
+AI_RETRY_BACKOFF = float(os.getenv('AI_RETRY_BACKOFF', '0.5'))
+AI_RETRY_BACKOFF_MAX = float(os.getenv('AI_RETRY_BACKOFF_MAX', '4'))
+AI_BREAKER_THRESHOLD = int(os.getenv('AI_BREAKER_THRESHOLD', '5'))
+AI_BREAKER_RESET = float(os.getenv('AI_BREAKER_RESET', '30'))
+AI_POOL_SIZE = int(os.getenv('AI_POOL_SIZE', '20'))
+
+# The fake backend answers after AI_FAKE_LATENCY plus up to AI_FAKE_LATENCY_JITTER seconds and fails a share
+# AI_FAKE_ERROR_RATE of calls with AI_FAKE_ERROR ('timeout', 'server' or 'bad_request'), drawn from a generator seeded with AI_FAKE_SEED
+AI_FAKE_LATENCY = float(os.getenv('AI_FAKE_LATENCY', '0.2'))
+AI_FAKE_LATENCY_JITTER = float(os.getenv('AI_FAKE_LATENCY_JITTER', '0.1'))
+AI_FAKE_ERROR_RATE = float(os.getenv('AI_FAKE_ERROR_RATE', '0'))
+AI_FAKE_ERROR = os.getenv('AI_FAKE_ERROR', 'server')
+AI_FAKE_SEED = int(os.getenv('AI_FAKE_SEED', '0'))
+
+# Async AI endpoints (/api/ai/async/, served through backend/asgi.py): at most AI_MAX_CONCURRENCY model calls
+# in flight per process, each waiting up to AI_QUEUE_TIMEOUT seconds for a slot, and AI_USER_QUOTA requests
+# per user (or IP) per AI_USER_QUOTA_WINDOW seconds; 0 disables the quota
+AI_MAX_CONCURRENCY = int(os.getenv('AI_MAX_CONCURRENCY', '200'))
+AI_QUEUE_TIMEOUT = float(os.getenv('AI_QUEUE_TIMEOUT', '5'))
+AI_USER_QUOTA = int(os.getenv('AI_USER_QUOTA', '60'))
+AI_USER_QUOTA_WINDOW = int(os.getenv('AI_USER_QUOTA_WINDOW', '3600'))
+
+# AI results are cached per (operation, model, prompt) for AI_CACHE_TTL seconds, in a per-process
+# LRU of AI_CACHE_LOCAL_MAX_ENTRIES and in AIAnalysis rows (trimmed to AI_CACHE_DB_MAX_ENTRIES by prune_ai_cache)
+AI_CACHE_TTL = int(os.getenv('AI_CACHE_TTL', str(7 * 24 * 3600)))
+AI_CACHE_LOCAL_MAX_ENTRIES = int(os.getenv('AI_CACHE_LOCAL_MAX_ENTRIES', '256'))
+AI_CACHE_DB_MAX_ENTRIES = int(os.getenv('AI_CACHE_DB_MAX_ENTRIES', '50000'))
+# Identical AI requests wait up to this many seconds for one in-flight call before calling the model themselves
+AI_SINGLEFLIGHT_TIMEOUT = float(os.getenv('AI_SINGLEFLIGHT_TIMEOUT', '30'))
+
+# Prompt size (ai_service/prompts.py): logs and code are cut to these limits, and problem statements longer than
+# AI_PROMPT_SUMMARY_THRESHOLD characters are replaced by a summary cached for AI_PROBLEM_SUMMARY_TTL seconds per edit
+AI_PROMPT_MAX_LOG_LINES = int(os.getenv('AI_PROMPT_MAX_LOG_LINES', '40'))
+AI_PROMPT_MAX_LOG_CHARS = int(os.getenv('AI_PROMPT_MAX_LOG_CHARS', '4000'))
+AI_PROMPT_MAX_CODE_CHARS = int(os.getenv('AI_PROMPT_MAX_CODE_CHARS', '12000'))
+AI_PROMPT_SUMMARY_THRESHOLD = int(os.getenv('AI_PROMPT_SUMMARY_THRESHOLD', '2000'))
+AI_PROBLEM_SUMMARY_TTL = int(os.getenv('AI_PROBLEM_SUMMARY_TTL', str(7 * 24 * 3600)))
+
+# Token accounting (ai_service/usage.py): each model call is checked against the caller's and the site's tokens for
+# the UTC day (0 disables a budget) and priced at AI_TOKEN_PRICES, USD per million input and output tokens per model
+# The counters must be shared by every worker: 'cache' keeps them in the default cache, which is only shared when
+# CACHE_REDIS_URL is set (the local-memory cache would give each process its own budget and may cull counters);
+# 'db' keeps them in AIBudgetCounter rows
+AI_BUDGET_STORE = os.getenv('AI_BUDGET_STORE', 'cache' if os.getenv('CACHE_REDIS_URL') else 'db')
+AI_USER_DAILY_TOKENS = int(os.getenv('AI_USER_DAILY_TOKENS', '200000'))
+AI_GLOBAL_DAILY_TOKENS = int(os.getenv('AI_GLOBAL_DAILY_TOKENS', '20000000'))
+AI_TOKEN_PRICES = {
+    GEMINI_MODEL: (float(os.getenv('AI_PRICE_INPUT_PER_MTOK', '0.5')), float(os.getenv('AI_PRICE_OUTPUT_PER_MTOK', '3.0'))),
+}
+
+# AI test generation (POST /api/problems/<slug>/testcases/generate/): up to TESTGEN_MAX_BATCHES model requests, each
+# asking for TESTGEN_BATCH_SIZE inputs per category; outputs come from the reference solution, run TESTGEN_CONCURRENCY at a time
+TESTGEN_BATCH_SIZE = int(os.getenv('TESTGEN_BATCH_SIZE', '3'))
+TESTGEN_MAX_BATCHES = int(os.getenv('TESTGEN_MAX_BATCHES', '3'))
+TESTGEN_CONCURRENCY = int(os.getenv('TESTGEN_CONCURRENCY', '4'))
+TESTGEN_MAX_INPUT_BYTES = int(os.getenv('TESTGEN_MAX_INPUT_BYTES', str(256 * 1024)))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
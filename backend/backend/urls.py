@@ -18,6 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .metrics import metrics_view
  
 
 urlpatterns = [
@@ -26,6 +27,9 @@ urlpatterns = [
     path('api/', include('judge.urls')),
     path('api/ai/', include('ai_service.urls')),
     path('api/compilers/', include('compilers.urls')),
+    path('api/contests/', include('contests.urls')),
+    path('api/plagiarism/', include('plagiarism.urls')),
+    path('metrics/', metrics_view, name='metrics'),
 ]
 
 
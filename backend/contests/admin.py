@@ -0,0 +1,33 @@
+from django.contrib import admin
+
+from .models import Contest, ContestProblem, ContestRegistration, ContestSubmission
+
+
+class ContestProblemInline(admin.TabularInline):
+    model = ContestProblem
+    extra = 1
+    raw_id_fields = ['problem']
+
+
+@admin.register(Contest)
+class ContestAdmin(admin.ModelAdmin):
+    list_display = ['id', 'title', 'start_time', 'end_time', 'freeze_at', 'results_published', 'scoring']
+    list_filter = ['scoring', 'results_published', 'start_time']
+    search_fields = ['title', 'slug']
+    inlines = [ContestProblemInline]
+
+
+@admin.register(ContestRegistration)
+class ContestRegistrationAdmin(admin.ModelAdmin):
+    list_display = ['id', 'contest', 'user', 'registered_at']
+    list_filter = ['contest']
+    search_fields = ['user__username']
+    raw_id_fields = ['user']
+
+
+@admin.register(ContestSubmission)
+class ContestSubmissionAdmin(admin.ModelAdmin):
+    list_display = ['submission', 'contest', 'contest_problem', 'user']
+    list_filter = ['contest']
+    search_fields = ['user__username']
+    raw_id_fields = ['submission', 'user']
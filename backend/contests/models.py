@@ -0,0 +1,116 @@
+from django.db import models
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.text import slugify
+from users.models import CustomUser
+from judge.models import Problem, Submission
+
+
+class Contest(models.Model):
+    SCORING_CHOICES = [
+        ('icpc', 'ICPC (solved, then penalty)'),
+        ('score', 'Score (sum of problem points)'),
+    ]
+
+    title = models.CharField(max_length=255)
+    slug = models.SlugField(unique=True, blank=True)
+    description = models.TextField(blank=True)
+    author = models.ForeignKey(CustomUser, null=True, blank=True, on_delete=models.SET_NULL, related_name='authored_contests')
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    # Public scoreboard stops showing verdicts from this moment until results are published
+    freeze_at = models.DateTimeField(null=True, blank=True)
+    results_published = models.BooleanField(default=False)
+    scoring = models.CharField(max_length=10, choices=SCORING_CHOICES, default='icpc')
+    penalty_minutes = models.PositiveIntegerField(default=20, help_text="ICPC penalty per rejected attempt")
+    problems = models.ManyToManyField(Problem, through='ContestProblem', related_name='contests')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-start_time']
+
+    def clean(self):
+        if self.end_time <= self.start_time:
+            raise ValidationError('The contest must end after it starts.')
+        if self.freeze_at and not self.start_time <= self.freeze_at <= self.end_time:
+            raise ValidationError('The scoreboard freeze must fall within the contest.')
+
+    def save(self, *args, **kwargs):
+        base_slug = slugify(self.slug or self.title)
+        slug = base_slug
+        counter = 1
+        while Contest.objects.filter(slug=slug).exclude(pk=self.pk).exists():
+            slug = f"{base_slug}-{counter}"
+            counter += 1
+        self.slug = slug
+        super().save(*args, **kwargs)
+
+    def has_started(self, now=None):
+        return (now or timezone.now()) >= self.start_time
+
+    def has_ended(self, now=None):
+        return (now or timezone.now()) >= self.end_time
+
+    def is_running(self, now=None):
+        now = now or timezone.now()
+        return self.start_time <= now < self.end_time
+
+    def is_frozen(self, now=None):
+        return bool(self.freeze_at) and (now or timezone.now()) >= self.freeze_at and not self.results_published
+
+    def scoreboard_state(self, now=None):
+        """'frozen' while the public board is frozen, 'final' once it can no longer change, else 'live'."""
+        now = now or timezone.now()
+        if self.is_frozen(now):
+            return 'frozen'
+        if self.has_ended(now):
+            return 'final'
+        return 'live'
+
+    def can_manage(self, user):
+        return bool(user and user.is_authenticated and (user.is_staff or self.author_id == user.id))
+
+    def __str__(self):
+        return self.title
+
+
+class ContestProblem(models.Model):
+    contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='contest_problems')
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='contest_entries')
+    label = models.CharField(max_length=10)  # e.g. A, B, C1
+    points = models.PositiveIntegerField(default=1, help_text="Points for solving it in score-based contests")
+
+    class Meta:
+        ordering = ['label']
+        constraints = [
+            models.UniqueConstraint(fields=['contest', 'problem'], name='unique_contest_problem'),
+            models.UniqueConstraint(fields=['contest', 'label'], name='unique_contest_problem_label'),
+        ]
+
+    def __str__(self):
+        return f"{self.contest.title} {self.label}: {self.problem.title}"
+
+
+class ContestRegistration(models.Model):
+    contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='registrations')
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='contest_registrations')
+    registered_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['contest', 'user'], name='unique_contest_registration'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} in {self.contest.title}"
+
+
+class ContestSubmission(models.Model):
+    """Marks a judge Submission as made during a contest, for one of its problems."""
+    submission = models.OneToOneField(Submission, on_delete=models.CASCADE, primary_key=True, related_name='contest_entry')
+    contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='submissions')
+    contest_problem = models.ForeignKey(ContestProblem, on_delete=models.CASCADE, related_name='submissions')
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='contest_submissions')
+
+    def __str__(self):
+        return f"Submission {self.submission_id} to {self.contest.title}"
@@ -0,0 +1,154 @@
+"""
+Contest scoreboards served as pre-rendered JSON snapshots.
+
+One snapshot is kept per contest and freeze state:
+
+    'live'    every verdict (staff, or the public before the freeze)
+    'frozen'  the public view during a freeze: verdicts of submissions made after
+              `freeze_at` show up as pending attempts only
+    'final'   after the contest, once nothing is hidden any more
+
+A request costs one cache read. A snapshot older than CONTEST_SCOREBOARD_REFRESH
+seconds is rebuilt by the single request that wins the cache lock; every other
+request keeps serving the previous snapshot meanwhile, so the database sees at
+most one scoreboard query per contest and state per refresh period no matter
+how many people are watching.
+"""
+import hashlib
+import json
+import time
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from backend.metrics import record_cache
+from judge.stats import is_final
+
+from .models import Contest, ContestRegistration, ContestSubmission
+
+STATES = ('live', 'frozen', 'final')
+# Snapshots stay readable (stale) well past their refresh period
+SNAPSHOT_TIMEOUT = 24 * 3600
+FINAL_REFRESH = 3600
+
+
+def scoreboard_refresh(state: str) -> int:
+    if state == 'final':
+        return FINAL_REFRESH
+    return getattr(settings, 'CONTEST_SCOREBOARD_REFRESH', 10)
+
+
+def scoreboard_key(contest_id: int, state: str) -> str:
+    return f"contests:{contest_id}:scoreboard:{state}"
+
+
+def invalidate_scoreboard(contest_id: int):
+    cache.delete_many([scoreboard_key(contest_id, state) for state in STATES])
+
+
+def compute_scoreboard(contest: Contest, state: str) -> Dict:
+    """Standings from the contest's submissions, hiding post-freeze verdicts in the 'frozen' state."""
+    problems = list(contest.contest_problems.select_related('problem').only('id', 'label', 'points', 'problem__title'))
+    labels = {cp.id: cp.label for cp in problems}
+    points = {cp.id: cp.points for cp in problems}
+    hide_after = contest.freeze_at if state == 'frozen' else None
+
+    participants = {
+        user_id: {'username': username, 'problems': {}}
+        for user_id, username in ContestRegistration.objects.filter(contest=contest).values_list('user_id', 'user__username')
+    }
+    submissions = (
+        ContestSubmission.objects
+        .filter(contest=contest)
+        .order_by('submission__submitted_at', 'submission_id')
+        .values_list('user_id', 'contest_problem_id', 'submission__status', 'submission__submitted_at')
+    )
+    for user_id, contest_problem_id, verdict, submitted_at in submissions.iterator():
+        row = participants.setdefault(user_id, {'username': None, 'problems': {}})
+        cell = row['problems'].setdefault(labels[contest_problem_id], {
+            'solved': False, 'attempts': 0, 'pending': 0, 'time': None, 'points': points[contest_problem_id],
+        })
+        if cell['solved']:
+            continue
+        if not is_final(verdict) or (hide_after and submitted_at >= hide_after):
+            cell['pending'] += 1
+        elif verdict == 'accepted':
+            cell['solved'] = True
+            cell['time'] = int((submitted_at - contest.start_time).total_seconds() // 60)
+        elif verdict != 'compilation_error':
+            # Compilation errors are not penalized
+            cell['attempts'] += 1
+
+    rows = []
+    for row in participants.values():
+        solved = [cell for cell in row['problems'].values() if cell['solved']]
+        entry = {'username': row['username'], 'solved': len(solved), 'problems': row['problems']}
+        if contest.scoring == 'icpc':
+            entry['penalty'] = sum(cell['time'] + cell['attempts'] * contest.penalty_minutes for cell in solved)
+        else:
+            entry['score'] = sum(cell['points'] for cell in solved)
+        for cell in row['problems'].values():
+            del cell['points']
+        rows.append(entry)
+
+    if contest.scoring == 'icpc':
+        sort_key = lambda entry: (-entry['solved'], entry['penalty'])
+    else:
+        sort_key = lambda entry: (-entry['score'],)
+    rows.sort(key=lambda entry: (sort_key(entry), entry['username'] or ''))
+    previous = None
+    for position, entry in enumerate(rows, start=1):
+        if sort_key(entry) != previous:
+            rank = position
+            previous = sort_key(entry)
+        entry['rank'] = rank
+
+    return {
+        'contest': contest.slug,
+        'state': state,
+        'scoring': contest.scoring,
+        'freeze_at': contest.freeze_at if state == 'frozen' else None,
+        'generated_at': timezone.now(),
+        'problems': [{'label': cp.label, 'title': cp.problem.title, 'points': cp.points} for cp in problems],
+        'rows': rows,
+    }
+
+
+def _render(contest: Contest, state: str) -> Dict:
+    body = json.dumps(compute_scoreboard(contest, state), cls=DjangoJSONEncoder).encode('utf-8')
+    return {
+        'body': body,
+        'etag': '"%s"' % hashlib.sha1(body).hexdigest()[:20],
+        'generated': time.time(),
+    }
+
+
+def get_scoreboard(contest: Contest, state: str) -> Dict:
+    """The cached snapshot {'body', 'etag', 'generated'}, rebuilt at most once per refresh period."""
+    key = scoreboard_key(contest.id, state)
+    snapshot = cache.get(key)
+    fresh = snapshot is not None and time.time() - snapshot['generated'] < scoreboard_refresh(state)
+    record_cache('contest_scoreboard', fresh)
+    if fresh:
+        return snapshot
+
+    lock_key = f"{key}:lock"
+    if not cache.add(lock_key, 1, 30):
+        if snapshot is not None:
+            # Someone else is rebuilding it; the previous snapshot is at most one period old
+            return snapshot
+        for _ in range(40):
+            time.sleep(0.05)
+            snapshot = cache.get(key)
+            if snapshot is not None:
+                return snapshot
+    try:
+        snapshot = _render(contest, state)
+        cache.set(key, snapshot, SNAPSHOT_TIMEOUT)
+    finally:
+        cache.delete(lock_key)
+    return snapshot
+
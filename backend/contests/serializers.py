@@ -0,0 +1,30 @@
+from rest_framework import serializers
+from .models import Contest, ContestProblem
+
+
+class ContestSerializer(serializers.ModelSerializer):
+    author = serializers.CharField(source='author.username', read_only=True, default=None)
+    state = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Contest
+        fields = [
+            'id', 'slug', 'title', 'description', 'author',
+            'start_time', 'end_time', 'freeze_at', 'results_published',
+            'scoring', 'penalty_minutes', 'state',
+        ]
+
+    def get_state(self, obj):
+        if not obj.has_started():
+            return 'upcoming'
+        return 'running' if not obj.has_ended() else 'ended'
+
+
+class ContestProblemSerializer(serializers.ModelSerializer):
+    slug = serializers.CharField(source='problem.slug', read_only=True)
+    title = serializers.CharField(source='problem.title', read_only=True)
+    difficulty = serializers.CharField(source='problem.difficulty', read_only=True)
+
+    class Meta:
+        model = ContestProblem
+        fields = ['label', 'points', 'slug', 'title', 'difficulty']
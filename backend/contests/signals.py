@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from judge.cache import invalidate_problem, invalidate_problem_list
+from judge.models import Problem
+
+from .models import Contest, ContestProblem
+from .scoreboard import invalidate_scoreboard
+
+
+def _set_visibility(problems, visible_from):
+    slugs = list(problems.values_list('slug', flat=True))
+    if slugs:
+        Problem.objects.filter(slug__in=slugs).update(visible_from=visible_from, updated_at=timezone.now())
+        invalidate_problem(*slugs)
+        invalidate_problem_list()
+
+
+def schedule_problems(contest):
+    """Keeps the contest's problems out of the archive until it ends."""
+    problems = Problem.objects.filter(contest_entries__contest=contest)
+    if contest.has_started():
+        # Problems that were already public when they joined a running contest stay public
+        problems = problems.filter(visible_from__gt=timezone.now())
+    _set_visibility(problems.exclude(visible_from=contest.end_time), contest.end_time)
+
+
+@receiver(post_save, sender=Contest)
+def contest_saved(sender, instance, **kwargs):
+    schedule_problems(instance)
+    invalidate_scoreboard(instance.id)
+
+
+@receiver(post_delete, sender=Contest)
+def contest_deleted(sender, instance, **kwargs):
+    invalidate_scoreboard(instance.id)
+
+
+@receiver(post_save, sender=ContestProblem)
+def contest_problem_saved(sender, instance, **kwargs):
+    schedule_problems(instance.contest)
+    invalidate_scoreboard(instance.contest_id)
+
+
+@receiver(post_delete, sender=ContestProblem)
+def contest_problem_deleted(sender, instance, **kwargs):
+    invalidate_scoreboard(instance.contest_id)
+    try:
+        end_time = instance.contest.end_time
+    except Contest.DoesNotExist:
+        return
+    # Publish a problem that was only hidden for this contest
+    _set_visibility(
+        Problem.objects.filter(pk=instance.problem_id, visible_from=end_time, visible_from__gt=timezone.now()),
+        None,
+    )
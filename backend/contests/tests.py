@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from judge.models import Problem, Submission
+from users.models import CustomUser
+
+from .models import Contest, ContestProblem, ContestRegistration, ContestSubmission
+
+
+class ContestTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = CustomUser.objects.create_user(username='author', email='author@example.com', password='x')
+        self.alice = CustomUser.objects.create_user(username='alice', email='alice@example.com', password='x')
+        self.bob = CustomUser.objects.create_user(username='bob', email='bob@example.com', password='x')
+        self.problem = Problem.objects.create(title='Sum', description='Add two numbers.', difficulty='easy', author=self.author)
+        self.client = APIClient()
+
+    def make_contest(self, start, end, freeze=None, **fields):
+        now = timezone.now()
+        contest = Contest.objects.create(
+            title='Round 1',
+            author=self.author,
+            start_time=now + start,
+            end_time=now + end,
+            freeze_at=now + freeze if freeze is not None else None,
+            **fields
+        )
+        self.entry = ContestProblem.objects.create(contest=contest, problem=self.problem, label='A')
+        for user in (self.alice, self.bob):
+            ContestRegistration.objects.create(contest=contest, user=user)
+        self.problem.refresh_from_db()
+        return contest
+
+    def submit(self, contest, user, status, at):
+        submission = Submission.objects.create(user=user, problem=self.problem, code='print(1)', language='python')
+        Submission.objects.filter(pk=submission.pk).update(status=status, submitted_at=at)
+        ContestSubmission.objects.create(submission=submission, contest=contest, contest_problem=self.entry, user=user)
+        return submission
+
+    def as_user(self, user):
+        self.client.force_authenticate(user)
+
+
+class ScoreboardSnapshotTests(ContestTestCase):
+    def scoreboard(self, contest, user=None):
+        self.as_user(user)
+        response = self.client.get(f'/api/contests/{contest.slug}/scoreboard/')
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        return body['state'], {row['username']: row for row in body['rows']}
+
+    def test_freeze_hides_later_verdicts_from_the_public(self):
+        contest = self.make_contest(timedelta(hours=-2), timedelta(hours=1), freeze=timedelta(hours=-1))
+        self.submit(contest, self.alice, 'accepted', contest.start_time + timedelta(minutes=10))
+        self.submit(contest, self.bob, 'accepted', contest.freeze_at + timedelta(minutes=5))
+
+        state, rows = self.scoreboard(contest)
+        self.assertEqual(state, 'frozen')
+        self.assertEqual(rows['alice']['solved'], 1)
+        self.assertEqual(rows['bob']['solved'], 0)
+        self.assertEqual(rows['bob']['problems']['A']['pending'], 1)
+
+    def test_managers_see_the_live_board_during_a_freeze(self):
+        contest = self.make_contest(timedelta(hours=-2), timedelta(hours=1), freeze=timedelta(hours=-1))
+        self.submit(contest, self.bob, 'accepted', contest.freeze_at + timedelta(minutes=5))
+
+        state, rows = self.scoreboard(contest, self.author)
+        self.assertEqual(state, 'live')
+        self.assertEqual(rows['bob']['solved'], 1)
+
+    def test_board_stays_frozen_after_the_end_until_results_are_published(self):
+        contest = self.make_contest(timedelta(hours=-3), timedelta(hours=-1), freeze=timedelta(hours=-2))
+        self.submit(contest, self.bob, 'accepted', contest.freeze_at + timedelta(minutes=5))
+        self.assertEqual(self.scoreboard(contest)[0], 'frozen')
+
+        contest.results_published = True
+        contest.save()
+        state, rows = self.scoreboard(contest)
+        self.assertEqual(state, 'final')
+        self.assertEqual(rows['bob']['solved'], 1)
+
+    def test_ended_contest_without_freeze_is_final(self):
+        contest = self.make_contest(timedelta(hours=-3), timedelta(hours=-1))
+        self.assertEqual(self.scoreboard(contest)[0], 'final')
+
+
+class HiddenProblemTests(ContestTestCase):
+    def setUp(self):
+        super().setUp()
+        # Joining a contest that has not started hides the problem until the contest ends
+        self.contest = self.make_contest(timedelta(hours=1), timedelta(hours=3))
+
+    def test_problem_is_hidden_until_the_contest_ends(self):
+        self.assertFalse(self.problem.is_visible())
+        self.assertEqual(self.problem.visible_from, self.contest.end_time)
+
+    def test_public_endpoints_answer_404(self):
+        self.as_user(self.alice)
+        self.assertEqual(self.client.get(f'/api/problems/{self.problem.slug}/description/').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/problems/{self.problem.slug}/edit/').status_code, 404)
+        self.assertEqual(self.client.post(f'/api/ai/explain-problem/{self.problem.id}/').status_code, 404)
+        self.assertEqual(
+            self.client.post('/api/ai/get-hint/', {'problem_id': self.problem.id, 'code': '', 'language': 'python'}, format='json').status_code,
+            404
+        )
+        self.assertNotIn(self.problem.slug, [row['slug'] for row in self.client.get('/api/problems/').json()['results']])
+
+    def test_author_can_preview(self):
+        self.as_user(self.author)
+        self.assertEqual(self.client.get(f'/api/problems/{self.problem.slug}/description/').status_code, 200)
+        self.assertEqual(self.client.get(f'/api/problems/{self.problem.slug}/edit/').status_code, 200)
+
+
+class ContestSubmissionCodeTests(ContestTestCase):
+    def code_seen_by(self, submission, user):
+        self.as_user(user)
+        response = self.client.get(f'/api/submissions/{submission.id}/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['code']
+
+    def test_code_is_hidden_from_rivals_during_the_contest(self):
+        contest = self.make_contest(timedelta(hours=-1), timedelta(hours=1))
+        submission = self.submit(contest, self.alice, 'accepted', timezone.now())
+        self.assertIsNone(self.code_seen_by(submission, self.bob))
+        self.assertIsNone(self.code_seen_by(submission, None))
+        self.assertEqual(self.code_seen_by(submission, self.alice), 'print(1)')
+        self.assertEqual(self.code_seen_by(submission, self.author), 'print(1)')
+
+    def test_code_is_shown_once_the_contest_ends(self):
+        contest = self.make_contest(timedelta(hours=-3), timedelta(hours=-1))
+        submission = self.submit(contest, self.alice, 'accepted', contest.start_time + timedelta(minutes=5))
+        self.assertEqual(self.code_seen_by(submission, self.bob), 'print(1)')
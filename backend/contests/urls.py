@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.ContestListView.as_view(), name='contest-list'),
+    path('<slug:slug>/', views.ContestDetailView.as_view(), name='contest-detail'),
+    path('<slug:slug>/register/', views.ContestRegisterView.as_view(), name='contest-register'),
+    path('<slug:slug>/scoreboard/', views.ContestScoreboardView.as_view(), name='contest-scoreboard'),
+    path('<slug:slug>/problems/<str:label>/', views.ContestProblemView.as_view(), name='contest-problem'),
+    path('<slug:slug>/problems/<str:label>/submit/', views.ContestSubmitView.as_view(), name='contest-submit'),
+]
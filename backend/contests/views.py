@@ -0,0 +1,173 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import generics, status
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from backend.metrics import record_cache
+from judge.cache import PROBLEM_DETAIL_TIMEOUT, problem_detail_key, problem_version
+from judge.languages import LANGUAGES, get_language
+from judge.models import Submission
+from judge.runner import SubmissionRunner
+from judge.serializers import ProblemSerializer
+
+from .models import Contest, ContestProblem, ContestRegistration, ContestSubmission
+from .scoreboard import get_scoreboard, scoreboard_refresh
+from .serializers import ContestProblemSerializer, ContestSerializer
+
+
+def get_contest(slug):
+    try:
+        return Contest.objects.get(slug=slug)
+    except Contest.DoesNotExist:
+        raise NotFound("Contest not found.")
+
+
+def get_visible_contest(request, slug):
+    """The contest, or 404 while it has not started (unless the user manages it)."""
+    contest = get_contest(slug)
+    if not contest.has_started() and not contest.can_manage(request.user):
+        raise NotFound("Contest not found.")
+    return contest
+
+
+class ContestListView(generics.ListAPIView):
+    permission_classes = [AllowAny]
+    queryset = Contest.objects.select_related('author')
+    serializer_class = ContestSerializer
+
+
+class ContestDetailView(APIView):
+    """Contest info; its problems are listed once it has started."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, slug):
+        contest = get_contest(slug)
+        data = dict(ContestSerializer(contest).data)
+        problems = []
+        if contest.has_started() or contest.can_manage(request.user):
+            problems = ContestProblemSerializer(contest.contest_problems.select_related('problem'), many=True).data
+        data['problems'] = problems
+        data['is_registered'] = (
+            request.user.is_authenticated
+            and ContestRegistration.objects.filter(contest=contest, user=request.user).exists()
+        )
+        return Response(data)
+
+
+class ContestRegisterView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, slug):
+        contest = get_contest(slug)
+        if contest.has_ended():
+            return Response({"error": "The contest is over."}, status=status.HTTP_400_BAD_REQUEST)
+        _, created = ContestRegistration.objects.get_or_create(contest=contest, user=request.user)
+        return Response(
+            {"message": "Registered." if created else "Already registered."},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+
+class ContestProblemView(APIView):
+    """A contest problem's statement, from the same cache as the public problem page."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, slug, label):
+        contest = get_visible_contest(request, slug)
+        try:
+            entry = contest.contest_problems.select_related('problem__author').get(label=label)
+        except ContestProblem.DoesNotExist:
+            raise NotFound("Problem not found.")
+
+        problem = entry.problem
+        version = problem_version(problem.slug, include_hidden=True)
+        key = problem_detail_key(problem.slug, version)
+        data = cache.get(key)
+        record_cache('problem_detail', data is not None)
+        if data is None:
+            data = dict(ProblemSerializer(problem).data)
+            cache.set(key, data, PROBLEM_DETAIL_TIMEOUT)
+        return Response({**data, 'label': entry.label, 'points': entry.points})
+
+
+class ContestSubmitView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, slug, label):
+        contest = get_contest(slug)
+        if not contest.is_running():
+            return Response({"error": "The contest is not running."}, status=status.HTTP_403_FORBIDDEN)
+        if not ContestRegistration.objects.filter(contest=contest, user=request.user).exists():
+            return Response({"error": "Register for the contest first."}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            entry = contest.contest_problems.select_related('problem').get(label=label)
+        except ContestProblem.DoesNotExist:
+            raise NotFound("Problem not found.")
+
+        code = request.data.get('code')
+        language = request.data.get('language')
+        if not code or not language:
+            return Response({"error": "code and language are required."}, status=status.HTTP_400_BAD_REQUEST)
+        if get_language(language) is None:
+            return Response(
+                {"error": f"Unsupported language. Choose one of: {', '.join(LANGUAGES)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            submission = Submission.objects.create(
+                user=request.user,
+                problem=entry.problem,
+                code=code,
+                language=language.lower(),
+                status='pending'
+            )
+            ContestSubmission.objects.create(
+                submission=submission,
+                contest=contest,
+                contest_problem=entry,
+                user=request.user,
+            )
+
+        SubmissionRunner().run_submission_async(submission.id)
+        return Response({
+            "submission_id": submission.id,
+            "status": "pending",
+            "message": "Submission received and is executing in the background."
+        }, status=status.HTTP_201_CREATED)
+
+
+class ContestScoreboardView(APIView):
+    """
+    The scoreboard as a pre-rendered JSON snapshot (see contests/scoreboard.py).
+
+    The public sees the frozen board during a freeze; the contest's managers always see
+    the live one.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, slug):
+        contest = get_visible_contest(request, slug)
+        state = contest.scoreboard_state()
+        private = state == 'frozen' and contest.can_manage(request.user)
+        if private:
+            state = 'live'
+
+        snapshot = get_scoreboard(contest, state)
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and snapshot['etag'] in parse_etags(if_none_match):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(snapshot['body'], content_type='application/json')
+        response['ETag'] = snapshot['etag']
+        if private:
+            patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+        else:
+            patch_cache_control(response, public=True, max_age=scoreboard_refresh(state))
+        return response
@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 # Register your models here.
-from .models import Problem, TestCase, Submission, Topic
+from .models import Problem, TestCase, Submission, Topic, UserProblemStats, ProblemStats, LanguageStats
 
 @admin.register(Topic)
 class TopicAdmin(admin.ModelAdmin):
@@ -28,4 +28,26 @@ class TestCaseAdmin(admin.ModelAdmin):
 class SubmissionAdmin(admin.ModelAdmin):
     list_display = ['id', 'user', 'problem', 'language', 'status', 'submitted_at']
     list_filter = ['language', 'status', 'submitted_at']
-    search_fields = ['user__username', 'problem__title']
\ No newline at end of file
+    search_fields = ['user__username', 'problem__title']
+
+@admin.register(UserProblemStats)
+class UserProblemStatsAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'problem', 'attempts', 'best_status', 'solved', 'first_solved_at']
+    list_filter = ['solved', 'best_status']
+    search_fields = ['user__username', 'problem__title']
+    raw_id_fields = ['user', 'problem']
+
+
+@admin.register(ProblemStats)
+class ProblemStatsAdmin(admin.ModelAdmin):
+    list_display = ['problem', 'submissions', 'accepted', 'attempted_users', 'solved_users']
+    search_fields = ['problem__title']
+    raw_id_fields = ['problem']
+
+
+@admin.register(LanguageStats)
+class LanguageStatsAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'language', 'submissions', 'accepted']
+    list_filter = ['language']
+    search_fields = ['user__username']
+    raw_id_fields = ['user']
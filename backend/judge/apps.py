@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.core import checks
 import os
 
 
@@ -16,3 +17,23 @@ class JudgeConfig(AppConfig):
         
         for dir_path in media_dirs:
             os.makedirs(dir_path, exist_ok=True)
+
+        checks.register(check_toolchain_versions)
+        from . import signals  # noqa: F401
+
+
+def check_toolchain_versions(app_configs, **kwargs):
+    """Warns when an installed compiler/interpreter differs from the version pinned in the registry."""
+    from .languages import LANGUAGES
+
+    warnings = []
+    for language in LANGUAGES.values():
+        if not language.version or language.version_matches():
+            continue
+        installed = language.installed_version() or 'not installed'
+        warnings.append(checks.Warning(
+            f"{language.label} expects {language.toolchain} {language.version}, found: {installed}",
+            hint="Install the pinned toolchain or update judge/languages.py.",
+            id='judge.W001',
+        ))
+    return warnings
@@ -0,0 +1,214 @@
+"""
+Fixture problems for `manage.py benchmark_judge`.
+
+Every problem carries its tests and, per language, one reference solution per
+expected verdict (the keys are Submission.status values). Python sources are
+shared by every language of the python family (CPython and PyPy).
+"""
+import random
+from typing import Dict, List, Tuple
+
+
+def _sum_tests() -> List[Tuple[str, str]]:
+    rng = random.Random(31)
+    tests = []
+    for n in (1, 5, 1000, 100000):
+        values = [rng.randint(-10 ** 9, 10 ** 9) for _ in range(n)]
+        tests.append((f"{n}\n{' '.join(map(str, values))}\n", f"{sum(values)}\n"))
+    return tests
+
+
+def _a_plus_b_tests() -> List[Tuple[str, str]]:
+    rng = random.Random(32)
+    tests = []
+    for _ in range(20):
+        a, b = rng.randint(0, 10 ** 6), rng.randint(0, 10 ** 6)
+        tests.append((f"{a} {b}\n", f"{a + b}\n"))
+    return tests
+
+
+A_PLUS_B_SOLUTIONS = {
+    'python': {
+        'accepted': "a, b = map(int, input().split())\nprint(a + b)\n",
+        'wrong_answer': "a, b = map(int, input().split())\nprint(a - b)\n",
+        'time_limit_exceeded': "a, b = map(int, input().split())\nwhile True:\n    a += 1\n",
+        'memory_limit_exceeded': "a, b = map(int, input().split())\nblob = [0] * (10 ** 10)\nprint(a + b)\n",
+        'runtime_error': "a, b = map(int, input().split())\nprint((a + b) // 0)\n",
+    },
+    'cpp': {
+        'accepted': (
+            "#include <bits/stdc++.h>\nusing namespace std;\n"
+            "int main() { long long a, b; cin >> a >> b; cout << a + b << \"\\n\"; return 0; }\n"
+        ),
+        'wrong_answer': (
+            "#include <bits/stdc++.h>\nusing namespace std;\n"
+            "int main() { long long a, b; cin >> a >> b; cout << a - b << \"\\n\"; return 0; }\n"
+        ),
+        'time_limit_exceeded': (
+            "#include <bits/stdc++.h>\nusing namespace std;\n"
+            "int main() { volatile long long a = 0; while (true) { a++; } return 0; }\n"
+        ),
+        'memory_limit_exceeded': (
+            "#include <bits/stdc++.h>\nusing namespace std;\n"
+            "int main() { vector<long long> blob(2000000000LL); cout << blob.size() << \"\\n\"; return 0; }\n"
+        ),
+        'runtime_error': (
+            "#include <bits/stdc++.h>\nusing namespace std;\n"
+            "int main() { volatile int zero = 0; long long a, b; cin >> a >> b; cout << (a + b) / zero << \"\\n\"; return 0; }\n"
+        ),
+    },
+    'java': {
+        'accepted': (
+            "import java.util.*;\npublic class Solution {\n"
+            "    public static void main(String[] args) {\n"
+            "        Scanner sc = new Scanner(System.in);\n"
+            "        long a = sc.nextLong(), b = sc.nextLong();\n"
+            "        System.out.println(a + b);\n"
+            "    }\n}\n"
+        ),
+        'wrong_answer': (
+            "import java.util.*;\npublic class Solution {\n"
+            "    public static void main(String[] args) {\n"
+            "        Scanner sc = new Scanner(System.in);\n"
+            "        long a = sc.nextLong(), b = sc.nextLong();\n"
+            "        System.out.println(a - b);\n"
+            "    }\n}\n"
+        ),
+        'time_limit_exceeded': (
+            "public class Solution {\n"
+            "    static volatile long counter = 0;\n"
+            "    public static void main(String[] args) {\n"
+            "        while (true) { counter++; }\n"
+            "    }\n}\n"
+        ),
+        'memory_limit_exceeded': (
+            "import java.util.*;\npublic class Solution {\n"
+            "    public static void main(String[] args) {\n"
+            "        List<long[]> blobs = new ArrayList<>();\n"
+            "        while (true) { blobs.add(new long[1 << 20]); }\n"
+            "    }\n}\n"
+        ),
+        'runtime_error': (
+            "public class Solution {\n"
+            "    public static void main(String[] args) {\n"
+            "        int zero = args.length;\n"
+            "        System.out.println(1 / zero);\n"
+            "    }\n}\n"
+        ),
+    },
+}
+
+ARRAY_SUM_SOLUTIONS = {
+    'python': {
+        'accepted': "import sys\ndata = sys.stdin.buffer.read().split()\nn = int(data[0])\nprint(sum(map(int, data[1:n + 1])))\n",
+        'wrong_answer': "import sys\ndata = sys.stdin.buffer.read().split()\nn = int(data[0])\nprint(sum(map(int, data[1:n])))\n",
+        'time_limit_exceeded': (
+            "import sys\ndata = sys.stdin.buffer.read().split()\nn = int(data[0])\n"
+            "total = 0\nfor i in range(n):\n    for j in range(n):\n        total += 1\n"
+            "while True:\n    total += 1\n"
+        ),
+        'memory_limit_exceeded': "import sys\ndata = sys.stdin.buffer.read().split()\ncopies = [data * 1000 for _ in range(10 ** 6)]\n",
+        'runtime_error': "import sys\ndata = sys.stdin.buffer.read().split()\nprint(int(data[10 ** 7]))\n",
+    },
+    'cpp': {
+        'accepted': (
+            "#include <bits/stdc++.h>\nusing namespace std;\n"
+            "int main() { ios::sync_with_stdio(false); cin.tie(nullptr); int n; cin >> n;\n"
+            "long long s = 0, x; for (int i = 0; i < n; i++) { cin >> x; s += x; } cout << s << \"\\n\"; return 0; }\n"
+        ),
+        'wrong_answer': (
+            "#include <bits/stdc++.h>\nusing namespace std;\n"
+            "int main() { ios::sync_with_stdio(false); cin.tie(nullptr); int n; cin >> n;\n"
+            "int s = 0, x; for (int i = 0; i < n; i++) { cin >> x; s += x; } cout << s << \"\\n\"; return 0; }\n"
+        ),
+        'time_limit_exceeded': (
+            "#include <bits/stdc++.h>\nusing namespace std;\n"
+            "int main() { int n; cin >> n; volatile long long s = 0;\n"
+            "for (long long i = 0; ; i++) { s += i % (n + 1); } return 0; }\n"
+        ),
+        'memory_limit_exceeded': (
+            "#include <bits/stdc++.h>\nusing namespace std;\n"
+            "int main() { vector<vector<long long>> blobs; while (true) { blobs.emplace_back(1 << 20, 1); } return 0; }\n"
+        ),
+        'runtime_error': (
+            "#include <bits/stdc++.h>\nusing namespace std;\n"
+            "int main() { int n; cin >> n; vector<long long> a(n); cout << a.at(n + 10) << \"\\n\"; return 0; }\n"
+        ),
+    },
+    'java': {
+        'accepted': (
+            "import java.io.*;\nimport java.util.*;\npublic class Solution {\n"
+            "    public static void main(String[] args) throws IOException {\n"
+            "        StreamTokenizer in = new StreamTokenizer(new BufferedInputStream(System.in));\n"
+            "        in.resetSyntax(); in.wordChars('-', '-'); in.wordChars('0', '9'); in.whitespaceChars(0, ' ');\n"
+            "        in.nextToken(); int n = Integer.parseInt(in.sval);\n"
+            "        long s = 0;\n"
+            "        for (int i = 0; i < n; i++) { in.nextToken(); s += Long.parseLong(in.sval); }\n"
+            "        System.out.println(s);\n"
+            "    }\n}\n"
+        ),
+        'wrong_answer': (
+            "import java.io.*;\nimport java.util.*;\npublic class Solution {\n"
+            "    public static void main(String[] args) throws IOException {\n"
+            "        StreamTokenizer in = new StreamTokenizer(new BufferedInputStream(System.in));\n"
+            "        in.resetSyntax(); in.wordChars('-', '-'); in.wordChars('0', '9'); in.whitespaceChars(0, ' ');\n"
+            "        in.nextToken(); int n = Integer.parseInt(in.sval);\n"
+            "        int s = 0;\n"
+            "        for (int i = 0; i < n; i++) { in.nextToken(); s += (int) Long.parseLong(in.sval); }\n"
+            "        System.out.println(s);\n"
+            "    }\n}\n"
+        ),
+        'time_limit_exceeded': (
+            "public class Solution {\n"
+            "    static volatile long counter = 0;\n"
+            "    public static void main(String[] args) {\n"
+            "        while (true) { counter++; }\n"
+            "    }\n}\n"
+        ),
+        'memory_limit_exceeded': (
+            "import java.util.*;\npublic class Solution {\n"
+            "    public static void main(String[] args) {\n"
+            "        List<long[]> blobs = new ArrayList<>();\n"
+            "        while (true) { blobs.add(new long[1 << 20]); }\n"
+            "    }\n}\n"
+        ),
+        'runtime_error': (
+            "public class Solution {\n"
+            "    public static void main(String[] args) {\n"
+            "        int[] a = new int[1];\n"
+            "        System.out.println(a[args.length + 5]);\n"
+            "    }\n}\n"
+        ),
+    },
+}
+
+PROBLEMS = [
+    {
+        'slug': 'judge-bench-a-plus-b',
+        'title': 'Judge Bench: A + B',
+        'description': 'Print the sum of two integers. Many small tests: dominated by per-test overhead.',
+        'time_limit': 1000,
+        'memory_limit': 256,
+        'tests': _a_plus_b_tests(),
+        'solutions': A_PLUS_B_SOLUTIONS,
+    },
+    {
+        'slug': 'judge-bench-array-sum',
+        'title': 'Judge Bench: Array Sum',
+        'description': 'Print the sum of n integers. Few large tests: dominated by I/O and run time.',
+        'time_limit': 1000,
+        'memory_limit': 256,
+        'tests': _sum_tests(),
+        'solutions': ARRAY_SUM_SOLUTIONS,
+    },
+]
+
+
+def solutions_for(problem: Dict, language) -> Dict[str, str]:
+    """Reference solutions of `problem` for a registry Language, keyed by expected verdict."""
+    solutions = problem['solutions']
+    if language.key in solutions:
+        return solutions[language.key]
+    if language.family == 'python':
+        return solutions.get('python', {})
+    return {}
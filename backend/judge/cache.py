@@ -0,0 +1,110 @@
+"""
+Cache keys and invalidation for the public problem endpoints.
+
+Cached entries are never deleted one by one: every key embeds a version, so
+stale entries simply stop being read and expire on their own.
+
+- The problem list version is a counter bumped by judge/signals.py whenever a
+  problem or topic changes.
+- A problem description is keyed by slug and `updated_at`. A small pointer
+  entry maps the slug to its current `updated_at` and is dropped on every
+  change; topic changes touch `updated_at` of the affected problems.
+- Problems scheduled with `visible_from` stay out of both until then: list pages
+  expire no later than the next reveal and the pointer carries the reveal time.
+"""
+import hashlib
+import time
+from typing import Optional
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Problem
+
+PROBLEM_LIST_VERSION_KEY = 'judge:problem-list:version'
+PROBLEM_LIST_TIMEOUT = 300
+
+
+def problem_list_version() -> int:
+    version = cache.get(PROBLEM_LIST_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a lost version key can never resurrect an older generation
+        cache.add(PROBLEM_LIST_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(PROBLEM_LIST_VERSION_KEY)
+    return version
+
+
+def problem_list_key(query_params) -> str:
+    query = urlencode(sorted((key, value) for key in query_params for value in query_params.getlist(key)))
+    digest = hashlib.sha1(query.encode('utf-8')).hexdigest()
+    return f"judge:problem-list:{problem_list_version()}:{digest}"
+
+
+def invalidate_problem_list():
+    try:
+        cache.incr(PROBLEM_LIST_VERSION_KEY)
+    except ValueError:
+        problem_list_version()
+
+
+PROBLEM_DETAIL_TIMEOUT = 3600
+# Short so per-process caches converge quickly when no shared backend is configured
+PROBLEM_VERSION_TIMEOUT = 30
+
+
+def _problem_version_key(slug: str) -> str:
+    return f"judge:problem:{slug}:version"
+
+
+def problem_version(slug: str, include_hidden: bool = False) -> Optional[str]:
+    """
+    The cache version (updated_at in microseconds) of a problem, or None if it does not
+    exist or is not visible yet (unless `include_hidden`).
+    """
+    key = _problem_version_key(slug)
+    cached = cache.get(key)
+    if cached is None:
+        row = Problem.objects.filter(slug=slug).values_list('updated_at', 'visible_from').first()
+        if row is None:
+            return None
+        updated_at, visible_from = row
+        cached = (
+            str(int(updated_at.timestamp() * 1_000_000)),
+            visible_from.timestamp() if visible_from else 0,
+        )
+        cache.set(key, cached, PROBLEM_VERSION_TIMEOUT)
+    version, visible_from = cached
+    if not include_hidden and visible_from > time.time():
+        return None
+    return version
+
+
+def problem_detail_key(slug: str, version: str) -> str:
+    return f"judge:problem:{slug}:{version}"
+
+
+def problem_etag(slug: str, version: str) -> str:
+    return '"%s"' % hashlib.sha1(f"{slug}:{version}".encode('utf-8')).hexdigest()[:20]
+
+
+def problem_list_timeout() -> int:
+    """PROBLEM_LIST_TIMEOUT, cut short so cached pages never outlive the next scheduled reveal."""
+    now = timezone.now()
+    next_reveal = Problem.objects.filter(visible_from__gt=now).aggregate(Min('visible_from'))['visible_from__min']
+    if next_reveal is None:
+        return PROBLEM_LIST_TIMEOUT
+    return max(1, min(PROBLEM_LIST_TIMEOUT, int((next_reveal - now).total_seconds()) + 1))
+
+
+def invalidate_problem(*slugs: str):
+    cache.delete_many([_problem_version_key(slug) for slug in slugs])
+
+
+def touch_problems(queryset):
+    """Bumps updated_at (without save signals) for changes that do not touch the row itself."""
+    slugs = list(queryset.values_list('slug', flat=True))
+    if slugs:
+        Problem.objects.filter(slug__in=slugs).update(updated_at=timezone.now())
+        invalidate_problem(*slugs)
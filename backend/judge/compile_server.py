@@ -0,0 +1,192 @@
+import base64
+import hashlib
+import itertools
+import logging
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Optional, Tuple
+
+from django.conf import settings
+
+from .toolchain import JAVA_SOURCE_DIR, compiler_version, toolchain_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+class JavaCompileServer:
+    """
+    Client for a long-lived JudgeCompileServer JVM (see java/JudgeCompileServer.java).
+
+    Compiling through one warm JVM avoids paying javac's startup and cold JIT on
+    every Java submission. The server is started lazily, health-checked with PING
+    from a watchdog thread and restarted after it dies or stops answering.
+    `compile()` returns None whenever the server cannot be used so callers can
+    fall back to plain `javac`.
+    """
+
+    def __init__(self, max_concurrency: int = 2, health_interval: float = 30):
+        self.max_concurrency = max_concurrency
+        self.health_interval = health_interval
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._process = None
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._disabled = False
+        self._watchdog_started = False
+
+    def compile(self, source_path: Path, timeout: float = 15) -> Optional[Tuple[bool, str]]:
+        """Compiles `source_path` in place. Returns (success, diagnostics) or None if unavailable."""
+        if not self._slots.acquire(timeout=timeout):
+            return None
+        try:
+            future = self._request('COMPILE', str(source_path.parent), source_path.name)
+            if future is None:
+                return None
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                # A compile that never answers means the server is wedged; replace it
+                self.restart()
+                raise subprocess.TimeoutExpired('javac', timeout)
+            except ConnectionError:
+                return None
+        finally:
+            self._slots.release()
+
+    def ping(self, timeout: float = 5) -> bool:
+        future = self._request('PING')
+        if future is None:
+            return False
+        try:
+            future.result(timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    def restart(self):
+        with self._lock:
+            self._stop_locked()
+
+    def _request(self, *fields: str) -> Optional[Future]:
+        with self._lock:
+            process = self._ensure_started_locked()
+            if process is None:
+                return None
+            request_id = str(next(self._ids))
+            future = Future()
+            self._pending[request_id] = future
+        try:
+            with self._write_lock:
+                process.stdin.write('\t'.join((request_id, *fields)) + '\n')
+                process.stdin.flush()
+        except (OSError, ValueError):
+            with self._lock:
+                self._pending.pop(request_id, None)
+                if self._process is process:
+                    self._stop_locked()
+            return None
+        return future
+
+    def _ensure_started_locked(self):
+        if self._process is not None and self._process.poll() is None:
+            return self._process
+        if self._disabled:
+            return None
+        self._stop_locked()
+        classes_dir = self._build_server()
+        if classes_dir is None:
+            logger.warning("Java compile server unavailable; falling back to javac processes.")
+            self._disabled = True
+            return None
+        self._process = subprocess.Popen(
+            ['java', '-XX:+UseSerialGC', '-cp', str(classes_dir), 'JudgeCompileServer', str(self.max_concurrency)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            bufsize=1
+        )
+        threading.Thread(target=self._read_responses, args=(self._process,), daemon=True).start()
+        if not self._watchdog_started:
+            self._watchdog_started = True
+            threading.Thread(target=self._watchdog, daemon=True).start()
+        return self._process
+
+    def _stop_locked(self):
+        process, self._process = self._process, None
+        if process is not None:
+            try:
+                process.kill()
+            except OSError:
+                pass
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(ConnectionError("Java compile server stopped"))
+
+    def _read_responses(self, process):
+        for line in process.stdout:
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) < 2:
+                continue
+            with self._lock:
+                future = self._pending.pop(parts[0], None)
+            if future is None:
+                continue
+            if parts[1] == 'PONG':
+                future.set_result(True)
+            else:
+                diagnostics = base64.b64decode(parts[2]).decode('utf-8') if len(parts) > 2 else ''
+                future.set_result((parts[1] == 'OK', diagnostics))
+        # EOF: the server crashed or was killed; fail whatever was in flight
+        with self._lock:
+            if self._process is process:
+                self._stop_locked()
+
+    def _watchdog(self):
+        # Crashes are noticed by the reader thread; this catches a server that is alive but hung
+        while True:
+            time.sleep(self.health_interval)
+            with self._lock:
+                running = self._process is not None and self._process.poll() is None
+            if running and not self.ping():
+                logger.warning("Java compile server did not answer PING; restarting.")
+                self.restart()
+
+    def _build_server(self) -> Optional[Path]:
+        version_key = hashlib.sha256(compiler_version('javac').encode('utf-8')).hexdigest()[:16]
+        classes_dir = toolchain_cache_dir() / 'compile-server' / version_key
+        if (classes_dir / 'JudgeCompileServer.class').exists():
+            return classes_dir
+        try:
+            classes_dir.mkdir(parents=True, exist_ok=True)
+            result = subprocess.run(
+                ['javac', '-d', str(classes_dir), str(JAVA_SOURCE_DIR / 'JudgeCompileServer.java')],
+                capture_output=True,
+                text=True,
+                timeout=60
+            )
+            return classes_dir if result.returncode == 0 else None
+        except Exception:
+            return None
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def get_java_compile_server() -> JavaCompileServer:
+    """The per-process compile server shared by every execution provider."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = JavaCompileServer(
+                max_concurrency=getattr(settings, 'JUDGE_JAVA_COMPILE_SERVER_CONCURRENCY', 2),
+                health_interval=getattr(settings, 'JUDGE_JAVA_COMPILE_SERVER_HEALTH_INTERVAL', 30)
+            )
+        return _server
@@ -6,7 +6,10 @@ import tempfile
 from pathlib import Path
 from django.utils import timezone
 from .models import Submission, TestCase
+from ai_service.error_patterns import classify_error
 from ai_service.services import AIAnalysisService
+import shlex
+from .languages import get_language
 
 class DockerExecutor:
     def __init__(self):
@@ -16,12 +19,6 @@ class DockerExecutor:
             self.client = None
             print(f"Docker initialization failed: {e}")
 
-        self.image_config = {
-            'python': 'python:3.10-alpine',
-            'cpp': 'gcc:11-slim',
-            'java': 'openjdk:17-slim'
-        }
-
     def execute_submission(self, submission: Submission):
         if not self.client:
             print("Docker daemon not running. Falling back to local execution.")
@@ -35,12 +32,19 @@ class DockerExecutor:
         problem = submission.problem
         language = submission.language.lower()
         code = submission.code
+        lang = get_language(language)
+        if lang is None:
+            submission.status = 'compilation_error'
+            submission.output = f"Unsupported language: {language}"
+            submission.set_evaluated_now()
+            submission.save()
+            return
 
         # Create a unique host temp directory
         temp_dir_host = Path(tempfile.mkdtemp(prefix=f"judge_sub_{submission.id}_"))
         
         try:
-            image_name = self._get_image_name(language)
+            image_name = lang.docker_image
             self._ensure_image(image_name)
 
             # Define mount
@@ -49,14 +53,17 @@ class DockerExecutor:
             ]
 
             # Write code file
-            file_name = self._get_source_file_name(language, code, submission.id)
+            class_name = lang.class_name(code)
+            context = lang.context('/code', class_name)
+            file_name = lang.source_file(class_name)
             code_path = temp_dir_host / file_name
             with open(code_path, 'w', encoding='utf-8') as f:
                 f.write(code)
 
             # Compilation phase (C++ or Java)
-            compile_cmd = self._get_compile_command(language, file_name)
-            if compile_cmd:
+            compile_args = lang.compile_args(context)
+            if compile_args:
+                compile_cmd = shlex.join(compile_args)
                 compile_container = self.client.containers.run(
                     image=image_name,
                     command=f"sh -c '{compile_cmd}'",
@@ -90,8 +97,8 @@ class DockerExecutor:
             max_mem = 0
 
             # Get run command
-            run_base_cmd = self._get_run_command(language, file_name, submission.id)
-            time_limit_sec = problem.time_limit / 1000.0
+            run_base_cmd = shlex.join(lang.run_args(context))
+            time_limit_sec = lang.time_limit_ms(problem.time_limit) / 1000.0
 
             for idx, test_case in enumerate(test_cases):
                 # Write input.txt to mount
@@ -118,8 +125,8 @@ class DockerExecutor:
 
                 start_time = time.perf_counter()
                 
-                # Memory limit is problem.memory_limit (MB)
-                mem_limit_str = f"{problem.memory_limit}m"
+                # Memory limit is problem.memory_limit (MB), scaled per language
+                mem_limit_str = f"{lang.memory_limit_mb(problem.memory_limit)}m"
 
                 try:
                     container = self.client.containers.run(
@@ -221,9 +228,6 @@ class DockerExecutor:
             # Clean up directory
             shutil.rmtree(temp_dir_host, ignore_errors=True)
 
-    def _get_image_name(self, language):
-        return self.image_config.get(language, 'python:3.10-alpine')
-
     def _ensure_image(self, image_name):
         try:
             self.client.images.get(image_name)
@@ -231,49 +235,15 @@ class DockerExecutor:
             print(f"Pulling image {image_name}...")
             self.client.images.pull(image_name)
 
-    def _get_source_file_name(self, language, code, submission_id):
-        if language == 'python':
-            return 'submission.py'
-        elif language == 'java':
-            class_name = self._extract_java_class_name(code) or f"Submission_{submission_id}"
-            return f"{class_name}.java"
-        elif language == 'cpp':
-            return 'submission.cpp'
-        return 'submission.txt'
-
-    def _get_compile_command(self, language, file_name):
-        if language == 'cpp':
-            return f"g++ -O0 -std=c++17 /code/{file_name} -o /code/submission"
-        elif language == 'java':
-            return f"javac /code/{file_name}"
-        return None
-
-    def _get_run_command(self, language, file_name, submission_id):
-        if language == 'python':
-            return "python3 /code/submission.py"
-        elif language == 'cpp':
-            return "/code/submission"
-        elif language == 'java':
-            class_name = file_name.replace(".java", "")
-            return f"java -cp /code {class_name}"
-        return ""
-
-    def _extract_java_class_name(self, code):
-        lines = code.splitlines()
-        for line in lines:
-            line = line.strip()
-            if line.startswith('public class ') and '{' in line:
-                return line.split()[2].split('{')[0].strip()
-        return None
-
     def _normalize_output(self, text):
         return '\n'.join(line.strip() for line in text.splitlines() if line.strip())
 
     def _handle_compilation_error(self, submission, raw_logs, language):
         submission.status = 'compilation_error'
         try:
-            ai_service = AIAnalysisService()
-            report = ai_service.generate_error_report(raw_logs, language, is_compile=True)
+            report = classify_error(raw_logs, language, is_compile=True)
+            if report is None:
+                report = AIAnalysisService().generate_error_report(raw_logs, language, is_compile=True)
             import json
             submission.verdict = json.dumps(report)
             submission.output = report.get('message', raw_logs)
@@ -286,8 +256,9 @@ class DockerExecutor:
     def _handle_runtime_error(self, submission, raw_logs, language):
         submission.status = 'runtime_error'
         try:
-            ai_service = AIAnalysisService()
-            report = ai_service.generate_error_report(raw_logs, language, is_compile=False)
+            report = classify_error(raw_logs, language, is_compile=False)
+            if report is None:
+                report = AIAnalysisService().generate_error_report(raw_logs, language, is_compile=False)
             import json
             submission.verdict = json.dumps(report)
             submission.output = report.get('message', raw_logs)
@@ -3,7 +3,12 @@ import subprocess
 import time
 import tempfile
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from django.conf import settings
+from .toolchain import CompileCache, get_java_runtime, get_precompiled_header
+from .compile_server import get_java_compile_server
+from .languages import Language, get_language
+from .python_runner import get_python_fork_server
 
 # Linux resource limits module (Linux-only)
 try:
@@ -16,70 +21,87 @@ class ExecutionProvider:
         """Compiles the source code if required by the language."""
         raise NotImplementedError
 
-    def execute(self, run_cmd: List[str], input_text: str, time_limit_ms: int, memory_limit_mb: int, output_limit_bytes: int, temp_dir: Path) -> Dict[str, Any]:
-        """Executes the compiled program/script with resource limits."""
+    def execute(self, run_cmd: List[str], input_text: str, time_limit_ms: int, memory_limit_mb: int, output_limit_bytes: int, temp_dir: Path, startup_overhead_ms: int = 0, runner: Optional[str] = None) -> Dict[str, Any]:
+        """Executes the compiled program/script with resource limits.
+
+        `startup_overhead_ms` is the runtime's fixed launch cost (e.g. JVM startup); it is
+        granted on top of the time limit and excluded from the reported `time_taken`.
+        `runner` is the launcher chosen by `compile()` (e.g. "python-forkserver").
+        """
         raise NotImplementedError
 
 
 class SubprocessExecutionProvider(ExecutionProvider):
-    def __init__(self):
-        self.language_config = {
-            'python': {
-                'file_name': 'submission.py',
-                'compile_cmd': None,
-                'run_cmd': lambda path, f: ['python3', str(path / f)],
-            },
-            'cpp': {
-                'file_name': 'submission.cpp',
-                'compile_cmd': lambda path, f: ['g++', '-O0', '-std=c++17', str(path / f), '-o', str(path / 'submission')],
-                'run_cmd': lambda path, f: [str(path / 'submission')],
-            },
-            'java': {
-                'file_name': 'Solution.java',
-                'compile_cmd': lambda path, f: ['javac', str(path / f)],
-                'run_cmd': lambda path, f: ['java', '-cp', str(path), 'Solution'],
-            }
-        }
+    def __init__(self, use_pch: Optional[bool] = None, use_compile_cache: Optional[bool] = None, java_runner: Optional[str] = None, use_java_compile_server: Optional[bool] = None, python_runner: Optional[str] = None):
+        if use_pch is None:
+            use_pch = getattr(settings, 'JUDGE_CPP_PCH', True)
+        if use_compile_cache is None:
+            use_compile_cache = getattr(settings, 'JUDGE_COMPILE_CACHE', False)
+        if java_runner is None:
+            java_runner = getattr(settings, 'JUDGE_JAVA_RUNNER', 'plain')
+        if use_java_compile_server is None:
+            use_java_compile_server = getattr(settings, 'JUDGE_JAVA_COMPILE_SERVER', False)
+        if python_runner is None:
+            python_runner = getattr(settings, 'JUDGE_PYTHON_RUNNER', 'plain')
+        self.use_pch = use_pch
+        self.compile_cache = CompileCache() if use_compile_cache else None
+        self.use_cds = java_runner == 'cds'
+        self.java_compile_server = get_java_compile_server() if use_java_compile_server else None
+        self.use_python_fork_server = python_runner == 'forkserver'
 
     def compile(self, code: str, language: str, temp_dir: Path) -> Dict[str, Any]:
-        lang = language.lower()
-        if lang not in self.language_config:
+        lang = get_language(language)
+        if lang is None:
             return {"success": False, "error_message": f"Unsupported language: {language}", "status": "CE"}
 
-        config = self.language_config[lang]
-        file_name = config['file_name']
-        
-        # If Java, extract the class name if possible to match Solution or custom class
-        if lang == 'java':
-            class_name = self._extract_java_class_name(code)
-            if class_name:
-                file_name = f"{class_name}.java"
-                config['run_cmd'] = lambda path, f, c=class_name: ['java', '-cp', str(path), c]
+        # For JVM languages the file must be named after the public class (or the registry default)
+        class_name = lang.class_name(code)
+        file_name = lang.source_file(class_name)
+        context = lang.context(temp_dir, class_name)
 
         source_path = temp_dir / file_name
         with open(source_path, 'w', encoding='utf-8') as f:
             f.write(code)
 
-        if not config['compile_cmd']:
-            return {"success": True, "file_name": file_name, "run_cmd": config['run_cmd'](temp_dir, file_name)}
+        comp_res = {"success": True, "file_name": file_name, "run_cmd": lang.run_args(context, self._run_flags(lang))}
+        if lang.family == 'python' and self.use_python_fork_server:
+            comp_res["runner"] = "python-forkserver"
+
+        compile_args = lang.compile_args(context, self._compile_flags(lang))
+        if not compile_args:
+            return self._compiled(lang, comp_res)
+
+        # Reuse a previously compiled binary for byte-identical source
+        cache_key = None
+        if self.compile_cache and lang.artifact:
+            cache_key = self.compile_cache.key(lang.key, lang.toolchain, lang.installed_version(), ' '.join(lang.flags), code)
+            if self.compile_cache.fetch(cache_key, temp_dir / lang.artifact):
+                return self._compiled(lang, {**comp_res, "cached": True})
 
         # Execute compilation
-        compile_args = config['compile_cmd'](temp_dir, file_name)
         try:
-            result = subprocess.run(
-                compile_args,
-                cwd=str(temp_dir),
-                capture_output=True,
-                text=True,
-                timeout=15
-            )
-            if result.returncode != 0:
+            compiled = None
+            if lang.family == 'jvm' and self.java_compile_server:
+                # None means the server is unavailable right now; fall back to a javac process
+                compiled = self.java_compile_server.compile(source_path, timeout=15)
+            if compiled is None:
+                result = subprocess.run(
+                    compile_args,
+                    cwd=str(temp_dir),
+                    capture_output=True,
+                    text=True,
+                    timeout=15
+                )
+                compiled = (result.returncode == 0, result.stderr or result.stdout)
+            ok, diagnostics = compiled
+            if not ok:
                 return {
                     "success": False,
                     "status": "CE",
-                    "error_message": result.stderr or result.stdout,
+                    "error_message": diagnostics,
                 }
-            return {"success": True, "file_name": file_name, "run_cmd": config['run_cmd'](temp_dir, file_name)}
+            if cache_key:
+                self.compile_cache.store(cache_key, temp_dir / lang.artifact)
         except subprocess.TimeoutExpired:
             return {
                 "success": False,
@@ -92,16 +114,23 @@ class SubprocessExecutionProvider(ExecutionProvider):
                 "status": "CE",
                 "error_message": f"Compilation failed: {str(e)}",
             }
+        return self._compiled(lang, comp_res)
+
+    def _compiled(self, lang, comp_res: Dict[str, Any]) -> Dict[str, Any]:
+        """The result of a successful compile; the JVM's startup overhead is only measured (once) now."""
+        if lang.family == 'jvm':
+            comp_res["startup_overhead_ms"] = self._java_runtime(lang).startup_overhead_ms()
+        return comp_res
 
-    def execute(self, run_cmd: List[str], input_text: str, time_limit_ms: int, memory_limit_mb: int, output_limit_bytes: int, temp_dir: Path) -> Dict[str, Any]:
-        time_limit_sec = time_limit_ms / 1000.0
+    def execute(self, run_cmd: List[str], input_text: str, time_limit_ms: int, memory_limit_mb: int, output_limit_bytes: int, temp_dir: Path, startup_overhead_ms: int = 0, runner: Optional[str] = None) -> Dict[str, Any]:
+        time_limit_sec = (time_limit_ms + startup_overhead_ms) / 1000.0
         memory_limit_bytes = memory_limit_mb * 1024 * 1024
+        # CPU Time Limit (soft limit = time_limit_sec, hard limit = time_limit_sec + 1)
+        cpu_limit = int(time_limit_sec) + 1
 
         def set_limits():
             if resource is None:
                 return
-            # Set CPU Time Limit (soft limit = time_limit_sec, hard limit = time_limit_sec + 1)
-            cpu_limit = int(time_limit_sec) + 1
             resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_limit + 1))
             # Set Memory / Address Space Limit (bytes)
             resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
@@ -111,27 +140,59 @@ class SubprocessExecutionProvider(ExecutionProvider):
         start_time = time.perf_counter()
         
         try:
-            # We use Popen to execute asynchronously and handle process streams safely
-            # Note: preexec_fn is only supported on Unix systems
-            process = subprocess.Popen(
-                run_cmd,
-                cwd=str(temp_dir),
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                preexec_fn=set_limits if os.name != 'nt' else None
-            )
-
-            try:
-                stdout_bytes, stderr_bytes = process.communicate(
-                    input=input_text.encode('utf-8'),
-                    timeout=time_limit_sec
+            forked = None
+            if runner == 'python-forkserver' and self.use_python_fork_server:
+                # run_cmd is [interpreter, script]; each interpreter gets its own warmed server
+                forked = get_python_fork_server(run_cmd[0]).run(
+                    Path(run_cmd[-1]), temp_dir, input_text.encode('utf-8'),
+                    timeout=time_limit_sec, cpu_limit=cpu_limit, memory_limit=memory_limit_bytes
                 )
-            except subprocess.TimeoutExpired:
-                process.kill()
-                # Clean streams
-                stdout_bytes, stderr_bytes = process.communicate()
-                elapsed_time = int((time.perf_counter() - start_time) * 1000)
+                if forked is None:
+                    start_time = time.perf_counter()  # server unavailable; time the fallback from scratch
+
+            if forked is not None:
+                stdout_bytes, stderr_bytes = forked["stdout"], forked["stderr"]
+                timed_out = forked["timed_out"]
+                exit_code = forked["exit_code"]
+                memory_kb = forked["maxrss_kb"]
+            else:
+                # We use Popen to execute asynchronously and handle process streams safely
+                # Note: preexec_fn is only supported on Unix systems
+                process = subprocess.Popen(
+                    run_cmd,
+                    cwd=str(temp_dir),
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    preexec_fn=set_limits if os.name != 'nt' else None
+                )
+
+                timed_out = False
+                try:
+                    stdout_bytes, stderr_bytes = process.communicate(
+                        input=input_text.encode('utf-8'),
+                        timeout=time_limit_sec
+                    )
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    # Clean streams
+                    stdout_bytes, stderr_bytes = process.communicate()
+                    timed_out = True
+                exit_code = process.returncode
+
+                # Retrieve memory usage from child processes if available on Unix
+                # usage.ru_maxrss is in Kilobytes on Linux
+                memory_kb = 0
+                if resource is not None:
+                    try:
+                        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+                        memory_kb = usage.ru_maxrss
+                    except:
+                        pass
+
+            elapsed_time = max(0, int((time.perf_counter() - start_time) * 1000) - startup_overhead_ms) # ms, excluding runtime startup
+
+            if timed_out:
                 return {
                     "status": "TLE",
                     "stdout": stdout_bytes.decode('utf-8', errors='replace'),
@@ -140,22 +201,9 @@ class SubprocessExecutionProvider(ExecutionProvider):
                     "memory_used": 0
                 }
 
-            elapsed_time = int((time.perf_counter() - start_time) * 1000) # ms
-            exit_code = process.returncode
-
             stdout = stdout_bytes.decode('utf-8', errors='replace')
             stderr = stderr_bytes.decode('utf-8', errors='replace')
 
-            # Retrieve memory usage from child processes if available on Unix
-            # usage.ru_maxrss is in Kilobytes on Linux
-            memory_kb = 0
-            if resource is not None:
-                try:
-                    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
-                    memory_kb = usage.ru_maxrss
-                except:
-                    pass
-
             # Output Limit Exceeded (OLE) check
             if len(stdout_bytes) > output_limit_bytes:
                 return {
@@ -190,7 +238,8 @@ class SubprocessExecutionProvider(ExecutionProvider):
             # Check general exit code for Runtime Error
             if exit_code != 0:
                 # If memory limit exceeded, Linux often exits with code 137 or MemoryError
-                if "MemoryError" in stderr or exit_code == 137:
+                # (Python MemoryError, Java OutOfMemoryError, C++ std::bad_alloc under RLIMIT_AS)
+                if "MemoryError" in stderr or "std::bad_alloc" in stderr or exit_code == 137:
                     return {
                         "status": "MLE",
                         "stdout": stdout,
@@ -212,6 +261,7 @@ class SubprocessExecutionProvider(ExecutionProvider):
                 "stdout": stdout,
                 "stderr": stderr,
                 "time_taken": elapsed_time,
+                "startup_ms": startup_overhead_ms,
                 "memory_used": memory_kb // 1024 # MB
             }
 
@@ -224,10 +274,15 @@ class SubprocessExecutionProvider(ExecutionProvider):
                 "memory_used": 0
             }
 
-    def _extract_java_class_name(self, code: str) -> str:
-        # Find 'public class ClassName'
-        import re
-        match = re.search(r'public\s+class\s+(\w+)', code)
-        if match:
-            return match.group(1)
-        return None
+    def _compile_flags(self, lang: Language) -> List[str]:
+        if self.use_pch and lang.precompiled_header:
+            return get_precompiled_header(lang.toolchain, list(lang.flags), lang.precompiled_header).include_flags()
+        return []
+
+    def _run_flags(self, lang: Language) -> List[str]:
+        if lang.family == 'jvm':
+            return self._java_runtime(lang).extra_flags()
+        return []
+
+    def _java_runtime(self, lang: Language):
+        return get_java_runtime(list(lang.flags), use_cds=self.use_cds)
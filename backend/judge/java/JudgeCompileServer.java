@@ -0,0 +1,72 @@
+import java.io.*;
+import java.nio.charset.StandardCharsets;
+import java.util.*;
+import java.util.concurrent.*;
+import javax.tools.*;
+
+/**
+ * Long-lived javac for the judge. Keeps one warmed-up compiler in memory and
+ * compiles submissions through the javax.tools API instead of forking a new JVM.
+ *
+ * Line protocol on stdin/stdout, one request per line, tab separated:
+ *   <id> PING                       -> <id> PONG
+ *   <id> COMPILE <dir> <file>       -> <id> OK|ERR <base64 diagnostics>
+ *
+ * Each compilation gets its own file manager and task, and compiled classes are
+ * only written to the submission directory, never loaded into this JVM.
+ * Requests run on a fixed pool whose size is the first argument.
+ */
+public class JudgeCompileServer {
+    private static final PrintStream OUT = new PrintStream(new FileOutputStream(FileDescriptor.out), false, StandardCharsets.UTF_8);
+
+    public static void main(String[] args) throws IOException {
+        int concurrency = args.length > 0 ? Integer.parseInt(args[0]) : 2;
+        JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+        if (compiler == null) {
+            System.err.println("No system Java compiler available (is this a JRE?)");
+            System.exit(2);
+        }
+        ExecutorService pool = Executors.newFixedThreadPool(concurrency);
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+
+        String line;
+        while ((line = in.readLine()) != null) {
+            String[] parts = line.split("\t");
+            if (parts.length < 2) continue;
+            String id = parts[0];
+            if (parts[1].equals("PING")) {
+                reply(id + "\tPONG");
+            } else if (parts[1].equals("COMPILE") && parts.length == 4) {
+                pool.submit(() -> compile(compiler, id, parts[2], parts[3]));
+            } else {
+                reply(id + "\tERR\t" + encode("Unknown request: " + parts[1]));
+            }
+        }
+        // Parent went away: finish what we have and exit
+        pool.shutdown();
+    }
+
+    private static void compile(JavaCompiler compiler, String id, String dir, String file) {
+        StringWriter diagnostics = new StringWriter();
+        boolean ok;
+        try (StandardJavaFileManager fileManager = compiler.getStandardFileManager(null, null, StandardCharsets.UTF_8)) {
+            Iterable<? extends JavaFileObject> units = fileManager.getJavaFileObjects(new File(dir, file));
+            List<String> options = Arrays.asList("-d", dir);
+            ok = compiler.getTask(diagnostics, fileManager, null, options, null, units).call();
+        } catch (Throwable t) {
+            ok = false;
+            diagnostics.write("Compilation failed: " + t);
+        }
+        reply(id + "\t" + (ok ? "OK" : "ERR") + "\t" + encode(diagnostics.toString()));
+    }
+
+    private static String encode(String text) {
+        return Base64.getEncoder().encodeToString(text.getBytes(StandardCharsets.UTF_8));
+    }
+
+    private static synchronized void reply(String message) {
+        OUT.print(message);
+        OUT.print('\n');
+        OUT.flush();
+    }
+}
@@ -0,0 +1,65 @@
+import java.io.*;
+import java.math.BigInteger;
+import java.util.*;
+import java.util.stream.*;
+
+/**
+ * Touches the JDK classes typical judge submissions load so they end up in the
+ * class-data sharing archive. Run with "noop" to measure bare JVM startup.
+ */
+public class JudgeWarmup {
+    public static void main(String[] args) throws IOException {
+        if (args.length > 0 && args[0].equals("noop")) {
+            return;
+        }
+
+        String input = "5\n3 1 4 1 5\nhello world\n";
+
+        Scanner sc = new Scanner(new ByteArrayInputStream(input.getBytes()));
+        int n = sc.nextInt();
+        long[] a = new long[n];
+        for (int i = 0; i < n; i++) a[i] = sc.nextLong();
+
+        BufferedReader br = new BufferedReader(new InputStreamReader(new ByteArrayInputStream(input.getBytes())));
+        br.readLine();
+        StringTokenizer st = new StringTokenizer(br.readLine());
+        while (st.hasMoreTokens()) Integer.parseInt(st.nextToken());
+        String[] words = br.readLine().split(" ");
+
+        Arrays.sort(a);
+        Integer[] boxed = {3, 1, 2};
+        Arrays.sort(boxed, Collections.reverseOrder());
+
+        List<Integer> list = new ArrayList<>(Arrays.asList(boxed));
+        Collections.sort(list);
+        Map<String, Integer> hash = new HashMap<>();
+        TreeMap<Integer, Integer> tree = new TreeMap<>();
+        Set<Long> set = new HashSet<>();
+        TreeSet<Long> sorted = new TreeSet<>();
+        Deque<Integer> deque = new ArrayDeque<>();
+        PriorityQueue<long[]> pq = new PriorityQueue<>((x, y) -> Long.compare(x[0], y[0]));
+        LinkedList<Integer> linked = new LinkedList<>();
+        for (int i = 0; i < n; i++) {
+            hash.merge(words[i % words.length], 1, Integer::sum);
+            tree.put((int) a[i], i);
+            set.add(a[i]);
+            sorted.add(a[i]);
+            deque.addLast(i);
+            pq.add(new long[]{a[i], i});
+            linked.add(i);
+        }
+        while (!pq.isEmpty()) pq.poll();
+
+        long sum = Arrays.stream(a).sum();
+        String joined = list.stream().map(String::valueOf).collect(Collectors.joining(","));
+        BigInteger big = BigInteger.valueOf(sum).pow(3).mod(BigInteger.valueOf(1_000_000_007L));
+
+        StringBuilder sb = new StringBuilder();
+        sb.append(sum).append(' ').append(joined).append(' ').append(big).append('\n');
+        sb.append(String.format("%.3f%n", Math.sqrt(sum)));
+
+        PrintWriter out = new PrintWriter(new BufferedWriter(new OutputStreamWriter(System.out)));
+        out.print(sb);
+        out.flush();
+    }
+}
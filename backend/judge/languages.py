@@ -0,0 +1,155 @@
+"""
+The single source of truth for the languages the judge accepts.
+
+Every executor (subprocess, Docker, the legacy simple executor), the model
+choices and the serializers read from LANGUAGES, so adding a language is one
+entry below. Entries are frozen and the registry is read-only: executors derive
+per-submission commands from them and never mutate shared state.
+
+Command templates are tuples of arguments formatted with:
+    {dir}         the submission's working directory
+    {src}         full path of the source file
+    {exe}         full path of the compiled binary
+    {class_name}  public class name (JVM languages)
+and the single argument '{flags}' expands to the language's flags plus any
+extras an executor adds (precompiled header, class-data sharing archive).
+"""
+import re
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
+
+from .toolchain import compiler_version
+
+
+@dataclass(frozen=True)
+class Language:
+    key: str
+    label: str
+    source_template: str
+    run_template: Tuple[str, ...]
+    compile_template: Optional[Tuple[str, ...]] = None
+    # Binary whose `--version` identifies the toolchain (compiler or interpreter)
+    toolchain: str = ''
+    # Expected major version of `toolchain`; a mismatch is reported by `manage.py check`
+    version: str = ''
+    flags: Tuple[str, ...] = ()
+    # 'native' compiles to a binary, 'jvm' to class files, 'python' is interpreted
+    family: str = 'native'
+    artifact: Optional[str] = None
+    precompiled_header: Optional[str] = None
+    default_class_name: Optional[str] = None
+    time_multiplier: float = 1.0
+    memory_multiplier: float = 1.0
+    docker_image: str = ''
+
+    def class_name(self, code: str) -> Optional[str]:
+        if self.family != 'jvm':
+            return None
+        match = re.search(r'public\s+class\s+(\w+)', code)
+        return match.group(1) if match else self.default_class_name
+
+    def source_file(self, class_name: Optional[str] = None) -> str:
+        return self.source_template.format(class_name=class_name)
+
+    def context(self, directory: str, class_name: Optional[str] = None) -> Dict[str, str]:
+        directory = str(directory).rstrip('/')
+        return {
+            'dir': directory,
+            'src': f"{directory}/{self.source_file(class_name)}",
+            'exe': f"{directory}/submission",
+            'class_name': class_name or '',
+        }
+
+    def compile_args(self, context: Dict[str, str], extra_flags: List[str] = ()) -> Optional[List[str]]:
+        if not self.compile_template:
+            return None
+        return self._expand(self.compile_template, context, extra_flags)
+
+    def run_args(self, context: Dict[str, str], extra_flags: List[str] = ()) -> List[str]:
+        return self._expand(self.run_template, context, extra_flags)
+
+    def time_limit_ms(self, base_ms: int) -> int:
+        return int(base_ms * self.time_multiplier)
+
+    def memory_limit_mb(self, base_mb: int) -> int:
+        return int(base_mb * self.memory_multiplier)
+
+    def installed_version(self) -> str:
+        return compiler_version(self.toolchain) if self.toolchain else ''
+
+    def version_matches(self) -> bool:
+        installed = self.installed_version()
+        return bool(installed) and re.search(rf"\b{re.escape(self.version)}(\.|\b)", installed) is not None
+
+    def _expand(self, template: Tuple[str, ...], context: Dict[str, str], extra_flags: List[str]) -> List[str]:
+        args = []
+        for part in template:
+            if part == '{flags}':
+                args.extend(self.flags)
+                args.extend(extra_flags)
+            else:
+                args.append(part.format(**context))
+        return args
+
+
+_LANGUAGES = [
+    Language(
+        key='python',
+        label='Python',
+        source_template='submission.py',
+        run_template=('python3', '{src}'),
+        toolchain='python3',
+        version='3.11',
+        family='python',
+        time_multiplier=3.0,
+        docker_image='python:3.11-alpine',
+    ),
+    Language(
+        key='java',
+        label='Java',
+        source_template='{class_name}.java',
+        compile_template=('javac', '{src}'),
+        # Serial GC and no perf-data mmap trim JVM startup; a large thread stack lets recursive solutions run
+        run_template=('java', '{flags}', '-cp', '{dir}', '{class_name}'),
+        toolchain='javac',
+        version='17',
+        flags=('-XX:+UseSerialGC', '-XX:-UsePerfData', '-Xss64m'),
+        family='jvm',
+        default_class_name='Solution',
+        time_multiplier=1.5,
+        memory_multiplier=2.0,
+        docker_image='openjdk:17-slim',
+    ),
+    Language(
+        key='cpp',
+        label='C++',
+        source_template='submission.cpp',
+        compile_template=('g++', '{flags}', '{src}', '-o', '{exe}'),
+        run_template=('{exe}',),
+        toolchain='g++',
+        version='12',
+        flags=('-O0', '-std=c++17'),
+        artifact='submission',
+        precompiled_header='bits/stdc++.h',
+        docker_image='gcc:12',
+    ),
+    Language(
+        key='pypy',
+        label='PyPy 3',
+        source_template='submission.py',
+        run_template=('pypy3', '{src}'),
+        toolchain='pypy3',
+        version='3.9',
+        family='python',
+        time_multiplier=1.5,
+        memory_multiplier=2.0,
+        docker_image='pypy:3.9-slim',
+    ),
+]
+
+LANGUAGES = MappingProxyType({language.key: language for language in _LANGUAGES})
+
+
+def get_language(key: Optional[str]) -> Optional[Language]:
+    return LANGUAGES.get((key or '').lower())
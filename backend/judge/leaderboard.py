@@ -0,0 +1,340 @@
+"""
+Rankings maintained incrementally as verdicts arrive.
+
+A Leaderboard orders users by one integer sort key per user:
+
+    'icpc'   solved problems desc, then penalty asc; penalty is minutes to each
+             first AC plus `penalty_minutes` per rejected attempt before it
+    'score'  points desc (per-problem points, e.g. by difficulty)
+
+Keys live in a backend chosen by LEADERBOARD_BACKEND:
+
+    'local'  an indexable skip list per process; rebuilt from the database every
+             LEADERBOARD_LOCAL_REFRESH seconds so workers that did not judge a
+             verdict catch up
+    'redis'  one sorted set per board at LEADERBOARD_REDIS_URL, shared by all
+             workers; rebuilt every LEADERBOARD_REDIS_REFRESH seconds
+
+Both give O(log n) rank lookups and top-K pages. Boards are derived data: when a
+board is missing (first use, expired, flushed) it is rebuilt from its loader. A
+solve recorded between the loader's read and the swap is overwritten by the
+rebuild, so boards are rebuilt periodically and such a solve is back after the
+next one.
+
+Only the global board is registered. Contest scoreboards are not built on this:
+they need per-problem cells and freeze handling that one sort key cannot hold, so
+contests/scoreboard.py renders them from the contest's submissions instead.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Sum
+
+from .models import UserProblemStats
+from .skiplist import IndexableSkipList
+
+logger = logging.getLogger(__name__)
+
+# Penalty never reaches this many minutes, so solved * scale - penalty orders both at once
+PENALTY_SCALE = 10 ** 7
+
+DIFFICULTY_POINTS = {
+    'veryeasy': 1,
+    'easy': 2,
+    'medium': 4,
+    'hard': 7,
+    'veryhard': 10,
+}
+
+# (user_id, solved, penalty) rows for icpc boards, (user_id, score) rows for score boards
+Loader = Callable[[], Iterable[Tuple]]
+
+
+class LocalBackend:
+    """Sorted keys in an in-process skip list; descending by key, ties by member."""
+
+    def __init__(self, refresh_seconds: Optional[float] = None):
+        if refresh_seconds is None:
+            refresh_seconds = getattr(settings, 'LEADERBOARD_LOCAL_REFRESH', 60)
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._scores: Dict[str, int] = {}
+        self._ranked = IndexableSkipList()
+        self._built_at: Optional[float] = None
+
+    def is_built(self) -> bool:
+        with self._lock:
+            return self._built_at is not None and time.monotonic() - self._built_at < self.refresh_seconds
+
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+
+    def replace(self, scores: Dict[str, int]):
+        ranked = IndexableSkipList()
+        for member, score in scores.items():
+            ranked.insert((-score, member))
+        with self._lock:
+            self._scores = dict(scores)
+            self._ranked = ranked
+            self._built_at = time.monotonic()
+
+    def increment(self, member: str, delta: int) -> int:
+        with self._lock:
+            old = self._scores.get(member)
+            if old is not None:
+                self._ranked.remove((-old, member))
+            new = (old or 0) + delta
+            self._scores[member] = new
+            self._ranked.insert((-new, member))
+            return new
+
+    def score(self, member: str) -> Optional[int]:
+        with self._lock:
+            return self._scores.get(member)
+
+    def count_above(self, score: int) -> int:
+        with self._lock:
+            # Keys are (-score, member) and '' sorts before every member
+            return self._ranked.bisect_left((-score, ''))
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._ranked)
+
+    def page(self, offset: int, limit: int) -> List[Tuple[str, int]]:
+        with self._lock:
+            return [(member, -key) for key, member in self._ranked.islice(offset, offset + limit)]
+
+
+class RedisBackend:
+    """One sorted set per board; ZINCRBY keeps concurrent increments from all workers exact."""
+
+    def __init__(self, key: str, url: Optional[str] = None, refresh_seconds: Optional[int] = None):
+        import redis
+
+        url = url or getattr(settings, 'LEADERBOARD_REDIS_URL', '')
+        if refresh_seconds is None:
+            refresh_seconds = getattr(settings, 'LEADERBOARD_REDIS_REFRESH', 600)
+        self.client = redis.Redis.from_url(url)
+        self.key = f"leaderboard:{key}"
+        self.built_key = f"{self.key}:built"
+        self.refresh_seconds = refresh_seconds
+
+    def is_built(self) -> bool:
+        return bool(self.client.exists(self.built_key))
+
+    def invalidate(self):
+        self.client.delete(self.built_key)
+
+    def replace(self, scores: Dict[str, int]):
+        staging = f"{self.key}:staging"
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(staging)
+        items = list(scores.items())
+        for start in range(0, len(items), 1000):
+            pipe.zadd(staging, dict(items[start:start + 1000]))
+        if items:
+            pipe.rename(staging, self.key)
+        else:
+            pipe.delete(self.key)
+        # Expiring the marker makes the next read rebuild, so the board reconverges with the database
+        pipe.set(self.built_key, 1, ex=self.refresh_seconds)
+        pipe.execute()
+
+    def increment(self, member: str, delta: int) -> int:
+        return int(self.client.zincrby(self.key, delta, member))
+
+    def score(self, member: str) -> Optional[int]:
+        value = self.client.zscore(self.key, member)
+        return None if value is None else int(value)
+
+    def count_above(self, score: int) -> int:
+        return self.client.zcount(self.key, f"({score}", '+inf')
+
+    def size(self) -> int:
+        return self.client.zcard(self.key)
+
+    def page(self, offset: int, limit: int) -> List[Tuple[str, int]]:
+        rows = self.client.zrevrange(self.key, offset, offset + limit - 1, withscores=True)
+        return [(member.decode(), int(score)) for member, score in rows]
+
+
+def make_backend(name: str):
+    kind = getattr(settings, 'LEADERBOARD_BACKEND', 'local')
+    if kind == 'redis':
+        return RedisBackend(name)
+    return LocalBackend()
+
+
+class Leaderboard:
+    def __init__(self, name: str, loader: Loader, mode: str = 'icpc', penalty_minutes: Optional[int] = None, backend=None):
+        if mode not in ('icpc', 'score'):
+            raise ValueError(f"Unknown leaderboard mode: {mode}")
+        if penalty_minutes is None:
+            penalty_minutes = getattr(settings, 'LEADERBOARD_PENALTY_MINUTES', 20)
+        self.name = name
+        self.mode = mode
+        self.penalty_minutes = penalty_minutes
+        self.loader = loader
+        self.backend = backend or make_backend(name)
+        self._build_lock = threading.Lock()
+
+    # Sort keys
+
+    def encode(self, row: Tuple) -> Tuple[str, int]:
+        if self.mode == 'icpc':
+            user_id, solved, penalty = row
+            return str(user_id), solved * PENALTY_SCALE - penalty
+        user_id, score = row
+        return str(user_id), score
+
+    def decode(self, key: int) -> Dict:
+        if self.mode == 'icpc':
+            solved = -(-key // PENALTY_SCALE)
+            return {'solved': solved, 'penalty': solved * PENALTY_SCALE - key}
+        return {'score': key}
+
+    # Updates
+
+    def rebuild(self):
+        self.backend.replace(dict(self.encode(row) for row in self.loader()))
+
+    def invalidate(self):
+        """Makes the next read rebuild the board, e.g. after users or problems were deleted."""
+        self.backend.invalidate()
+
+    def ensure_built(self):
+        if self.backend.is_built():
+            return
+        with self._build_lock:
+            if not self.backend.is_built():
+                self.rebuild()
+
+    def record_solve(self, user_id: int, wrong_attempts: int = 0, minutes: int = 0, points: int = 0):
+        """Adds a first accepted solution of one problem to the user's standing."""
+        if not self.backend.is_built():
+            # The next read rebuilds from the database, which already includes this solve
+            return
+        if self.mode == 'icpc':
+            delta = PENALTY_SCALE - (minutes + wrong_attempts * self.penalty_minutes)
+        else:
+            delta = points
+        self.backend.increment(str(user_id), delta)
+
+    # Reads
+
+    def size(self) -> int:
+        self.ensure_built()
+        return self.backend.size()
+
+    def rank(self, user_id: int) -> Optional[Dict]:
+        """Standing of one user (ties share a rank), or None when they have no accepted solution."""
+        self.ensure_built()
+        key = self.backend.score(str(user_id))
+        if key is None:
+            return None
+        return {'user_id': user_id, 'rank': self.backend.count_above(key) + 1, **self.decode(key)}
+
+    def top(self, offset: int = 0, limit: int = 50) -> List[Dict]:
+        self.ensure_built()
+        rows = self.backend.page(offset, limit)
+        standings = []
+        rank = None
+        previous = None
+        for position, (member, key) in enumerate(rows, start=offset + 1):
+            if key != previous:
+                rank = position if previous is not None else self.backend.count_above(key) + 1
+                previous = key
+            standings.append({'user_id': int(member), 'rank': rank, **self.decode(key)})
+        return standings
+
+
+def with_usernames(standings: List[Dict]) -> List[Dict]:
+    """Replaces user ids by usernames in one query; users deleted since the board was built are left out."""
+    ids = [row['user_id'] for row in standings]
+    names = dict(get_user_model().objects.filter(id__in=ids).values_list('id', 'username'))
+    return [
+        {'username': names[row['user_id']], **{k: v for k, v in row.items() if k != 'user_id'}}
+        for row in standings
+        if row['user_id'] in names
+    ]
+
+
+# Global board
+
+def load_global_icpc() -> Iterable[Tuple]:
+    penalty_minutes = getattr(settings, 'LEADERBOARD_PENALTY_MINUTES', 20)
+    rows = (
+        UserProblemStats.objects
+        .filter(solved=True)
+        .values('user_id')
+        .annotate(solved=Count('id'), tries=Sum('attempts_to_solve'))
+        .order_by()
+    )
+    for row in rows.iterator():
+        yield row['user_id'], row['solved'], ((row['tries'] or row['solved']) - row['solved']) * penalty_minutes
+
+
+def load_global_score() -> Iterable[Tuple]:
+    rows = (
+        UserProblemStats.objects
+        .filter(solved=True)
+        .values('user_id', 'problem__difficulty')
+        .annotate(solved=Count('id'))
+        .order_by()
+    )
+    scores: Dict[int, int] = {}
+    for row in rows.iterator():
+        points = DIFFICULTY_POINTS.get(row['problem__difficulty'], 1)
+        scores[row['user_id']] = scores.get(row['user_id'], 0) + row['solved'] * points
+    return scores.items()
+
+
+_boards: Dict[str, Leaderboard] = {}
+_boards_lock = threading.Lock()
+
+
+def get_leaderboard(name: str, loader: Loader, mode: str = 'icpc', **kwargs) -> Leaderboard:
+    """The per-process Leaderboard registered under `name`, created on first use."""
+    with _boards_lock:
+        board = _boards.get(name)
+        if board is None:
+            board = _boards[name] = Leaderboard(name, loader, mode=mode, **kwargs)
+        return board
+
+
+def global_leaderboard() -> Leaderboard:
+    mode = getattr(settings, 'LEADERBOARD_GLOBAL_MODE', 'score')
+    loader = load_global_icpc if mode == 'icpc' else load_global_score
+    return get_leaderboard(f'global:{mode}', loader, mode=mode)
+
+
+def invalidate_leaderboards():
+    """Rebuilds every board on its next read; call it after deleting users or problems."""
+    # Registers the global board even in processes that never read it, so its shared built key goes too
+    global_leaderboard()
+    with _boards_lock:
+        boards = list(_boards.values())
+    for board in boards:
+        try:
+            board.invalidate()
+        except Exception:
+            logger.exception("Failed to invalidate leaderboard %s", board.name)
+
+
+def record_global_solve(user_id: int, attempts: int, difficulty: str):
+    """Called after the transaction recording a user's first AC on a problem commits."""
+    try:
+        global_leaderboard().record_solve(
+            user_id,
+            wrong_attempts=attempts - 1,
+            points=DIFFICULTY_POINTS.get(difficulty, 1),
+        )
+    except Exception:
+        # Rankings are derived data; a rebuild repairs them, the verdict must not fail
+        logger.exception("Failed to update the global leaderboard")
@@ -0,0 +1,103 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, OuterRef, Q, Subquery
+
+from judge.leaderboard import global_leaderboard
+from judge.models import LanguageStats, ProblemStats, Submission, UserProblemStats
+from judge.stats import STATUS_RANK, better_status
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the user × problem, per-problem and per-language statistics tables "
+        "and the global leaderboard from the submission history. "
+        "Safe to rerun; the tables are replaced atomically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        final = Submission.objects.filter(status__in=STATUS_RANK).order_by()
+
+        # One grouped scan: (user, problem, status) -> count, first submission and last submission
+        progress = {}
+        accepted = defaultdict(int)
+        groups = (
+            final
+            .values('user_id', 'problem_id', 'status')
+            .annotate(count=Count('id'), first=Min('submitted_at'), last=Max('submitted_at'))
+            .iterator()
+        )
+        for row in groups:
+            key = (row['user_id'], row['problem_id'])
+            stats = progress.get(key)
+            if stats is None:
+                stats = progress[key] = UserProblemStats(
+                    user_id=row['user_id'],
+                    problem_id=row['problem_id'],
+                    best_status=row['status'],
+                    last_submitted_at=row['last'],
+                )
+            stats.attempts += row['count']
+            stats.best_status = better_status(row['status'], stats.best_status)
+            stats.last_submitted_at = max(stats.last_submitted_at, row['last'])
+            if row['status'] == 'accepted':
+                stats.solved = True
+                stats.first_solved_at = row['first']
+                accepted[row['problem_id']] += row['count']
+
+        problems = defaultdict(lambda: {'submissions': 0, 'accepted': 0, 'attempted_users': 0, 'solved_users': 0})
+        for (_, problem_id), stats in progress.items():
+            totals = problems[problem_id]
+            totals['submissions'] += stats.attempts
+            totals['attempted_users'] += 1
+            totals['solved_users'] += int(stats.solved)
+            totals['accepted'] = accepted[problem_id]
+
+        # Attempts up to and including each first AC, for ICPC-style penalties
+        first_accepted = (
+            Submission.objects
+            .filter(user=OuterRef('user'), problem=OuterRef('problem'), status='accepted')
+            .order_by('submitted_at')
+            .values('submitted_at')[:1]
+        )
+        tries = (
+            final
+            .annotate(first_accepted=Subquery(first_accepted))
+            .filter(submitted_at__lte=F('first_accepted'))
+            .values('user_id', 'problem_id')
+            .annotate(count=Count('id'))
+            .iterator()
+        )
+        for row in tries:
+            progress[(row['user_id'], row['problem_id'])].attempts_to_solve = row['count']
+
+        languages = [
+            LanguageStats(user_id=row['user_id'], language=row['language'], submissions=row['submissions'], accepted=row['accepted'])
+            for row in final.values('user_id', 'language').annotate(
+                submissions=Count('id'),
+                accepted=Count('id', filter=Q(status='accepted')),
+            ).iterator()
+        ]
+
+        with transaction.atomic():
+            UserProblemStats.objects.all().delete()
+            ProblemStats.objects.all().delete()
+            LanguageStats.objects.all().delete()
+            UserProblemStats.objects.bulk_create(progress.values(), batch_size=batch_size)
+            ProblemStats.objects.bulk_create(
+                [ProblemStats(problem_id=problem_id, **totals) for problem_id, totals in problems.items()],
+                batch_size=batch_size,
+            )
+            LanguageStats.objects.bulk_create(languages, batch_size=batch_size)
+            final.filter(stats_recorded=False).update(stats_recorded=True)
+        global_leaderboard().rebuild()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt stats: {len(progress)} user × problem rows, {len(problems)} problems, "
+            f"{len(languages)} user × language rows."
+        ))
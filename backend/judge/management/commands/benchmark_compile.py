@@ -0,0 +1,72 @@
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from judge.execution_provider import SubprocessExecutionProvider
+from judge.languages import get_language
+
+SAMPLE_CPP = """#include <bits/stdc++.h>
+using namespace std;
+
+int main() {
+    ios::sync_with_stdio(false);
+    cin.tie(nullptr);
+    int n;
+    cin >> n;
+    vector<long long> a(n);
+    for (auto &x : a) cin >> x;
+    sort(a.begin(), a.end());
+    map<long long, int> freq;
+    for (auto x : a) freq[x]++;
+    cout << accumulate(a.begin(), a.end(), 0LL) << " " << freq.size() << "\\n";
+    return 0;
+}
+"""
+
+
+class Command(BaseCommand):
+    help = "Measures C++ compile latency with and without the managed PCH and compile cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Compilations per scenario')
+
+    def handle(self, *args, **options):
+        runs = options['runs']
+
+        # Build the PCH outside the timed section so it is reported on its own
+        start = time.perf_counter()
+        SubprocessExecutionProvider(use_pch=True, use_compile_cache=False)._compile_flags(get_language('cpp'))
+        pch_build_ms = (time.perf_counter() - start) * 1000
+
+        scenarios = {
+            'baseline': SubprocessExecutionProvider(use_pch=False, use_compile_cache=False),
+            'pch': SubprocessExecutionProvider(use_pch=True, use_compile_cache=False),
+            'pch_and_cache': SubprocessExecutionProvider(use_pch=True, use_compile_cache=True),
+        }
+
+        report = {'runs': runs, 'pch_build_ms': round(pch_build_ms, 1), 'scenarios': {}}
+        for name, provider in scenarios.items():
+            timings = []
+            for i in range(runs):
+                # Vary the source per run unless we are deliberately measuring cache hits
+                code = SAMPLE_CPP if name == 'pch_and_cache' else f"{SAMPLE_CPP}// run {i}\n"
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    start = time.perf_counter()
+                    result = provider.compile(code, 'cpp', Path(temp_dir))
+                    elapsed = (time.perf_counter() - start) * 1000
+                if not result['success']:
+                    self.stderr.write(result.get('error_message', 'Compilation failed'))
+                    return
+                timings.append(elapsed)
+            report['scenarios'][name] = {
+                'min_ms': round(min(timings), 1),
+                'median_ms': round(statistics.median(timings), 1),
+                'mean_ms': round(statistics.mean(timings), 1),
+                'max_ms': round(max(timings), 1),
+            }
+
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,74 @@
+import json
+import statistics
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from judge.execution_provider import SubprocessExecutionProvider
+
+SAMPLE_JAVA = """import java.io.*;
+import java.util.*;
+
+public class Solution {
+    public static void main(String[] args) throws IOException {
+        BufferedReader br = new BufferedReader(new InputStreamReader(System.in));
+        int n = Integer.parseInt(br.readLine().trim());
+        StringTokenizer st = new StringTokenizer(br.readLine());
+        long[] a = new long[n];
+        for (int i = 0; i < n; i++) a[i] = Long.parseLong(st.nextToken());
+        Arrays.sort(a);
+        Map<Long, Integer> freq = new HashMap<>();
+        for (long x : a) freq.merge(x, 1, Integer::sum);
+        System.out.println(Arrays.stream(a).sum() + " " + freq.size());
+    }
+}
+"""
+
+SAMPLE_INPUT = "5\n3 1 4 1 5\n"
+
+
+class Command(BaseCommand):
+    help = "Compares per-test Java run time for the plain and class-data sharing runner modes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tests', type=int, default=20, help='Test executions per mode')
+
+    def handle(self, *args, **options):
+        report = {'tests': options['tests'], 'modes': {}}
+        for mode in ('plain', 'cds'):
+            provider = SubprocessExecutionProvider(java_runner=mode)
+            with tempfile.TemporaryDirectory() as temp_dir:
+                temp_path = Path(temp_dir)
+                comp_res = provider.compile(SAMPLE_JAVA, 'java', temp_path)
+                if not comp_res['success']:
+                    self.stderr.write(comp_res.get('error_message', 'Compilation failed'))
+                    return
+                startup_ms = comp_res.get('startup_overhead_ms', 0)
+
+                measured = []
+                for _ in range(options['tests']):
+                    exec_res = provider.execute(
+                        run_cmd=comp_res['run_cmd'],
+                        input_text=SAMPLE_INPUT,
+                        time_limit_ms=5000,
+                        memory_limit_mb=1024,
+                        output_limit_bytes=1024 * 1024,
+                        temp_dir=temp_path,
+                        startup_overhead_ms=startup_ms
+                    )
+                    if exec_res['status'] != 'success':
+                        self.stderr.write(f"{mode}: {exec_res['status']} {exec_res.get('stderr', '')}")
+                        return
+                    measured.append(exec_res['time_taken'])
+
+            wall = [t + startup_ms for t in measured]
+            report['modes'][mode] = {
+                'startup_overhead_ms': startup_ms,
+                'wall_median_ms': statistics.median(wall),
+                'wall_mean_ms': round(statistics.mean(wall), 1),
+                'measured_median_ms': statistics.median(measured),
+                'measured_max_ms': max(measured),
+            }
+
+        self.stdout.write(json.dumps(report, indent=2))
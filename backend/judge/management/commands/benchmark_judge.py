@@ -0,0 +1,241 @@
+import json
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from judge.benchmark_fixtures import PROBLEMS, solutions_for
+from judge.languages import LANGUAGES
+from judge.models import Problem, Submission, TestCase
+from judge.runner import SubmissionRunner
+
+BENCH_USERNAME = 'judge_bench'
+
+
+class _TimedProvider:
+    """Wraps an ExecutionProvider and accumulates the time spent compiling and running."""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.compile_ms = 0.0
+        self.run_ms = 0.0
+        self.tests_run = 0
+
+    def compile(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.provider.compile(*args, **kwargs)
+        finally:
+            self.compile_ms += (time.perf_counter() - start) * 1000
+
+    def execute(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.provider.execute(*args, **kwargs)
+        finally:
+            self.run_ms += (time.perf_counter() - start) * 1000
+            self.tests_run += 1
+
+
+def _percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def _summary(values):
+    if not values:
+        return {}
+    return {
+        'p50': round(_percentile(values, 50), 1),
+        'p95': round(_percentile(values, 95), 1),
+        'p99': round(_percentile(values, 99), 1),
+        'mean': round(statistics.mean(values), 1),
+        'max': round(max(values), 1),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives SubmissionRunner with fixture problems and AC/WA/TLE/MLE/RE reference solutions; "
+        "reports verdict latency percentiles, throughput, compile vs run time and verdict correctness as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='Submissions judged in parallel')
+        parser.add_argument('--repeat', type=int, default=1, help='Times each reference solution is submitted')
+        parser.add_argument('--languages', help='Comma-separated language keys (default: every installed language)')
+        parser.add_argument('--with-ai', action='store_true', help='Keep AI error reports for CE/RE verdicts')
+        parser.add_argument('--keep', action='store_true', help='Keep the fixture problems and submissions afterwards')
+        parser.add_argument('--output', help='Also write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        languages = self._select_languages(options['languages'])
+        if not languages:
+            raise CommandError("No benchmark languages are installed.")
+
+        user = self._ensure_user()
+        problems = self._load_fixtures()
+
+        jobs = []
+        for _ in range(options['repeat']):
+            for fixture in PROBLEMS:
+                for language in languages:
+                    for expected, code in solutions_for(fixture, language).items():
+                        jobs.append({
+                            'problem': problems[fixture['slug']],
+                            'language': language.key,
+                            'expected': expected,
+                            'code': code,
+                        })
+
+        results = []
+        results_lock = threading.Lock()
+
+        def judge(job, enqueued_at):
+            started_at = time.perf_counter()
+            try:
+                runner = SubmissionRunner(enrich_errors=options['with_ai'], record_stats=False)
+                runner.provider = _TimedProvider(runner.provider)
+                submission = Submission.objects.create(
+                    user=user,
+                    problem=job['problem'],
+                    code=job['code'],
+                    language=job['language'],
+                )
+                runner.run_submission_sync(submission.id)
+                submission.refresh_from_db(fields=['status'])
+                finished_at = time.perf_counter()
+                with results_lock:
+                    results.append({
+                        'problem': job['problem'].slug,
+                        'language': job['language'],
+                        'expected': job['expected'],
+                        'actual': submission.status,
+                        'queue_wait_ms': (started_at - enqueued_at) * 1000,
+                        'service_ms': (finished_at - started_at) * 1000,
+                        'latency_ms': (finished_at - enqueued_at) * 1000,
+                        'compile_ms': runner.provider.compile_ms,
+                        'run_ms': runner.provider.run_ms,
+                        'tests_run': runner.provider.tests_run,
+                    })
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            futures = [pool.submit(judge, job, time.perf_counter()) for job in jobs]
+            for future in futures:
+                future.result()
+        wall_s = time.perf_counter() - start
+
+        report = self._build_report(results, wall_s, options, languages)
+
+        if not options['keep']:
+            Problem.objects.filter(slug__in=[fixture['slug'] for fixture in PROBLEMS]).delete()
+            user.delete()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+        self.stdout.write(output)
+
+        if report['verdict_mismatches']:
+            raise CommandError(f"{len(report['verdict_mismatches'])} submission(s) got an unexpected verdict.")
+
+    def _select_languages(self, requested):
+        if requested:
+            keys = [key.strip().lower() for key in requested.split(',') if key.strip()]
+            unknown = [key for key in keys if key not in LANGUAGES]
+            if unknown:
+                raise CommandError(f"Unknown language(s): {', '.join(unknown)}")
+            return [LANGUAGES[key] for key in keys]
+        return [language for language in LANGUAGES.values() if language.installed_version()]
+
+    def _ensure_user(self):
+        User = get_user_model()
+        user, created = User.objects.get_or_create(
+            username=BENCH_USERNAME,
+            defaults={'email': f'{BENCH_USERNAME}@localhost'}
+        )
+        if created:
+            user.set_unusable_password()
+            user.save()
+        return user
+
+    def _load_fixtures(self):
+        """Creates or refreshes the fixture problems and their tests; returns them by slug."""
+        problems = {}
+        for fixture in PROBLEMS:
+            problem, _ = Problem.objects.update_or_create(
+                slug=fixture['slug'],
+                defaults={
+                    'title': fixture['title'],
+                    'description': fixture['description'],
+                    'time_limit': fixture['time_limit'],
+                    'memory_limit': fixture['memory_limit'],
+                }
+            )
+            TestCase.objects.filter(problem=problem).delete()
+            TestCase.objects.bulk_create([
+                TestCase(
+                    problem=problem,
+                    name=f"{problem.slug}_input_{idx:04}",
+                    input_text=input_text,
+                    output_text=output_text,
+                )
+                for idx, (input_text, output_text) in enumerate(fixture['tests'], start=1)
+            ])
+            problems[fixture['slug']] = problem
+        return problems
+
+    def _build_report(self, results, wall_s, options, languages):
+        by_language = defaultdict(list)
+        by_verdict = defaultdict(list)
+        for result in results:
+            by_language[result['language']].append(result)
+            by_verdict[result['expected']].append(result)
+
+        def breakdown(group):
+            return {
+                'submissions': len(group),
+                'latency_ms': _summary([r['latency_ms'] for r in group]),
+                'compile_ms': _summary([r['compile_ms'] for r in group]),
+                'run_ms': _summary([r['run_ms'] for r in group]),
+            }
+
+        total_compile = sum(r['compile_ms'] for r in results)
+        total_run = sum(r['run_ms'] for r in results)
+        total_service = sum(r['service_ms'] for r in results)
+        return {
+            'concurrency': options['concurrency'],
+            'repeat': options['repeat'],
+            'languages': [language.key for language in languages],
+            'submissions': len(results),
+            'tests_executed': sum(r['tests_run'] for r in results),
+            'wall_s': round(wall_s, 2),
+            'submissions_per_sec': round(len(results) / wall_s, 2) if wall_s else 0,
+            'latency_ms': _summary([r['latency_ms'] for r in results]),
+            'queue_wait_ms': _summary([r['queue_wait_ms'] for r in results]),
+            'service_ms': _summary([r['service_ms'] for r in results]),
+            'time_split': {
+                'compile_ms': round(total_compile, 1),
+                'run_ms': round(total_run, 1),
+                'other_ms': round(total_service - total_compile - total_run, 1),
+                'compile_share': round(total_compile / total_service, 3) if total_service else 0,
+                'run_share': round(total_run / total_service, 3) if total_service else 0,
+            },
+            'by_language': {key: breakdown(group) for key, group in sorted(by_language.items())},
+            'by_verdict': {key: breakdown(group) for key, group in sorted(by_verdict.items())},
+            'verdict_mismatches': [
+                {key: r[key] for key in ('problem', 'language', 'expected', 'actual')}
+                for r in results if r['actual'] != r['expected']
+            ],
+        }
@@ -0,0 +1,62 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from judge.execution_provider import SubprocessExecutionProvider
+from judge.python_conformance import run_conformance
+
+SAMPLE_PYTHON = """import sys
+from collections import Counter
+
+data = sys.stdin.read().split()
+n = int(data[0])
+a = list(map(int, data[1:n + 1]))
+print(sum(a), len(Counter(a)))
+"""
+
+
+class Command(BaseCommand):
+    help = "Checks the Python fork-server runner against python3 and measures per-test overhead saved."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tests', type=int, default=100, help='Tests per problem run')
+        parser.add_argument('--skip-conformance', action='store_true', help='Only run the benchmark')
+
+    def handle(self, *args, **options):
+        report = {'tests': options['tests']}
+
+        if not options['skip_conformance']:
+            mismatches = run_conformance()
+            report['conformance'] = {'passed': not mismatches, 'mismatches': mismatches}
+            if mismatches:
+                self.stdout.write(json.dumps(report, indent=2))
+                raise CommandError("Fork-server runner does not match python3; see mismatches above.")
+
+        test_input = "5\n3 1 4 1 5\n"
+        totals = {}
+        for mode in ('plain', 'forkserver'):
+            provider = SubprocessExecutionProvider(python_runner=mode)
+            with tempfile.TemporaryDirectory() as temp_dir:
+                temp_path = Path(temp_dir)
+                comp_res = provider.compile(SAMPLE_PYTHON, 'python', temp_path)
+                # Start the server outside the timed loop, as it would be in a running judge
+                provider.execute(comp_res['run_cmd'], test_input, 2000, 256, 1024 * 1024, temp_path, runner=comp_res.get('runner'))
+
+                start = time.perf_counter()
+                for _ in range(options['tests']):
+                    exec_res = provider.execute(comp_res['run_cmd'], test_input, 2000, 256, 1024 * 1024, temp_path, runner=comp_res.get('runner'))
+                    if exec_res['status'] != 'success':
+                        raise CommandError(f"{mode}: {exec_res['status']} {exec_res.get('stderr', '')}")
+                totals[mode] = (time.perf_counter() - start) * 1000
+
+        per_test = {mode: total / options['tests'] for mode, total in totals.items()}
+        report['modes'] = {
+            mode: {'total_ms': round(totals[mode], 1), 'per_test_ms': round(per_test[mode], 2)}
+            for mode in totals
+        }
+        report['saved_per_test_ms'] = round(per_test['plain'] - per_test['forkserver'], 2)
+        report['saved_per_problem_ms'] = round(totals['plain'] - totals['forkserver'], 1)
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from judge.leaderboard import global_leaderboard
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the global leaderboard from UserProblemStats (after a backend switch or a Redis flush)."
+
+    def handle(self, *args, **options):
+        board = global_leaderboard()
+        board.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {board.name} with {board.backend.size()} ranked users."))
@@ -0,0 +1,123 @@
+"""
+Per-phase timing for the judging pipeline.
+
+SubmissionRunner opens a JudgeTrace per submission and times each phase
+(queue wait, fetching tests, sandbox setup, compile, every test's run and
+compare, AI enrichment, save). When the trace finishes it is handed to the
+configured sink:
+
+    JUDGE_METRICS_SINK = 'none'        # default, discards traces
+    JUDGE_METRICS_SINK = 'log'         # one structured log line per submission
+    JUDGE_METRICS_SINK = 'prometheus'  # histograms served at /metrics/ (and /api/judge/metrics/)
+    JUDGE_METRICS_SINK = 'myapp.sinks.CustomSink'  # any MetricsSink subclass
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from backend.metrics import JUDGE_PHASE_SECONDS, JUDGE_VERDICTS, render_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class JudgeTrace:
+    """Timed phases of judging one submission."""
+
+    def __init__(self, sink: 'MetricsSink', submission_id: Optional[int] = None, language: str = ''):
+        self.sink = sink
+        self.submission_id = submission_id
+        self.language = language
+        self.verdict = ''
+        self.spans: List[Dict] = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def span(self, phase: str, **attrs):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, (time.perf_counter() - start) * 1000, **attrs)
+
+    def record(self, phase: str, duration_ms: float, **attrs):
+        self.spans.append({'phase': phase, 'duration_ms': round(duration_ms, 3), **attrs})
+
+    def finish(self, verdict: str = ''):
+        self.verdict = verdict
+        self.record('total', (time.perf_counter() - self._start) * 1000)
+        try:
+            self.sink.emit(self)
+        except Exception:
+            logger.exception("Judge metrics sink failed")
+
+
+class MetricsSink:
+    """Receives every finished JudgeTrace."""
+
+    def emit(self, trace: JudgeTrace):
+        raise NotImplementedError
+
+    def render(self) -> Optional[str]:
+        """Prometheus text exposition, or None when the sink does not serve one."""
+        return None
+
+
+class NullSink(MetricsSink):
+    def emit(self, trace: JudgeTrace):
+        pass
+
+
+class LogSink(MetricsSink):
+    def __init__(self, logger_name: str = 'judge.timing'):
+        self.logger = logging.getLogger(logger_name)
+
+    def emit(self, trace: JudgeTrace):
+        self.logger.info(json.dumps({
+            'submission_id': trace.submission_id,
+            'language': trace.language,
+            'verdict': trace.verdict,
+            'spans': trace.spans,
+        }))
+
+
+class PrometheusSink(MetricsSink):
+    """Feeds the backend-wide, multi-worker safe histograms in backend.metrics."""
+
+    def emit(self, trace: JudgeTrace):
+        for span in trace.spans:
+            JUDGE_PHASE_SECONDS.labels(span['phase'], trace.language).observe(span['duration_ms'] / 1000)
+        JUDGE_VERDICTS.labels(trace.language, trace.verdict).inc()
+
+    def render(self) -> str:
+        return render_metrics().decode('utf-8')
+
+
+SINKS = {
+    'none': NullSink,
+    'log': LogSink,
+    'prometheus': PrometheusSink,
+}
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_metrics_sink() -> MetricsSink:
+    """The per-process sink selected by JUDGE_METRICS_SINK."""
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            name = getattr(settings, 'JUDGE_METRICS_SINK', 'none') or 'none'
+            factory = SINKS.get(name) or import_string(name)
+            _sink = factory()
+        return _sink
+
+
+def start_trace(submission_id: Optional[int] = None, language: str = '') -> JudgeTrace:
+    return JudgeTrace(get_metrics_sink(), submission_id=submission_id, language=language)
@@ -5,6 +5,7 @@ import os
 from users.models import CustomUser
 from django.utils.text import slugify
 from django.utils import timezone
+from .languages import LANGUAGES
 
 def validate_txt_file(file):
     ext = os.path.splitext(file.name)[1]
@@ -41,6 +42,15 @@ class Problem(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     slug = models.SlugField(unique=True)
+    # Scheduled visibility: hidden from the archive until then (contest problems until the contest ends)
+    visible_from = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    def is_visible(self, now=None):
+        return self.visible_from is None or self.visible_from <= (now or timezone.now())
+
+    def can_preview(self, user):
+        """Staff and the author see a problem before it is published."""
+        return bool(user and user.is_authenticated and (user.is_staff or self.author_id == user.id))
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -82,10 +92,11 @@ class TestCase(models.Model):
     def __str__(self):
         return f"Testcase {self.name} for {self.problem.title}"
 
-class LanguageChoices(models.TextChoices):
-    PYTHON = 'python', 'Python'
-    JAVA = 'java', 'Java'
-    CPP = 'cpp', 'C++'
+# Built from the judge's language registry so the accepted languages are defined in one place
+LanguageChoices = models.TextChoices(
+    'LanguageChoices',
+    [(language.key.upper(), (language.key, language.label)) for language in LANGUAGES.values()]
+)
 
 
 class Submission(models.Model):
@@ -103,11 +114,7 @@ class Submission(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     problem = models.ForeignKey(Problem, on_delete=models.CASCADE)
     code = models.TextField()
-    language = models.CharField(max_length=30, choices=[
-        ('python', 'Python'),
-        ('java', 'Java'),
-        ('cpp', 'C++')
-    ])
+    language = models.CharField(max_length=30, choices=LanguageChoices.choices)
     status = models.CharField(max_length=30, choices=STATUS_CHOICES, default='pending')
     output = models.TextField(blank=True, null=True)
     verdict = models.TextField(blank=True, null=True)
@@ -115,6 +122,8 @@ class Submission(models.Model):
     memory_used = models.PositiveIntegerField(null=True, blank=True)
     submitted_at = models.DateTimeField(auto_now_add=True)
     evaluated_at = models.DateTimeField(null=True, blank=True)
+    # Set once record_verdict() has counted it, so rejudges are not counted again
+    stats_recorded = models.BooleanField(default=False)
 
     def __str__(self):
         return f"Submission {self.problem.title} by {self.user.username}"
@@ -122,7 +131,9 @@ class Submission(models.Model):
     class Meta:
         ordering = ['-submitted_at']
         indexes = [
-            models.Index(fields=['user', 'problem']),
+            # Keyset pagination of submission history, per user and per user × problem
+            models.Index(fields=['user', '-submitted_at', '-id'], name='submission_user_history_idx'),
+            models.Index(fields=['user', 'problem', '-submitted_at', '-id'], name='submission_user_prob_hist_idx'),
             models.Index(fields=['status']),
         ]
     
@@ -133,4 +144,58 @@ class Submission(models.Model):
 
     def set_evaluated_now(self):
         self.evaluated_at = timezone.now()
-        self.save(update_fields=['evaluated_at'])
\ No newline at end of file
+        self.save(update_fields=['evaluated_at'])
+
+# Aggregates maintained by judge.stats when a verdict is final (rebuild with `manage.py backfill_stats`)
+
+class UserProblemStats(models.Model):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='problem_stats')
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='user_stats')
+    attempts = models.PositiveIntegerField(default=0)
+    best_status = models.CharField(max_length=30, choices=Submission.STATUS_CHOICES)
+    solved = models.BooleanField(default=False)
+    first_solved_at = models.DateTimeField(null=True, blank=True)
+    # Attempts up to and including the first accepted one (ICPC penalty input)
+    attempts_to_solve = models.PositiveIntegerField(null=True, blank=True)
+    last_submitted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'problem'], name='unique_user_problem_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['problem', 'solved']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} on {self.problem_id}: {self.best_status}"
+
+
+class ProblemStats(models.Model):
+    problem = models.OneToOneField(Problem, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    submissions = models.PositiveIntegerField(default=0)
+    accepted = models.PositiveIntegerField(default=0)
+    attempted_users = models.PositiveIntegerField(default=0)
+    solved_users = models.PositiveIntegerField(default=0)
+
+    @property
+    def acceptance_rate(self):
+        return round(self.accepted / self.submissions, 4) if self.submissions else 0.0
+
+    def __str__(self):
+        return f"Stats for problem {self.problem_id}"
+
+
+class LanguageStats(models.Model):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='language_stats')
+    language = models.CharField(max_length=30, choices=LanguageChoices.choices)
+    submissions = models.PositiveIntegerField(default=0)
+    accepted = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'language'], name='unique_user_language_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} in {self.language}"
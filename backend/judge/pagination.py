@@ -0,0 +1,17 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ProblemCursorPagination(CursorPagination):
+    """Keyset pagination over the primary key: constant cost however deep the page."""
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class SubmissionCursorPagination(CursorPagination):
+    """Newest first over (submitted_at, id), backed by the matching composite indexes."""
+    ordering = ('-submitted_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -0,0 +1,159 @@
+"""
+Conformance cases for the Python fork-server runner.
+
+Each case is executed through the plain `python3 <path>` runner and, twice, through
+the fork server; status, stdout, stderr and exit code must match exactly. Running
+the fork server twice also catches state leaking from one forked test to the next.
+"""
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+from .execution_provider import SubprocessExecutionProvider
+from .python_runner import get_python_fork_server
+
+CASES = [
+    {
+        'name': 'sum_of_input',
+        'code': "a, b = map(int, input().split())\nprint(a + b)\n",
+        'input': "2 3\n",
+    },
+    {
+        'name': 'read_until_eof',
+        'code': "import sys\nfor line in sys.stdin:\n    print(line.strip()[::-1])\n",
+        'input': "abc\ndef\n",
+    },
+    {
+        'name': 'buffered_stdin',
+        'code': "import sys\ndata = sys.stdin.buffer.read().split()\nprint(sum(map(int, data)))\n",
+        'input': " ".join(str(i) for i in range(1000)),
+    },
+    {
+        'name': 'no_trailing_newline',
+        'code': "import sys\nsys.stdout.write('partial')\n",
+        'input': "",
+    },
+    {
+        'name': 'interleaved_stderr',
+        'code': "import sys\nprint('out')\nprint('err', file=sys.stderr)\nprint('out2')\n",
+        'input': "",
+    },
+    {
+        'name': 'unicode_output',
+        'code': "print('héllo wörld ✓')\n",
+        'input': "",
+    },
+    {
+        'name': 'dunder_main',
+        'code': "import os, sys\nprint(__name__, os.path.basename(__file__), os.path.basename(sys.argv[0]), len(sys.argv))\n",
+        'input': "",
+    },
+    {
+        'name': 'seeded_random',
+        'code': "import random\nrandom.seed(5)\nprint(random.randint(1, 10**9))\n",
+        'input': "",
+    },
+    {
+        'name': 'no_leaked_module_state',
+        'code': "import math\nprint(hasattr(math, 'judge_leak'))\nmath.judge_leak = True\n",
+        'input': "",
+    },
+    {
+        'name': 'zero_division',
+        'code': "def f(x):\n    return 1 // x\n\nprint('before')\nf(0)\n",
+        'input': "",
+    },
+    {
+        'name': 'syntax_error',
+        'code': "print('unreachable'\n",
+        'input': "",
+    },
+    {
+        'name': 'name_error',
+        'code': "print(undefined_name)\n",
+        'input': "",
+    },
+    {
+        'name': 'recursion_error',
+        'code': "def f(n):\n    return f(n + 1)\n\nf(0)\n",
+        'input': "",
+    },
+    {
+        'name': 'sys_exit_code',
+        'code': "import sys\nprint('bye')\nsys.exit(3)\n",
+        'input': "",
+    },
+    {
+        'name': 'sys_exit_message',
+        'code': "import sys\nsys.exit('fatal')\n",
+        'input': "",
+    },
+    {
+        'name': 'exit_zero',
+        'code': "print('done')\nexit(0)\n",
+        'input': "",
+    },
+    {
+        'name': 'memory_error',
+        'code': "a = [0] * (10 ** 10)\n",
+        'input': "",
+    },
+    {
+        'name': 'output_limit',
+        'code': "print('x' * (2 * 1024 * 1024))\n",
+        'input': "",
+    },
+    {
+        'name': 'infinite_loop',
+        'code': "while True:\n    pass\n",
+        'input': "",
+        'time_limit_ms': 1000,
+    },
+]
+
+COMPARED_FIELDS = ('status', 'stdout', 'stderr', 'exit_code')
+
+
+def run_case(provider: SubprocessExecutionProvider, case: Dict, temp_path: Path) -> Dict:
+    comp_res = provider.compile(case['code'], 'python', temp_path)
+    return provider.execute(
+        run_cmd=comp_res['run_cmd'],
+        input_text=case['input'],
+        time_limit_ms=case.get('time_limit_ms', 2000),
+        memory_limit_mb=256,
+        output_limit_bytes=1024 * 1024,
+        temp_dir=temp_path,
+        runner=comp_res.get('runner')
+    )
+
+
+def fork_server_available() -> bool:
+    """Whether the fork server for the configured Python interpreter starts here."""
+    provider = SubprocessExecutionProvider(python_runner='forkserver')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        run_cmd = provider.compile("", 'python', Path(temp_dir))['run_cmd']
+    return get_python_fork_server(run_cmd[0]).available()
+
+
+def run_conformance() -> List[Dict]:
+    """Returns one entry per mismatching field; an empty list means the runners agree."""
+    plain = SubprocessExecutionProvider(python_runner='plain')
+    forked = SubprocessExecutionProvider(python_runner='forkserver')
+    mismatches = []
+    for case in CASES:
+        # Same directory for both runners so paths in tracebacks line up
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            expected = run_case(plain, case, temp_path)
+            for attempt in (1, 2):
+                actual = run_case(forked, case, temp_path)
+                for field in COMPARED_FIELDS:
+                    if expected.get(field) != actual.get(field):
+                        mismatches.append({
+                            'case': case['name'],
+                            'attempt': attempt,
+                            'field': field,
+                            'plain': expected.get(field),
+                            'forkserver': actual.get(field),
+                        })
+    return mismatches
@@ -0,0 +1,172 @@
+"""
+Fork server for Python submissions.
+
+Run as a standalone script (it must not import Django): keeps one interpreter
+with common stdlib modules already imported and forks a fresh child per test,
+so submissions skip interpreter startup and those imports.
+
+Protocol on a Unix socket, one connection per execution:
+  client -> server: one JSON line {"path", "cwd", "cpu_limit", "memory_limit"}
+                    plus the stdin/stdout/stderr fds (SCM_RIGHTS)
+  server -> client: {"pid": <pid>}            once the child is running
+                    {"status": <wait status>, "maxrss_kb": <int>} when it exits
+
+The child runs the file as a clean `__main__` and exits the way `python3 <path>`
+would, so results are indistinguishable from the subprocess path.
+"""
+import builtins
+import json
+import locale
+import os
+import select
+import signal
+import socket
+import sys
+import traceback
+import types
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Modules competitive-programming submissions import most; loading them once here is the point of the server
+PRELOADED_MODULES = [
+    'array', 'bisect', 'collections', 'copy', 'dataclasses', 'datetime', 'decimal', 'fractions',
+    'functools', 'heapq', 'io', 'itertools', 'json', 'math', 'operator', 'random', 're',
+    'statistics', 'string', 'time', 'typing',
+]
+
+STDIO_FDS = 3
+
+
+def preload():
+    for name in PRELOADED_MODULES:
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+
+
+def run_submission(request):
+    """Runs in the forked child; never returns."""
+    os.chdir(request['cwd'])
+
+    if resource is not None:
+        cpu_limit = request['cpu_limit']
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_limit + 1))
+        resource.setrlimit(resource.RLIMIT_AS, (request['memory_limit'], request['memory_limit']))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+    # Fresh text streams over the received fds, configured like a new interpreter's
+    encoding = locale.getpreferredencoding(False)
+    sys.stdin = sys.__stdin__ = open(0, 'r', encoding=encoding, closefd=False)
+    sys.stdout = sys.__stdout__ = open(1, 'w', encoding=encoding, closefd=False)
+    sys.stderr = sys.__stderr__ = open(2, 'w', encoding=encoding, errors='backslashreplace', buffering=1, closefd=False)
+
+    path = request['path']
+    sys.argv = [path]
+    sys.path[0] = os.path.dirname(path)
+    if 'random' in sys.modules:
+        sys.modules['random'].seed()  # the preloaded generator state is shared by every fork
+
+    # Our own frames sit below the submission's; give them back so recursion depth matches python3
+    depth = 1  # the exec() below
+    frame = sys._getframe()
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    sys.setrecursionlimit(sys.getrecursionlimit() + depth)
+
+    main = types.ModuleType('__main__')
+    main.__file__ = path
+    main.__builtins__ = builtins
+    sys.modules['__main__'] = main
+
+    exit_code = 0
+    try:
+        with open(path, 'rb') as f:
+            source = f.read()
+        exec(compile(source, path, 'exec'), main.__dict__)
+    except SystemExit as e:
+        exit_code = _system_exit_code(e)
+    except BaseException as e:
+        _print_exception(e, path)
+        exit_code = 1
+
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except BaseException:
+        exit_code = 120  # what the interpreter returns when flushing at shutdown fails
+    os._exit(exit_code)
+
+
+def _system_exit_code(e):
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def _print_exception(e, path):
+    # Drop the server's own frames so the traceback starts at the submission, as it would normally
+    tb = e.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename != path:
+        tb = tb.tb_next
+    traceback.print_exception(type(e), e, tb)
+
+
+def handle_connection(conn):
+    """Runs in a per-request handler process: forks the submission and reports how it ended."""
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    header, fds, _, _ = socket.recv_fds(conn, 65536, STDIO_FDS)
+    request = json.loads(header.decode('utf-8'))
+
+    pid = os.fork()
+    if pid == 0:
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+        os.closerange(STDIO_FDS, os.sysconf('SC_OPEN_MAX'))
+        try:
+            run_submission(request)
+        finally:
+            os._exit(1)
+
+    for fd in fds:
+        os.close(fd)
+    conn.sendall(json.dumps({'pid': pid}).encode('utf-8') + b'\n')
+    _, status, usage = os.wait4(pid, 0)
+    conn.sendall(json.dumps({'status': status, 'maxrss_kb': usage.ru_maxrss}).encode('utf-8') + b'\n')
+
+
+def serve(socket_path):
+    preload()
+    # Handler processes are reaped automatically; only they wait on submissions
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(64)
+    print('ready', flush=True)
+
+    while True:
+        readable, _, _ = select.select([server, sys.stdin], [], [])
+        if sys.stdin in readable and not sys.stdin.readline():
+            return  # the judge process that started us has gone away
+        if server not in readable:
+            continue
+        conn, _ = server.accept()
+        if os.fork() == 0:
+            server.close()
+            try:
+                handle_connection(conn)
+            finally:
+                os._exit(0)
+        conn.close()
+
+
+if __name__ == '__main__':
+    serve(sys.argv[1])
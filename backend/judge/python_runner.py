@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+FORKSERVER_SCRIPT = Path(__file__).resolve().parent / 'python_forkserver.py'
+
+
+class PythonForkServer:
+    """
+    Client for python_forkserver.py, a warmed `python3` that forks one child per test.
+
+    The server is started lazily and restarted if it dies. `run()` returns None
+    whenever the server cannot be used so callers can fall back to `python3 <path>`.
+    """
+
+    def __init__(self, interpreter: str = 'python3'):
+        self.interpreter = interpreter
+        self._lock = threading.Lock()
+        self._process = None
+        self._socket_path = None
+        self._disabled = False
+
+    def run(self, path: Path, cwd: Path, input_bytes: bytes, timeout: float, cpu_limit: int, memory_limit: int) -> Optional[Dict[str, Any]]:
+        """
+        Runs `path` in a forked child. Returns stdout/stderr bytes, the exit code (negative
+        for signals, like Popen.returncode), whether the wall-clock timeout fired and the
+        child's peak RSS in KB.
+        """
+        socket_path = self._ensure_started()
+        if socket_path is None:
+            return None
+
+        stdin_r, stdin_w = os.pipe()
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conn.connect(socket_path)
+            header = json.dumps({
+                'path': str(path),
+                'cwd': str(cwd),
+                'cpu_limit': cpu_limit,
+                'memory_limit': memory_limit,
+            }).encode('utf-8') + b'\n'
+            socket.send_fds(conn, [header], [stdin_r, stdout_w, stderr_w])
+        except OSError:
+            conn.close()
+            for fd in (stdin_w, stdout_r, stderr_r):
+                os.close(fd)
+            self.restart()
+            return None
+        finally:
+            # Only the child may hold these ends, otherwise we never see EOF
+            for fd in (stdin_r, stdout_w, stderr_w):
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+
+        stdout_chunks, stderr_chunks = [], []
+        threads = [
+            threading.Thread(target=_write_all, args=(stdin_w, input_bytes), daemon=True),
+            threading.Thread(target=_read_all, args=(stdout_r, stdout_chunks), daemon=True),
+            threading.Thread(target=_read_all, args=(stderr_r, stderr_chunks), daemon=True),
+        ]
+        for t in threads:
+            t.start()
+
+        with conn:
+            replies = _LineReader(conn)
+            started = replies.readline()
+            if not started:
+                return None
+            pid = json.loads(started)['pid']
+
+            timed_out = False
+            conn.settimeout(timeout)
+            try:
+                finished = replies.readline()
+            except socket.timeout:
+                timed_out = True
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                conn.settimeout(None)
+                finished = replies.readline()
+            if not finished:
+                return None
+            result = json.loads(finished)
+
+        for t in threads:
+            t.join()
+        return {
+            'stdout': b''.join(stdout_chunks),
+            'stderr': b''.join(stderr_chunks),
+            'exit_code': os.waitstatus_to_exitcode(result['status']),
+            'timed_out': timed_out,
+            'maxrss_kb': result['maxrss_kb'],
+        }
+
+    def available(self) -> bool:
+        """Starts the server if needed; False when it cannot run here (runs then fall back to plain processes)."""
+        return self._ensure_started() is not None
+
+    def restart(self):
+        with self._lock:
+            self._stop_locked()
+
+    def _ensure_started(self) -> Optional[str]:
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                return self._socket_path
+            if self._disabled:
+                return None
+            self._stop_locked()
+            socket_dir = tempfile.mkdtemp(prefix='judge_forkserver_')
+            self._socket_path = os.path.join(socket_dir, 'server.sock')
+            try:
+                # The server exits when its stdin (held by us) closes
+                self._process = subprocess.Popen(
+                    [self.interpreter, str(FORKSERVER_SCRIPT), self._socket_path],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True
+                )
+                ready = self._process.stdout.readline().strip() == 'ready'
+            except OSError:
+                ready = False
+            if not ready:
+                logger.warning("Python fork server for %s failed to start; falling back to plain processes.", self.interpreter)
+                self._stop_locked()
+                self._disabled = True
+                return None
+            return self._socket_path
+
+    def _stop_locked(self):
+        process, self._process = self._process, None
+        if process is not None:
+            try:
+                process.kill()
+                process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        if self._socket_path:
+            try:
+                os.unlink(self._socket_path)
+                os.rmdir(os.path.dirname(self._socket_path))
+            except OSError:
+                pass
+            self._socket_path = None
+
+
+class _LineReader:
+    """Reads newline-terminated replies; unlike socket.makefile it survives a timeout."""
+
+    def __init__(self, conn: socket.socket):
+        self.conn = conn
+        self.buffer = b''
+
+    def readline(self) -> str:
+        while b'\n' not in self.buffer:
+            chunk = self.conn.recv(4096)
+            if not chunk:
+                return ''
+            self.buffer += chunk
+        line, self.buffer = self.buffer.split(b'\n', 1)
+        return line.decode('utf-8')
+
+
+def _write_all(fd: int, data: bytes):
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    except OSError:
+        pass  # the program exited without reading all of its input
+    finally:
+        os.close(fd)
+
+
+def _read_all(fd: int, chunks: list):
+    try:
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+
+
+_servers = {}
+_server_lock = threading.Lock()
+
+
+def get_python_fork_server(interpreter: str = 'python3') -> PythonForkServer:
+    """The per-process fork server for `interpreter`, shared by every execution provider."""
+    with _server_lock:
+        if interpreter not in _servers:
+            _servers[interpreter] = PythonForkServer(interpreter)
+        return _servers[interpreter]
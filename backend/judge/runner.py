@@ -2,58 +2,84 @@ import threading
 import tempfile
 import json
 from pathlib import Path
+from django.db import transaction
 from django.utils import timezone
 from .models import Submission, TestCase
 from .execution_provider import SubprocessExecutionProvider
+from .languages import get_language
+from .metrics import start_trace
+from .stats import record_verdict
+from backend.metrics import JUDGE_QUEUE_DEPTH, track_sandbox
+from ai_service.error_patterns import classify_error
 from ai_service.services import AIAnalysisService
 
 class SubmissionRunner:
-    def __init__(self):
+    def __init__(self, enrich_errors: bool = True, record_stats: bool = True):
         self.provider = SubprocessExecutionProvider()
+        # When False, CE/RE verdicts the rule-based classifier does not recognise skip the AI report (used by benchmarks)
+        self.enrich_errors = enrich_errors
+        # When False, verdicts stay out of the statistics and leaderboards (used by benchmarks)
+        self.record_stats = record_stats
 
-    def run_submission_sync(self, submission_id: int):
+    def run_submission_sync(self, submission_id: int, queued: bool = False):
+        if queued:
+            JUDGE_QUEUE_DEPTH.dec()
         try:
-            submission = Submission.objects.get(id=submission_id)
+            submission = Submission.objects.select_related('problem').get(id=submission_id)
         except Submission.DoesNotExist:
             return
 
-        submission.status = 'running'
-        submission.save()
-
         problem = submission.problem
         language = submission.language.lower()
         code = submission.code
 
-        test_cases = TestCase.objects.filter(problem=problem)
-        if not test_cases.exists():
+        trace = start_trace(submission_id=submission.id, language=language)
+        trace.record('queue_wait', (timezone.now() - submission.submitted_at).total_seconds() * 1000)
+        try:
+            self._judge(submission, problem, language, code, trace)
+        finally:
+            trace.finish(verdict=submission.status)
+
+    def _judge(self, submission, problem, language, code, trace):
+        submission.status = 'running'
+        submission.save()
+
+        with trace.span('fetch_tests'):
+            test_cases = list(TestCase.objects.filter(problem=problem))
+        if not test_cases:
             submission.status = 'runtime_error'
             submission.output = 'No test cases found for this problem.'
-            submission.save()
+            self._finalize(submission, trace)
             return
 
         all_passed = True
         max_time = 0
         max_mem = 0
         passed_count = 0
-        total_count = test_cases.count()
+        total_count = len(test_cases)
 
         # Create temporary directory for compilation and running
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with trace.span('sandbox_setup'):
+            sandbox = tempfile.TemporaryDirectory()
+        with track_sandbox(), sandbox as temp_dir:
             temp_path = Path(temp_dir)
             
             # Compile
-            comp_res = self.provider.compile(code, language, temp_path)
+            with trace.span('compile'):
+                comp_res = self.provider.compile(code, language, temp_path)
             if not comp_res["success"]:
                 # Compilation Error
                 raw_logs = comp_res.get("error_message", "Compilation Error")
                 submission.status = 'compilation_error'
                 # Generate AI report
                 try:
-                    ai_service = AIAnalysisService()
-                    report = ai_service.generate_error_report(raw_logs, language, is_compile=True)
+                    report = self._error_report(raw_logs, language, True, trace)
+                except Exception:
+                    report = None
+                if report is not None:
                     submission.verdict = json.dumps(report)
                     submission.output = report.get('message', raw_logs)
-                except Exception as e:
+                else:
                     submission.verdict = json.dumps({
                         "status": "CE",
                         "message": "Compilation Error",
@@ -61,33 +87,43 @@ class SubmissionRunner:
                         "suggestion": "Check compiler error messages for details."
                     })
                     submission.output = raw_logs
-                submission.set_evaluated_now()
-                submission.save()
+                self._finalize(submission, trace)
                 return
 
             run_cmd = comp_res["run_cmd"]
+            startup_ms = comp_res.get("startup_overhead_ms", 0)
+            runner = comp_res.get("runner")
+            # Problem limits are per language: slower runtimes get proportionally more
+            lang = get_language(language)
+            time_limit_ms = lang.time_limit_ms(problem.time_limit)
+            memory_limit_mb = lang.memory_limit_mb(problem.memory_limit)
 
             # Run testcases
             for idx, test_case in enumerate(test_cases):
                 # Output limit = 1MB (1024 * 1024 bytes)
-                exec_res = self.provider.execute(
-                    run_cmd=run_cmd,
-                    input_text=test_case.input_text,
-                    time_limit_ms=problem.time_limit,
-                    memory_limit_mb=problem.memory_limit,
-                    output_limit_bytes=1024 * 1024,
-                    temp_dir=temp_path
-                )
+                with trace.span('run', test=idx + 1):
+                    exec_res = self.provider.execute(
+                        run_cmd=run_cmd,
+                        input_text=test_case.input_text,
+                        time_limit_ms=time_limit_ms,
+                        memory_limit_mb=memory_limit_mb,
+                        output_limit_bytes=1024 * 1024,
+                        temp_dir=temp_path,
+                        startup_overhead_ms=startup_ms,
+                        runner=runner
+                    )
 
                 status = exec_res["status"]
                 
                 if status == "success":
                     # Compare output
                     stdout = exec_res["stdout"]
-                    norm_actual = '\n'.join(line.strip() for line in stdout.splitlines() if line.strip())
-                    norm_expected = '\n'.join(line.strip() for line in test_case.output_text.splitlines() if line.strip())
+                    with trace.span('compare', test=idx + 1):
+                        norm_actual = '\n'.join(line.strip() for line in stdout.splitlines() if line.strip())
+                        norm_expected = '\n'.join(line.strip() for line in test_case.output_text.splitlines() if line.strip())
+                        matched = norm_actual == norm_expected
 
-                    if norm_actual == norm_expected:
+                    if matched:
                         passed_count += 1
                         max_time = max(max_time, exec_res["time_taken"])
                         max_mem = max(max_mem, exec_res["memory_used"])
@@ -104,11 +140,13 @@ class SubmissionRunner:
                     # AI-powered Smart Error suggestion
                     if status == "RE":
                         try:
-                            ai_service = AIAnalysisService()
-                            report = ai_service.generate_error_report(raw_logs, language, is_compile=False)
+                            report = self._error_report(raw_logs, language, False, trace, exec_res.get("exit_code"))
+                        except Exception:
+                            report = None
+                        if report is not None:
                             submission.verdict = json.dumps(report)
                             submission.output = report.get('message', raw_logs)
-                        except Exception as e:
+                        else:
                             submission.verdict = json.dumps({
                                 "status": "RE",
                                 "message": "Runtime Error",
@@ -134,7 +172,8 @@ class SubmissionRunner:
                     "passed": passed_count,
                     "total": total_count,
                     "time": f"{max_time}ms",
-                    "memory": f"{max_mem}MB"
+                    "memory": f"{max_mem}MB",
+                    "startup": f"{startup_ms}ms"
                 })
                 submission.output = f"All {total_count} test cases passed."
                 submission.time_taken = max_time
@@ -143,12 +182,28 @@ class SubmissionRunner:
                 submission.time_taken = max_time
                 submission.memory_used = max_mem
                 
+            self._finalize(submission, trace)
+
+    def _error_report(self, raw_logs, language, is_compile, trace, exit_code=None):
+        """A canned report for a recognised error, else Gemini's; None when neither is available."""
+        report = classify_error(raw_logs, language, is_compile, exit_code)
+        if report is not None or not self.enrich_errors:
+            return report
+        with trace.span('ai_enrichment'):
+            return AIAnalysisService().generate_error_report(raw_logs, language, is_compile=is_compile)
+
+    def _finalize(self, submission, trace):
+        # The verdict and the aggregate stats it feeds are committed together
+        with trace.span('save'), transaction.atomic():
             submission.set_evaluated_now()
             submission.save()
+            if self.record_stats:
+                record_verdict(submission)
 
     def run_submission_async(self, submission_id: int):
         # Run asynchronously in background thread for free tier compatibility
-        t = threading.Thread(target=self.run_submission_sync, args=(submission_id,))
+        JUDGE_QUEUE_DEPTH.inc()
+        t = threading.Thread(target=self.run_submission_sync, args=(submission_id, True))
         t.start()
 
     def _map_status_to_db_status(self, status: str) -> str:
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Problem,TestCase,Submission,Topic,LanguageChoices
 from users.models import CustomUser
+from .stats import problem_stats
 
 class TopicSerializer(serializers.ModelSerializer):
     class Meta:
@@ -24,7 +25,7 @@ class ProblemSerializer(serializers.ModelSerializer):
             'topics','topic_names',
             'time_limit','memory_limit',
             'created_at','updated_at',
-            'author',
+            'author', 'visible_from',
         ]
 
     def create(self, validated_data):
@@ -53,6 +54,25 @@ class ProblemSerializer(serializers.ModelSerializer):
                 instance.topics.add(topic)
         return instance
         
+class ProblemListSerializer(serializers.ModelSerializer):
+    """Problem list rows: no description, topics, author and stats joined by the view."""
+    topics = TopicSerializer(many=True, read_only=True)
+    author = serializers.CharField(source='author.username', read_only=True, default=None)
+    solved_count = serializers.SerializerMethodField()
+    acceptance_rate = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Problem
+        fields = ['id', 'slug', 'title', 'difficulty', 'topics', 'author', 'solved_count', 'acceptance_rate']
+
+    def get_solved_count(self, obj):
+        stats = problem_stats(obj)
+        return stats.solved_users if stats else 0
+
+    def get_acceptance_rate(self, obj):
+        stats = problem_stats(obj)
+        return stats.acceptance_rate if stats else 0.0
+
 class TestCaseSerializer(serializers.ModelSerializer):
     class Meta:
         model = TestCase
@@ -86,6 +106,21 @@ class SubmissionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['status', 'verdict', 'time_taken', 'memory_used', 'submitted_at', 'evaluated_at']
 
+class SubmissionListSerializer(serializers.ModelSerializer):
+    """History rows without code, output or verdict; fetch those from the submission detail endpoint."""
+    user = serializers.CharField(source='user.username', read_only=True)
+    problem_title = serializers.CharField(source='problem.title', read_only=True)
+    problem_slug = serializers.CharField(source='problem.slug', read_only=True)
+
+    class Meta:
+        model = Submission
+        fields = [
+            'id', 'user', 'problem', 'problem_title', 'problem_slug',
+            'language', 'status', 'time_taken', 'memory_used',
+            'submitted_at', 'evaluated_at'
+        ]
+        read_only_fields = fields
+
 class SubmissionCreateSerializer(serializers.ModelSerializer):
     language = serializers.ChoiceField(choices=LanguageChoices.choices)
     problem = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_problem, invalidate_problem_list, touch_problems
+from .leaderboard import invalidate_leaderboards
+from .models import Problem, Topic
+
+
+@receiver(post_save, sender=Problem)
+@receiver(post_delete, sender=Problem)
+def problem_changed(sender, instance, **kwargs):
+    invalidate_problem_list()
+    invalidate_problem(instance.slug)
+
+
+@receiver(post_delete, sender=Problem)
+@receiver(post_delete, sender=get_user_model())
+def standings_changed(sender, instance, **kwargs):
+    # Their solves are gone with them; boards only ever add solves, so rebuild them
+    transaction.on_commit(invalidate_leaderboards)
+
+
+@receiver(m2m_changed, sender=Problem.topics.through)
+def problem_topics_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # The m2m rows are not part of the problem row, so bump updated_at to move the description cache on
+    if reverse:
+        # pk_set is None on clear, so collect the problems while the rows still exist
+        if action == 'pre_clear':
+            touch_problems(Problem.objects.filter(topics=instance))
+        elif action in ('post_add', 'post_remove'):
+            touch_problems(Problem.objects.filter(pk__in=pk_set))
+        else:
+            return
+    elif action.startswith('post_'):
+        touch_problems(Problem.objects.filter(pk=instance.pk))
+    else:
+        return
+    invalidate_problem_list()
+
+
+@receiver(post_save, sender=Topic)
+@receiver(pre_delete, sender=Topic)
+def topic_changed(sender, instance, **kwargs):
+    touch_problems(Problem.objects.filter(topics=instance))
+    invalidate_problem_list()
@@ -4,6 +4,7 @@ import uuid
 import shutil
 from pathlib import Path
 from .models import Submission, TestCase
+from .languages import get_language
 
 class SimpleExecutor:
     def execute_submission(self, submission):
@@ -16,67 +17,35 @@ class SimpleExecutor:
         try:
             temp_dir.mkdir(parents=True, exist_ok=True)
             
-            if language == 'python':
-                file_path = temp_dir / 'submission.py'
-                with open(file_path, 'w') as f:
-                    f.write(code)
-                command = ['python3', str(file_path)]
-            
-            elif language == 'java':
-                # Generate a unique class name if not found in code
-                class_name = self._extract_java_class_name(code) or f"Submission_{submission.id}"
-                file_path = temp_dir / f'{class_name}.java'
-                
-                # Write the file (potentially modifying class name)
-                with open(file_path, 'w') as f:
-                    if f"public class {class_name}" not in code:
-                        # Auto-fix the class name if needed
-                        code = self._ensure_java_class_name(code, class_name)
-                    f.write(code)
-                
-                # Compile
+            lang = get_language(language)
+            if lang is None:
+                submission.status = 'error'
+                submission.output = 'Unsupported language'
+                submission.save()
+                return
+
+            class_name = lang.class_name(code)
+            context = lang.context(temp_dir, class_name)
+            with open(temp_dir / lang.source_file(class_name), 'w') as f:
+                f.write(code)
+
+            compile_args = lang.compile_args(context)
+            if compile_args:
                 compile_result = subprocess.run(
-                    ['javac', str(file_path)],
+                    compile_args,
                     cwd=str(temp_dir),
                     capture_output=True,
                     text=True,
-                    timeout=10
-                )
-                
-                if compile_result.returncode != 0:
-                    submission.status = 'compilation_error'
-                    submission.output = compile_result.stderr
-                    submission.save()
-                    return
-                
-                command = ['java', '-cp', str(temp_dir), class_name]
-            
-            elif language == 'cpp':
-                file_path = temp_dir / 'submission.cpp'
-                with open(file_path, 'w') as f:
-                    f.write(code)
-                
-                output_file = temp_dir / 'submission'
-                compile_result = subprocess.run(
-                    ['g++', '-O0', '-std=c++17', str(file_path), '-o', str(output_file)],
-                    capture_output=True,
-                    text=True,
                     timeout=15
                 )
-                
+
                 if compile_result.returncode != 0:
                     submission.status = 'compilation_error'
                     submission.output = compile_result.stderr
                     submission.save()
                     return
-                
-                command = [str(output_file)]
-            
-            else:
-                submission.status = 'error'
-                submission.output = 'Unsupported language'
-                submission.save()
-                return
+
+            command = lang.run_args(context)
 
             # Execute against test cases
             test_cases = TestCase.objects.filter(problem=problem)
@@ -96,7 +65,7 @@ class SimpleExecutor:
                         input=test_case.input_text,
                         capture_output=True,
                         text=True,
-                        timeout=5,  # Execution timeout per test case
+                        timeout=lang.time_limit_ms(5000) / 1000,  # Execution timeout per test case
                         cwd=str(temp_dir)
                     )
                     
@@ -152,29 +121,6 @@ class SimpleExecutor:
         except:
             pass
 
-    def _extract_java_class_name(self, code):
-        """Extract the public class name from Java code"""
-        lines = code.splitlines()
-        for line in lines:
-            line = line.strip()
-            if line.startswith('public class ') and '{' in line:
-                return line.split()[2].split('{')[0].strip()
-        return None
-
-    def _ensure_java_class_name(self, code, new_class_name):
-        """Ensure the code has the correct class name"""
-        lines = code.splitlines()
-        output = []
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith('public class '):
-                # Replace the class name
-                parts = stripped.split()
-                parts[2] = new_class_name.split('{')[0]
-                line = ' '.join(parts) + ' {'
-            output.append(line)
-        return '\n'.join(output)
-
     def _normalize_output(self, text):
         """Normalize output for comparison"""
         return '\n'.join(
@@ -182,11 +128,3 @@ class SimpleExecutor:
             for line in text.splitlines() 
             if line.strip()
         )
-
-    def _get_extension(self, language):
-        """Get file extension for a language"""
-        return {
-            'python': 'py',
-            'java': 'java',
-            'cpp': 'cpp'
-        }.get(language.lower(), 'txt')
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Indexable skip list: a sorted multiset with O(log n) insert, remove, positional
+lookup and bisect. Every link stores its width (how many elements it skips), so
+the position of a key is the sum of the widths walked to reach it.
+"""
+import random
+from typing import Any, Iterator, List, Optional
+
+
+class _End:
+    """Sorts after every key; terminates each level."""
+
+    def __lt__(self, other):
+        return False
+
+    def __le__(self, other):
+        return False
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key: Any, level: int):
+        self.key = key
+        self.next: List[Optional['_Node']] = [None] * level
+        self.width: List[int] = [1] * level
+
+
+class IndexableSkipList:
+    def __init__(self, max_level: int = 24, seed: Optional[int] = None):
+        self.max_level = max_level
+        self._rng = random.Random(seed)
+        self._end = _Node(_End(), 0)
+        self._head = _Node(None, max_level)
+        self._head.next = [self._end] * max_level
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.max_level and self._rng.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, key: Any):
+        chain = [None] * self.max_level
+        steps_at_level = [0] * self.max_level
+        node = self._head
+        for level in reversed(range(self.max_level)):
+            while node.next[level].key <= key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        height = self._random_level()
+        new = _Node(key, height)
+        steps = 0
+        for level in range(height):
+            prev = chain[level]
+            new.next[level] = prev.next[level]
+            prev.next[level] = new
+            new.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(height, self.max_level):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key: Any):
+        chain = [None] * self.max_level
+        node = self._head
+        for level in reversed(range(self.max_level)):
+            while node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is self._end or target.key != key:
+            raise KeyError(key)
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), self.max_level):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def bisect_left(self, key: Any) -> int:
+        """Number of elements strictly less than `key`."""
+        position = 0
+        node = self._head
+        for level in reversed(range(self.max_level)):
+            while node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position
+
+    def _node_at(self, index: int) -> _Node:
+        remaining = index + 1
+        node = self._head
+        for level in reversed(range(self.max_level)):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('skip list index out of range')
+        return self._node_at(index).key
+
+    def islice(self, start: int, stop: int) -> Iterator[Any]:
+        """Keys at positions [start, stop), walking the bottom level after one indexed seek."""
+        start, stop = max(start, 0), min(stop, self._size)
+        if start >= stop:
+            return
+        node = self._node_at(start)
+        for _ in range(stop - start):
+            yield node.key
+            node = node.next[0]
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.islice(0, self._size)
@@ -0,0 +1,141 @@
+"""
+Incrementally maintained submission statistics.
+
+record_verdict() folds one final verdict into UserProblemStats, ProblemStats and
+LanguageStats inside the caller's transaction, so profiles and problem lists read
+a handful of rows instead of aggregating Submission. A first accepted solution
+also moves the user up the global leaderboard once that transaction commits.
+Each submission is counted once (Submission.stats_recorded), so a rejudge that
+changes its verdict leaves the tables as they were; `manage.py backfill_stats`
+rebuilds all three (and the global leaderboard) from the submission history. Run
+it after bulk imports or rejudges.
+"""
+from functools import partial
+from typing import Dict, Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from .leaderboard import record_global_solve
+from .models import LanguageStats, ProblemStats, Submission, UserProblemStats
+
+# Final verdicts from best to worst; pending/running submissions are never counted
+STATUS_RANK = {
+    status: rank for rank, status in enumerate([
+        'accepted',
+        'wrong_answer',
+        'time_limit_exceeded',
+        'memory_limit_exceeded',
+        'output_limit_exceeded',
+        'runtime_error',
+        'compilation_error',
+        'error',
+    ])
+}
+
+
+def is_final(status: str) -> bool:
+    return status in STATUS_RANK
+
+
+def better_status(a: str, b: str) -> str:
+    return a if STATUS_RANK.get(a, len(STATUS_RANK)) <= STATUS_RANK.get(b, len(STATUS_RANK)) else b
+
+
+def _increment(model, lookup: Dict, **deltas):
+    """Adds `deltas` to the row matching `lookup`, creating it on first use."""
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    _, created = model.objects.get_or_create(**lookup, defaults=deltas)
+    if not created:
+        # Lost the race to create it; the row exists now
+        model.objects.filter(**lookup).update(**changes)
+
+
+def record_verdict(submission):
+    """Counts a judged submission once. Call it when its verdict is final; later calls do nothing."""
+    if not is_final(submission.status):
+        return
+    accepted = submission.status == 'accepted'
+
+    with transaction.atomic():
+        # Claiming the flag in the database keeps concurrent rejudges from counting it twice
+        if not Submission.objects.filter(pk=submission.pk, stats_recorded=False).update(stats_recorded=True):
+            return
+        submission.stats_recorded = True
+        # The user × problem row is locked first so concurrent verdicts of one user serialize
+        progress, created = UserProblemStats.objects.select_for_update().get_or_create(
+            user_id=submission.user_id,
+            problem_id=submission.problem_id,
+            defaults={'best_status': submission.status},
+        )
+        first_solve = accepted and not progress.solved
+        progress.attempts += 1
+        progress.best_status = better_status(submission.status, progress.best_status)
+        if first_solve:
+            progress.solved = True
+            progress.first_solved_at = submission.submitted_at
+            progress.attempts_to_solve = progress.attempts
+        if progress.last_submitted_at is None or submission.submitted_at > progress.last_submitted_at:
+            progress.last_submitted_at = submission.submitted_at
+        progress.save()
+
+        _increment(
+            ProblemStats, {'problem_id': submission.problem_id},
+            submissions=1,
+            accepted=int(accepted),
+            attempted_users=int(created),
+            solved_users=int(first_solve),
+        )
+        _increment(
+            LanguageStats, {'user_id': submission.user_id, 'language': submission.language},
+            submissions=1,
+            accepted=int(accepted),
+        )
+
+        if first_solve:
+            transaction.on_commit(partial(
+                record_global_solve, submission.user_id, progress.attempts, submission.problem.difficulty
+            ))
+
+
+def user_progress(user, problem_ids: Iterable[int]) -> Dict[int, str]:
+    """"solved" or "attempted" per problem the user has submitted to, in one query."""
+    rows = UserProblemStats.objects.filter(user=user, problem_id__in=problem_ids).values_list('problem_id', 'solved')
+    return {problem_id: 'solved' if solved else 'attempted' for problem_id, solved in rows}
+
+
+def user_summary(user) -> Dict:
+    """Solve counts (overall and by difficulty) and per-language totals, in two queries."""
+    by_difficulty = (
+        UserProblemStats.objects
+        .filter(user=user)
+        .values('problem__difficulty')
+        .annotate(
+            attempted=Count('id'),
+            solved=Count('id', filter=Q(solved=True)),
+            submissions=Sum('attempts'),
+        )
+    )
+    summary = {'solved': 0, 'attempted': 0, 'submissions': 0, 'accepted': 0, 'solved_by_difficulty': {}}
+    for row in by_difficulty:
+        summary['solved'] += row['solved']
+        summary['attempted'] += row['attempted']
+        summary['submissions'] += row['submissions'] or 0
+        summary['solved_by_difficulty'][row['problem__difficulty']] = row['solved']
+
+    languages = LanguageStats.objects.filter(user=user).order_by('-submissions', 'language')
+    summary['languages'] = [
+        {'language': row.language, 'submissions': row.submissions, 'accepted': row.accepted}
+        for row in languages
+    ]
+    summary['accepted'] = sum(row['accepted'] for row in summary['languages'])
+    return summary
+
+
+def problem_stats(problem) -> Optional[ProblemStats]:
+    try:
+        return problem.stats
+    except ProblemStats.DoesNotExist:
+        return None
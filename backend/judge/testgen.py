@@ -0,0 +1,172 @@
+"""
+Generated test cases, checked against a reference solution.
+
+TestCaseGenerator asks the model for test inputs of every category in one request
+per batch, so one call covers sample, edge, corner, stress and random tests. It
+never trusts the model's outputs: the author's reference solution is compiled
+once and every new input is run through it on a thread pool, and the reference
+output becomes the expected output. Inputs that are malformed, repeat an earlier
+input (including the problem's existing tests), or make the reference solution
+fail are dropped. The rest are inserted with one bulk_create. Batches continue
+until TESTGEN_BATCH_SIZE tests per category were validated or TESTGEN_MAX_BATCHES
+requests were made.
+"""
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from django.conf import settings
+
+from backend.metrics import track_sandbox
+from ai_service.services import AIAnalysisService
+
+from .execution_provider import SubprocessExecutionProvider
+from .languages import get_language
+from .models import TestCase
+
+CATEGORIES = ('sample', 'edge', 'corner', 'stress', 'random')
+
+
+class TestGenerationError(Exception):
+    """The reference solution or the model made generation impossible."""
+
+
+@dataclass
+class GeneratedTest:
+    category: str
+    input_text: str
+    explanation: str = ''
+    output_text: str = ''
+
+
+def normalize_input(value: Any, max_bytes: int) -> Optional[str]:
+    """The input with unix newlines, no trailing spaces and one final newline; None when unusable."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(value)
+    if not isinstance(value, str) or '\x00' in value:
+        return None
+    lines = [line.rstrip() for line in value.replace('\r\n', '\n').replace('\r', '\n').split('\n')]
+    text = '\n'.join(lines).strip('\n')
+    if not text.strip() or len(text.encode('utf-8')) > max_bytes:
+        return None
+    return text + '\n'
+
+
+class TestCaseGenerator:
+    def __init__(self, provider=None, service=None):
+        self.provider = provider or SubprocessExecutionProvider()
+        self.service = service
+        self.per_category = getattr(settings, 'TESTGEN_BATCH_SIZE', 3)
+        self.max_batches = getattr(settings, 'TESTGEN_MAX_BATCHES', 3)
+        self.concurrency = getattr(settings, 'TESTGEN_CONCURRENCY', 4)
+        self.max_input_bytes = getattr(settings, 'TESTGEN_MAX_INPUT_BYTES', 256 * 1024)
+
+    def generate(self, problem, code: str, language: str, categories: Sequence[str] = CATEGORIES,
+                 user=None) -> Dict[str, Any]:
+        """
+        Generates, validates and saves tests for `problem`. Returns the created
+        TestCase rows and how many candidates were dropped and why; raises
+        TestGenerationError when the reference solution does not compile or the
+        model produced nothing.
+        """
+        lang = get_language(language)
+        if lang is None:
+            raise TestGenerationError(f"Unsupported language: {language}")
+        service = self.service or AIAnalysisService()
+        target = self.per_category * len(categories)
+        seen = {
+            text for text in (
+                normalize_input(value, self.max_input_bytes)
+                for value in TestCase.objects.filter(problem=problem).values_list('input_text', flat=True)
+            ) if text
+        }
+        accepted: List[GeneratedTest] = []
+        dropped = {'malformed': 0, 'duplicate': 0, 'rejected': 0}
+        batches = 0
+
+        with track_sandbox(), tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            comp_res = self.provider.compile(code, lang.key, temp_path)
+            if not comp_res["success"]:
+                raise TestGenerationError(
+                    f"Reference solution failed to compile:\n{comp_res.get('error_message', '')}"
+                )
+
+            while len(accepted) < target and batches < self.max_batches:
+                batches += 1
+                response = service.generate_test_inputs(
+                    problem.title, problem.description, list(categories), self.per_category,
+                    batch=batches, known_inputs=sorted(seen),
+                    context={'problem': problem, 'user': user},
+                )
+                candidates = self._candidates(response, categories, seen, dropped)
+                if not candidates:
+                    if response.get('error') and not accepted:
+                        raise TestGenerationError(f"Test generation failed: {response['error']}")
+                    break
+                for test in self._run_reference(candidates, comp_res, lang, problem, temp_path):
+                    if test.output_text:
+                        accepted.append(test)
+                    else:
+                        dropped['rejected'] += 1
+
+        created = TestCase.objects.bulk_create([
+            TestCase(
+                problem=problem,
+                name=f"{problem.slug}_gen_{uuid.uuid4().hex[:8]}",
+                input_text=test.input_text,
+                output_text=test.output_text,
+                is_sample=test.category == 'sample',
+                explanation=test.explanation,
+            )
+            for test in accepted
+        ])
+        return {'created': created, 'dropped': dropped, 'batches': batches}
+
+    def _candidates(self, response: Dict[str, Any], categories: Iterable[str], seen: set,
+                    dropped: Dict[str, int]) -> List[GeneratedTest]:
+        """New, well-formed inputs from one model response; `seen` and `dropped` are updated."""
+        candidates = []
+        for category in categories:
+            items = response.get(category)
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                if isinstance(item, dict):
+                    value, explanation = item.get('input'), item.get('explanation')
+                else:
+                    value, explanation = item, ''
+                text = normalize_input(value, self.max_input_bytes)
+                if text is None:
+                    dropped['malformed'] += 1
+                elif text in seen:
+                    dropped['duplicate'] += 1
+                else:
+                    seen.add(text)
+                    explanation = explanation if isinstance(explanation, str) else ''
+                    candidates.append(GeneratedTest(category, text, explanation))
+        return candidates
+
+    def _run_reference(self, tests: List[GeneratedTest], comp_res: Dict[str, Any], lang, problem,
+                       temp_path: Path) -> List[GeneratedTest]:
+        """Fills in each test's output from the reference solution; left empty when the run failed."""
+        def run(test: GeneratedTest) -> GeneratedTest:
+            exec_res = self.provider.execute(
+                run_cmd=comp_res["run_cmd"],
+                input_text=test.input_text,
+                time_limit_ms=lang.time_limit_ms(problem.time_limit),
+                memory_limit_mb=lang.memory_limit_mb(problem.memory_limit),
+                output_limit_bytes=1024 * 1024,
+                temp_dir=temp_path,
+                startup_overhead_ms=comp_res.get("startup_overhead_ms", 0),
+                runner=comp_res.get("runner"),
+            )
+            if exec_res["status"] == "success" and exec_res["stdout"].strip():
+                test.output_text = exec_res["stdout"]
+            return test
+
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as pool:
+            return list(pool.map(run, tests))
@@ -1,3 +1,14 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from .python_conformance import fork_server_available, run_conformance
+
+
+class PythonForkServerConformanceTest(SimpleTestCase):
+    """The fork-server runner must behave exactly like `python3 <path>` (see judge/python_conformance.py)."""
+
+    def setUp(self):
+        if not fork_server_available():
+            self.skipTest("The Python fork server cannot start here.")
+
+    def test_matches_plain_python(self):
+        self.assertEqual(run_conformance(), [])
@@ -0,0 +1,310 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+from django.conf import settings
+
+from backend.metrics import record_cache
+
+
+def toolchain_cache_dir() -> Path:
+    """Root directory for judge build artifacts shared across submissions."""
+    path = Path(getattr(settings, 'JUDGE_TOOLCHAIN_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'judge_toolchain')))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@lru_cache(maxsize=None)
+def compiler_version(binary: str) -> str:
+    """Returns the first line of `<binary> --version`, or an empty string if unavailable."""
+    try:
+        result = subprocess.run([binary, '--version'], capture_output=True, text=True, timeout=10)
+        output = result.stdout or result.stderr
+        return output.splitlines()[0].strip() if output else ''
+    except Exception:
+        return ''
+
+
+def _digest(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+class PrecompiledHeader:
+    """
+    A precompiled header managed by the judge rather than baked into the image.
+
+    GCC only accepts a .gch built with the same flags it is compiling with, so the
+    header is built into a directory keyed by compiler version + flags and exposed
+    through `-I`. Changing the flag set simply selects (and builds) a new directory.
+    When the .gch is unusable GCC silently falls back to parsing the real header.
+    """
+
+    def __init__(self, compiler: str, flags: List[str], header: str = 'bits/stdc++.h'):
+        self.compiler = compiler
+        self.flags = list(flags)
+        self.header = header
+        self.key = _digest(compiler_version(compiler), ' '.join(self.flags), header)[:16]
+        self.include_dir = toolchain_cache_dir() / 'pch' / self.key
+        self.gch_path = self.include_dir / f"{header}.gch"
+        self._lock = threading.Lock()
+        self._failed = False
+
+    def include_flags(self) -> List[str]:
+        """Flags to append to a compile command so it picks up the PCH (empty if unavailable)."""
+        if self.ensure():
+            return ['-I', str(self.include_dir), '-Winvalid-pch']
+        return []
+
+    def ensure(self) -> bool:
+        if self.gch_path.exists():
+            return True
+        if self._failed:
+            return False
+        with self._lock:
+            if self.gch_path.exists():
+                return True
+            self._failed = not self._build()
+            return not self._failed
+
+    def _locate_header(self) -> Optional[str]:
+        # `-H` prints every header opened; the first line is the one we asked for.
+        result = subprocess.run(
+            [self.compiler, *self.flags, '-x', 'c++', '-E', '-H', '-o', os.devnull, '-'],
+            input=f"#include <{self.header}>\n",
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        for line in result.stderr.splitlines():
+            if line.startswith('. ') and line.endswith(self.header):
+                return line[2:].strip()
+        return None
+
+    def _build(self) -> bool:
+        try:
+            header_path = self._locate_header()
+            if not header_path:
+                return False
+            self.gch_path.parent.mkdir(parents=True, exist_ok=True)
+            # Build next to the final location, then rename so concurrent workers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=str(self.gch_path.parent), suffix='.gch.tmp')
+            os.close(fd)
+            try:
+                result = subprocess.run(
+                    [self.compiler, *self.flags, '-x', 'c++-header', header_path, '-o', tmp_path],
+                    capture_output=True,
+                    text=True,
+                    timeout=120
+                )
+                if result.returncode != 0:
+                    return False
+                os.replace(tmp_path, self.gch_path)
+                return True
+            finally:
+                # Gone after a successful rename; left behind by a failed or timed-out build
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+        except Exception:
+            return False
+
+
+JAVA_SOURCE_DIR = Path(__file__).resolve().parent / 'java'
+
+
+class JavaRuntime:
+    """
+    Launch configuration for submitted Java programs.
+
+    With `use_cds` the JDK classes a typical submission loads are dumped once per
+    JDK + flag set into a class-data sharing archive (see java/JudgeWarmup.java),
+    which removes most of the class loading and verification done at startup.
+    The fixed cost of starting an empty JVM is measured once so it can be
+    reported separately from (and not charged to) the submission.
+    """
+
+    def __init__(self, flags: List[str], use_cds: bool):
+        self.flags = list(flags)
+        self.use_cds = use_cds
+        self.key = _digest(compiler_version('java'), ' '.join(self.flags), str(use_cds))[:16]
+        self.root = toolchain_cache_dir() / 'jvm' / self.key
+        self.archive_path = self.root / 'judge.jsa'
+        self._lock = threading.RLock()
+        self._archive_failed = False
+        self._startup_ms = None
+
+    def extra_flags(self) -> List[str]:
+        """JVM options this runtime adds on top of the language's own flags."""
+        if self.use_cds and self.ensure_archive():
+            return [f"-XX:SharedArchiveFile={self.archive_path}", '-Xshare:auto']
+        return []
+
+    def ensure_archive(self) -> bool:
+        if self.archive_path.exists():
+            return True
+        if self._archive_failed:
+            return False
+        with self._lock:
+            if self.archive_path.exists():
+                return True
+            self._archive_failed = not self._build_archive()
+            return not self._archive_failed
+
+    def startup_overhead_ms(self) -> int:
+        """Wall time of launching and exiting an empty JVM with this configuration."""
+        if self._startup_ms is not None:
+            return self._startup_ms
+        with self._lock:
+            if self._startup_ms is not None:
+                return self._startup_ms
+            marker = self.root / 'startup_ms'
+            try:
+                self._startup_ms = int(marker.read_text())
+                return self._startup_ms
+            except (OSError, ValueError):
+                pass
+            self._startup_ms = self._measure_startup()
+            try:
+                marker.write_text(str(self._startup_ms))
+            except OSError:
+                pass
+            return self._startup_ms
+
+    def _compile_warmup(self) -> bool:
+        if (self.root / 'JudgeWarmup.class').exists():
+            return True
+        self.root.mkdir(parents=True, exist_ok=True)
+        result = subprocess.run(
+            ['javac', '-d', str(self.root), str(JAVA_SOURCE_DIR / 'JudgeWarmup.java')],
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+        return result.returncode == 0
+
+    def _build_archive(self) -> bool:
+        try:
+            if not self._compile_warmup():
+                return False
+            class_list = self.root / 'classes.lst'
+            subprocess.run(
+                ['java', *self.flags, '-Xshare:off', f"-XX:DumpLoadedClassList={class_list}", '-cp', str(self.root), 'JudgeWarmup'],
+                capture_output=True,
+                timeout=60
+            )
+            if not class_list.exists():
+                return False
+            # Dumped without -cp so only JDK classes are archived; any submission classpath stays compatible
+            tmp_path = self.root / f"judge.jsa.{os.getpid()}.tmp"
+            result = subprocess.run(
+                ['java', *self.flags, '-Xshare:dump', f"-XX:SharedClassListFile={class_list}", f"-XX:SharedArchiveFile={tmp_path}"],
+                capture_output=True,
+                timeout=120
+            )
+            if result.returncode != 0 or not tmp_path.exists():
+                return False
+            os.replace(tmp_path, self.archive_path)
+            return True
+        except Exception:
+            return False
+
+    def _measure_startup(self, samples: int = 5) -> int:
+        try:
+            if not self._compile_warmup():
+                return 0
+            cmd = ['java', *self.flags, *self.extra_flags(), '-cp', str(self.root), 'JudgeWarmup', 'noop']
+            timings = []
+            for _ in range(samples):
+                start = time.perf_counter()
+                subprocess.run(cmd, capture_output=True, timeout=30)
+                timings.append(time.perf_counter() - start)
+            # The fastest launch is the best estimate of the fixed cost; noise stays on the user's side
+            return int(min(timings) * 1000)
+        except Exception:
+            return 0
+
+
+_shared_instances = {}
+_shared_instances_lock = threading.Lock()
+
+
+def _shared(factory, *args):
+    key = (factory, *args)
+    with _shared_instances_lock:
+        if key not in _shared_instances:
+            _shared_instances[key] = factory(*args)
+        return _shared_instances[key]
+
+
+def get_precompiled_header(compiler: str, flags: List[str], header: str = 'bits/stdc++.h') -> PrecompiledHeader:
+    """Process-wide PrecompiledHeader for a compiler/flag/header combination."""
+    return _shared(PrecompiledHeader, compiler, tuple(flags), header)
+
+
+def get_java_runtime(flags: List[str], use_cds: bool) -> JavaRuntime:
+    """Process-wide JavaRuntime for a JVM flag set."""
+    return _shared(JavaRuntime, tuple(flags), use_cds)
+
+
+class CompileCache:
+    """
+    ccache-style artifact cache: maps (language, compiler version, flags, source) to the
+    compiled binary so resubmissions of identical code skip the compiler entirely.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.root = toolchain_cache_dir() / 'artifacts'
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries or getattr(settings, 'JUDGE_COMPILE_CACHE_MAX_ENTRIES', 512)
+
+    def key(self, *parts: str) -> str:
+        return _digest(*parts)
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        cached = self.root / key
+        try:
+            shutil.copy2(cached, dest)
+            os.utime(cached)  # keep recently used entries away from eviction
+            hit = True
+        except OSError:
+            hit = False
+        record_cache('compile', hit)
+        return hit
+
+    def store(self, key: str, src: Path):
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=str(self.root), suffix='.tmp')
+            os.close(fd)
+            shutil.copy2(src, tmp_path)
+            os.replace(tmp_path, self.root / key)
+            self._evict()
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+        for path in self.root.iterdir():
+            if path.name.endswith('.tmp'):
+                continue
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue  # evicted by another worker
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_entries]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
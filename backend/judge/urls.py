@@ -9,6 +9,7 @@ urlpatterns = [
     path('problems/<slug:slug>/submit/', views.SubmitToProblemView.as_view(), name='problem-submit'),
     path('problems/<slug:slug>/edit/', views.ProblemUpdateView.as_view(), name='problem-edit'),
     path('problems/<slug:slug>/testcases/', views.ProblemTestCasesView.as_view(), name='problem-testcases'),
+    path('problems/<slug:slug>/testcases/generate/', views.generate_problem_testcases_view, name='problem-testcases-generate'),
     path('testcases/<int:pk>/', views.TestCaseDetailView.as_view(), name='testcase-detail'),
     path('problems/create/', views.ProblemCreateView.as_view(), name='problem-create'),
     path('problems/generate-testcases/', views.generate_testcases_view, name='generate-testcases'),
@@ -17,4 +18,7 @@ urlpatterns = [
     path('users/<str:username>/submissions/', views.UserSubmissionsView.as_view(), name='user-submissions'),
     path('judge/run/', views.JudgeRunView.as_view(), name='judge-run'),
     path('judge/submit/', views.JudgeSubmitView.as_view(), name='judge-submit'),
+    path('leaderboard/', views.LeaderboardView.as_view(), name='leaderboard'),
+    path('leaderboard/<str:username>/', views.LeaderboardRankView.as_view(), name='leaderboard-rank'),
+    path('judge/metrics/', views.judge_metrics_view, name='judge-metrics'),
 ]
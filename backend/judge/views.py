@@ -5,15 +5,29 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, BasePermission, AllowAny
 from .models import Problem, Submission, TestCase
-from .serializers import ProblemSerializer, SubmissionCreateSerializer, SubmissionSerializer, TestCaseSerializer
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from django.contrib.auth import get_user_model
+from .serializers import ProblemSerializer, ProblemListSerializer, SubmissionCreateSerializer, SubmissionListSerializer, SubmissionSerializer, TestCaseSerializer
 import tempfile
 import json
 from pathlib import Path
 from .runner import SubmissionRunner
 from .execution_provider import SubprocessExecutionProvider
+from .languages import LANGUAGES, get_language
+from .metrics import get_metrics_sink
+from django.http import Http404, HttpResponse
+from backend.metrics import metrics_authorized, record_cache, track_sandbox
+from .cache import PROBLEM_DETAIL_TIMEOUT, invalidate_problem, problem_list_timeout, problem_detail_key, problem_etag, problem_list_key, problem_version
+from .pagination import ProblemCursorPagination, SubmissionCursorPagination
+from .stats import user_progress
+from .leaderboard import global_leaderboard, with_usernames
+from users.models import CustomUser
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework.exceptions import NotFound
+import time
 
 
 
@@ -43,21 +57,86 @@ class ProblemUpdateView(generics.RetrieveUpdateAPIView):
     lookup_field = 'slug'
     permission_classes = [AllowAny]
 
+    def get_object(self):
+        problem = super().get_object()
+        # Problems scheduled for later (contest problems) stay hidden from everyone but their author and staff
+        if not problem.is_visible() and not problem.can_preview(self.request.user):
+            raise NotFound()
+        return problem
+
+    def perform_update(self, serializer):
+        old_slug = serializer.instance.slug
+        super().perform_update(serializer)
+        # The save signal covers the current slug; a renamed problem must also drop the old one
+        invalidate_problem(old_slug, serializer.instance.slug)
+
 class ProblemCreateView(generics.CreateAPIView):
     queryset = Problem.objects.all()
     serializer_class = ProblemSerializer
     permission_classes = [IsAuthenticated]
 
 class ProblemBySlugView(generics.RetrieveAPIView):
-    queryset = Problem.objects.all()
+    """
+    Problem description, cached per (slug, updated_at) and revalidated with ETag/If-None-Match.
+
+    On a cold key only one worker renders the problem while the others wait briefly for
+    its result, so a contest start does not send every request to the database.
+    """
+    queryset = Problem.objects.select_related('author').prefetch_related('topics')
     serializer_class = ProblemSerializer
     lookup_field = 'slug'
-    
-    # @method_decorator(cache_page(60*15))  # Cache for 15 minutes
-    def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
     permission_classes = [AllowAny]
 
+    def get(self, request, *args, **kwargs):
+        slug = kwargs['slug']
+        version = problem_version(slug)
+        preview = False
+        if version is None and request.user.is_authenticated:
+            # Unpublished problems are only shown to their author and staff
+            problem = Problem.objects.filter(slug=slug).only('id', 'author_id').first()
+            preview = problem is not None and problem.can_preview(request.user)
+            if preview:
+                version = problem_version(slug, include_hidden=True)
+        if version is None:
+            raise NotFound()
+
+        etag = problem_etag(slug, version)
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (if_none_match.strip() == '*' or etag in parse_etags(if_none_match)):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(self._cached_data(problem_detail_key(slug, version)))
+        response['ETag'] = etag
+        if preview:
+            patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+        else:
+            patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+        return response
+
+    def _cached_data(self, key):
+        data = cache.get(key)
+        record_cache('problem_detail', data is not None)
+        if data is not None:
+            return data
+
+        lock_key = f"{key}:lock"
+        locked = cache.add(lock_key, 1, 10)
+        if not locked:
+            # Another request is rendering this version; give it a moment before doing it ourselves
+            for _ in range(20):
+                time.sleep(0.05)
+                data = cache.get(key)
+                if data is not None:
+                    return data
+        try:
+            data = dict(self.get_serializer(self.get_object()).data)
+            cache.set(key, data, PROBLEM_DETAIL_TIMEOUT)
+        finally:
+            # The lock is the other request's when we gave up waiting for it
+            if locked:
+                cache.delete(lock_key)
+        return data
+
 class SubmitToProblemView(generics.CreateAPIView):
 
     permission_classes = [AllowAny]
@@ -80,6 +159,11 @@ class SubmitToProblemView(generics.CreateAPIView):
                 {'detail': 'Problem not found.'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        if not problem.is_visible() and not problem.can_preview(user):
+            return Response(
+                {'detail': 'Problem not found.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
 
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -110,63 +194,101 @@ class SubmitToProblemView(generics.CreateAPIView):
         runner.run_submission_sync(submission_id)
 
 class SubmissionDetailView(generics.RetrieveAPIView):
+    """
+    One submission with its code. The code of a contest submission is withheld from
+    everyone but its author, staff and the contest's managers until the contest ends.
+    """
     permission_classes = [AllowAny]
-    queryset = Submission.objects.all()
+    queryset = Submission.objects.select_related('user', 'problem', 'contest_entry__contest')
     serializer_class = SubmissionSerializer
 
-class ProblemListView(generics.ListAPIView):
-    queryset = Problem.objects.all()
-    serializer_class = ProblemSerializer
-    permission_classes = [AllowAny]
+    def retrieve(self, request, *args, **kwargs):
+        submission = self.get_object()
+        data = self.get_serializer(submission).data
+        if self._code_hidden(submission, request.user):
+            data = {**data, 'code': None}
+        return Response(data)
 
-class UserProblemSubmissionsView(generics.ListAPIView):
-    serializer_class = SubmissionSerializer
+    def _code_hidden(self, submission, user):
+        try:
+            contest = submission.contest_entry.contest
+        except ObjectDoesNotExist:
+            return False
+        if contest.has_ended() or (user.is_authenticated and user.id == submission.user_id):
+            return False
+        return not contest.can_manage(user)
+
+class ProblemListView(generics.ListAPIView):
+    """
+    Keyset-paginated problem list, filterable by `?difficulty=easy,medium` and `?topic=dp,graphs`.
+
+    Pages are cached without per-user data and shared by every caller; signed-in users get a
+    `status` of "solved", "attempted" or null per row, read from UserProblemStats in one query.
+    Solve counts and acceptance rates come from ProblemStats and may lag by up to
+    PROBLEM_LIST_TIMEOUT. Problems scheduled for later (`visible_from`) are left out until then.
+    """
+    serializer_class = ProblemListSerializer
     permission_classes = [AllowAny]
+    pagination_class = ProblemCursorPagination
 
     def get_queryset(self):
-        problem_slug = self.kwargs['slug']
-        user = self.request.user
-        return Submission.objects.filter(problem__slug=problem_slug, user=user)
+        queryset = (
+            Problem.objects
+            .select_related('author', 'stats')
+            .prefetch_related('topics')
+            .only('id', 'slug', 'title', 'difficulty', 'author__username', 'stats__submissions', 'stats__accepted', 'stats__solved_users')
+            .filter(Q(visible_from__isnull=True) | Q(visible_from__lte=timezone.now()))
+        )
+        difficulty = self.request.query_params.get('difficulty')
+        if difficulty:
+            queryset = queryset.filter(difficulty__in=difficulty.split(','))
+        topic = self.request.query_params.get('topic')
+        if topic:
+            queryset = queryset.filter(topics__name__in=topic.split(',')).distinct()
+        return queryset
 
-    serializer_class = SubmissionSerializer
+    def list(self, request, *args, **kwargs):
+        cache_key = problem_list_key(request.query_params)
+        data = cache.get(cache_key)
+        record_cache('problem_list', data is not None)
+        if data is None:
+            page = super().list(request, *args, **kwargs).data
+            data = {'next': page['next'], 'previous': page['previous'], 'results': list(page['results'])}
+            cache.set(cache_key, data, problem_list_timeout())
+
+        if request.user.is_authenticated:
+            progress = user_progress(request.user, [row['id'] for row in data['results']])
+            data = {**data, 'results': [{**row, 'status': progress.get(row['id'])} for row in data['results']]}
+        return Response(data)
+
+class SubmissionHistoryView(generics.ListAPIView):
+    """Code-free, cursor-paginated submission history; the code is fetched per submission."""
+    serializer_class = SubmissionListSerializer
     permission_classes = [AllowAny]
+    pagination_class = SubmissionCursorPagination
+
+    def get_submissions(self):
+        return (
+            Submission.objects
+            .filter(user__username=self.kwargs['username'])
+            .select_related('user', 'problem')
+            .defer('code', 'output', 'verdict', 'problem__description')
+        )
 
-    def get_queryset(self):
-        
-        User = get_user_model()
-        problem_slug = self.kwargs['slug']
-        username = self.kwargs['username']
-        try:
-            user = User.objects.get(username=username)
-            # You can use user.get_user_info() here if you want to return user info
-            # info = user.get_user_info()
-        except User.DoesNotExist:
-            return Submission.objects.none()
-        return Submission.objects.filter(problem__slug=problem_slug, user=user)
-    
-class UserSubmissionsView(generics.ListAPIView):
-    serializer_class = SubmissionSerializer
-    permission_classes = [AllowAny]
 
+class UserProblemSubmissionsView(SubmissionHistoryView):
     def get_queryset(self):
-        User = get_user_model()
-        # Get the username from the URL parameters
-        username = self.kwargs['username']
-        try:
-            user = User.objects.get(username=username)
-            submissions = Submission.objects.filter(user=user).select_related('problem').order_by('-submitted_at')
-            return submissions
-        except User.DoesNotExist:
-            return Submission.objects.none()
+        return self.get_submissions().filter(problem__slug=self.kwargs['slug'])
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+
+class UserSubmissionsView(SubmissionHistoryView):
+    def get_queryset(self):
+        return self.get_submissions()
 
 
 from rest_framework.decorators import api_view, permission_classes
 from ai_service.services import AIAnalysisService
+from .testgen import CATEGORIES, TestCaseGenerator, TestGenerationError
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -181,6 +303,50 @@ def generate_testcases_view(request):
     return Response(testcases, status=200)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def generate_problem_testcases_view(request, slug):
+    """Generates test cases for an existing problem, with outputs computed by the author's reference solution."""
+    try:
+        problem = Problem.objects.get(slug=slug)
+    except Problem.DoesNotExist:
+        return Response({'error': 'Problem not found'}, status=status.HTTP_404_NOT_FOUND)
+    if not (request.user.is_staff or problem.author == request.user):
+        return Response({'error': 'You are not authorized to add test cases to this problem.'}, status=status.HTTP_403_FORBIDDEN)
+
+    code = request.data.get('code')
+    language = request.data.get('language')
+    categories = request.data.get('categories') or list(CATEGORIES)
+    if not code or not language:
+        return Response({"error": "Reference solution code and language are required."}, status=status.HTTP_400_BAD_REQUEST)
+    if get_language(language) is None:
+        return Response(
+            {"error": f"Unsupported language. Choose one of: {', '.join(LANGUAGES)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not isinstance(categories, list) or not categories or any(category not in CATEGORIES for category in categories):
+        return Response(
+            {"error": f"categories must be a list drawn from: {', '.join(CATEGORIES)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        service = AIAnalysisService()
+    except Exception as e:
+        return Response({"error": f"AI Service Unavailable: {e}"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    try:
+        result = TestCaseGenerator(service=service).generate(
+            problem, code, language, categories=list(dict.fromkeys(categories)), user=request.user
+        )
+    except TestGenerationError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        "created": TestCaseSerializer(result['created'], many=True).data,
+        "dropped": result['dropped'],
+        "batches": result['batches'],
+    }, status=status.HTTP_201_CREATED)
+
+
 class JudgeRunView(APIView):
     permission_classes = [AllowAny]
 
@@ -195,8 +361,15 @@ class JudgeRunView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        lang = get_language(language)
+        if lang is None:
+            return Response(
+                {"error": f"Unsupported language. Choose one of: {', '.join(LANGUAGES)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         provider = SubprocessExecutionProvider()
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with track_sandbox(), tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
             comp_res = provider.compile(code, language, temp_path)
             if not comp_res["success"]:
@@ -209,14 +382,16 @@ class JudgeRunView(APIView):
                 }, status=status.HTTP_200_OK)
 
             run_cmd = comp_res["run_cmd"]
-            # Default limits for custom run: 2000ms, 256MB, 1MB output
+            # Default limits for custom run: 2000ms, 256MB, 1MB output (scaled per language)
             exec_res = provider.execute(
                 run_cmd=run_cmd,
                 input_text=input_text,
-                time_limit_ms=2000,
-                memory_limit_mb=256,
+                time_limit_ms=lang.time_limit_ms(2000),
+                memory_limit_mb=lang.memory_limit_mb(256),
                 output_limit_bytes=1024 * 1024,
-                temp_dir=temp_path
+                temp_dir=temp_path,
+                startup_overhead_ms=comp_res.get("startup_overhead_ms", 0),
+                runner=comp_res.get("runner")
             )
 
             return Response({
@@ -224,6 +399,7 @@ class JudgeRunView(APIView):
                 "stdout": exec_res.get("stdout", ""),
                 "stderr": exec_res.get("stderr", ""),
                 "time_taken": exec_res.get("time_taken", 0),
+                "startup_ms": exec_res.get("startup_ms", 0),
                 "memory_used": exec_res.get("memory_used", 0)
             }, status=status.HTTP_200_OK)
 
@@ -243,6 +419,12 @@ class JudgeSubmitView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if get_language(language) is None:
+            return Response(
+                {"error": f"Unsupported language. Choose one of: {', '.join(LANGUAGES)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         try:
             problem = Problem.objects.get(slug=slug)
         except Problem.DoesNotExist:
@@ -250,13 +432,18 @@ class JudgeSubmitView(APIView):
                 {"error": "Problem not found."},
                 status=status.HTTP_404_NOT_FOUND
             )
+        if not problem.is_visible() and not problem.can_preview(user):
+            return Response(
+                {"error": "Problem not found."},
+                status=status.HTTP_404_NOT_FOUND
+            )
 
         # Create the submission in pending state
         submission = Submission.objects.create(
             user=user,
             problem=problem,
             code=code,
-            language=language,
+            language=language.lower(),
             status='pending'
         )
 
@@ -325,4 +512,47 @@ class TestCaseDetailView(generics.RetrieveUpdateDestroyAPIView):
         super().check_object_permissions(request, obj)
         if not (request.user.is_staff or obj.problem.author == request.user):
             from rest_framework.exceptions import PermissionDenied
-            raise PermissionDenied("You do not have permission to modify this test case.")
\ No newline at end of file
+            raise PermissionDenied("You do not have permission to modify this test case.")
+
+def judge_metrics_view(request):
+    """Prometheus text exposition of judge phase timings (JUDGE_METRICS_SINK='prometheus')."""
+    if not metrics_authorized(request):
+        return HttpResponse(status=401)
+    body = get_metrics_sink().render()
+    if body is None:
+        raise Http404("Judge metrics are not exported by the configured sink.")
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class LeaderboardView(APIView):
+    """Global ranking, `?offset=0&limit=50` (limit at most 200); ranks are shared on ties."""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+            limit = min(max(int(request.query_params.get('limit', 50)), 1), 200)
+        except ValueError:
+            return Response({"error": "offset and limit must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        board = global_leaderboard()
+        return Response({
+            'mode': board.mode,
+            'count': board.size(),
+            'offset': offset,
+            'limit': limit,
+            'results': with_usernames(board.top(offset, limit)),
+        })
+
+
+class LeaderboardRankView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, username):
+        user_id = CustomUser.objects.filter(username=username).values_list('id', flat=True).first()
+        if user_id is None:
+            raise NotFound("User not found")
+        board = global_leaderboard()
+        standing = board.rank(user_id)
+        if standing is None:
+            return Response({'mode': board.mode, 'username': username, 'rank': None})
+        return Response({'mode': board.mode, **with_usernames([standing])[0]})
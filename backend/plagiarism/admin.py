@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import SimilarityMatch
+
+
+@admin.register(SimilarityMatch)
+class SimilarityMatchAdmin(admin.ModelAdmin):
+    list_display = ['id', 'problem', 'submission_a', 'submission_b', 'shared', 'similarity', 'status', 'detected_at']
+    list_filter = ['status', 'syntax', 'detected_at']
+    list_editable = ['status']
+    search_fields = ['problem__title', 'submission_a__user__username', 'submission_b__user__username']
+    raw_id_fields = ['problem', 'submission_a', 'submission_b']
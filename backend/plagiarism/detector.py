@@ -0,0 +1,233 @@
+"""
+Incremental similarity detection over accepted submissions.
+
+Submissions are grouped by problem and syntax (python and pypy share one). For
+each group only submissions without a SubmissionFingerprint are processed: their
+winnowed fingerprints are added to the FingerprintPosting inverted index and then
+looked up in it, so a new submission is only ever compared with submissions that
+share some of its fingerprints, never with the whole group. Fingerprints present
+in a large share of the group (the problem's I/O boilerplate, a common template)
+are ignored: similarity is the share of the smaller submission's distinctive
+fingerprints that the other one also has.
+
+Fingerprinting is CPU-bound and runs in a process pool when `workers` > 1.
+"""
+import logging
+import multiprocessing
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Count, Q
+
+from judge.languages import LANGUAGES
+from judge.models import Submission
+
+from .fingerprint import FAMILY_SYNTAX, fingerprint_many
+from .models import FingerprintPosting, SimilarityMatch, SubmissionFingerprint
+
+logger = logging.getLogger(__name__)
+
+# Fingerprints shared by at most this many submissions are never treated as boilerplate
+COMMON_FLOOR = 10
+# Distinctive fingerprints two submissions must share before they are scored as a pair
+CANDIDATE_MIN_HITS = 3
+
+# Language keys per syntax, e.g. {'python': ['python', 'pypy'], 'c': ['cpp'], ...}
+SYNTAX_LANGUAGES: Dict[str, List[str]] = defaultdict(list)
+for _language in LANGUAGES.values():
+    SYNTAX_LANGUAGES[FAMILY_SYNTAX.get(_language.family, 'c')].append(_language.key)
+
+
+def syntax_of(language: str) -> Optional[str]:
+    for syntax, languages in SYNTAX_LANGUAGES.items():
+        if language in languages:
+            return syntax
+    return None
+
+
+class Detector:
+    def __init__(self, workers: int = 1, k: Optional[int] = None, window: Optional[int] = None,
+                 threshold: Optional[float] = None, min_shared: Optional[int] = None,
+                 common_ratio: Optional[float] = None, chunk_size: int = 64):
+        self.workers = max(1, workers)
+        self.k = k or getattr(settings, 'PLAGIARISM_K', 5)
+        self.window = window or getattr(settings, 'PLAGIARISM_WINDOW', 4)
+        self.threshold = threshold if threshold is not None else getattr(settings, 'PLAGIARISM_THRESHOLD', 0.6)
+        self.min_shared = min_shared if min_shared is not None else getattr(settings, 'PLAGIARISM_MIN_SHARED', 8)
+        self.common_ratio = common_ratio if common_ratio is not None else getattr(settings, 'PLAGIARISM_COMMON_RATIO', 0.1)
+        self.chunk_size = chunk_size
+        self._pool = None
+
+    def run(self, submissions=None) -> Dict:
+        """Processes every pending accepted submission (optionally within a Submission queryset)."""
+        pending = Submission.objects.filter(status='accepted', fingerprint__isnull=True)
+        if submissions is not None:
+            pending = pending.filter(pk__in=submissions.values('pk'))
+
+        groups = set()
+        for problem_id, language in pending.values_list('problem_id', 'language').distinct().order_by():
+            syntax = syntax_of(language)
+            if syntax:
+                groups.add((problem_id, syntax))
+
+        summary = {'groups': 0, 'submissions': 0, 'matches': 0, 'skipped_groups': 0}
+        try:
+            for problem_id, syntax in sorted(groups):
+                result = self.process_group(problem_id, syntax, pending)
+                if result is None:
+                    summary['skipped_groups'] += 1
+                    continue
+                summary['groups'] += 1
+                summary['submissions'] += result['submissions']
+                summary['matches'] += result['matches']
+        finally:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+        return summary
+
+    def process_group(self, problem_id: int, syntax: str, pending=None) -> Optional[Dict]:
+        """Indexes and compares the pending submissions of one problem and syntax; None if another run holds it."""
+        lock_key = f"plagiarism:{problem_id}:{syntax}:lock"
+        if not cache.add(lock_key, 1, 3600):
+            logger.info("Plagiarism group %s/%s is being processed elsewhere", problem_id, syntax)
+            return None
+        try:
+            if pending is None:
+                pending = Submission.objects.filter(status='accepted', fingerprint__isnull=True)
+            new = list(
+                pending
+                .filter(problem_id=problem_id, language__in=SYNTAX_LANGUAGES[syntax])
+                .order_by('id')
+                .values_list('id', 'code')
+            )
+            if not new:
+                return {'submissions': 0, 'matches': 0}
+            prints = self._fingerprint(new, syntax)
+
+            with transaction.atomic():
+                FingerprintPosting.objects.bulk_create(
+                    (
+                        FingerprintPosting(problem_id=problem_id, syntax=syntax, hash=value, submission_id=submission_id)
+                        for submission_id, hashes in prints.items()
+                        for value in hashes
+                    ),
+                    batch_size=2000,
+                )
+                SubmissionFingerprint.objects.bulk_create(
+                    [
+                        SubmissionFingerprint(submission_id=submission_id, problem_id=problem_id, syntax=syntax, fingerprint_count=len(hashes))
+                        for submission_id, hashes in prints.items()
+                    ],
+                    batch_size=1000,
+                )
+                matches = self._compare(problem_id, syntax, prints)
+                SimilarityMatch.objects.bulk_create(matches, batch_size=1000, ignore_conflicts=True)
+            return {'submissions': len(new), 'matches': len(matches)}
+        finally:
+            cache.delete(lock_key)
+
+    def _fingerprint(self, items: List, syntax: str) -> Dict[int, List[int]]:
+        if self.workers == 1 or len(items) < 2 * self.chunk_size:
+            return fingerprint_many(items, syntax, self.k, self.window)
+        if self._pool is None:
+            # Forked workers must not inherit (and later close) the parent's database connections
+            connections.close_all()
+            self._pool = multiprocessing.Pool(self.workers)
+        chunks = [items[start:start + self.chunk_size] for start in range(0, len(items), self.chunk_size)]
+        prints = {}
+        for partial in self._pool.starmap(fingerprint_many, [(chunk, syntax, self.k, self.window) for chunk in chunks]):
+            prints.update(partial)
+        return prints
+
+    def _compare(self, problem_id: int, syntax: str, prints: Dict[int, List[int]]) -> List[SimilarityMatch]:
+        group = FingerprintPosting.objects.filter(problem_id=problem_id, syntax=syntax)
+        postings = self._postings(group, set().union(*prints.values()))
+        group_size = SubmissionFingerprint.objects.filter(problem_id=problem_id, syntax=syntax).count()
+        common = max(COMMON_FLOOR, int(group_size * self.common_ratio))
+
+        # Candidate pairs share a few distinctive fingerprints; only they are scored
+        hits = Counter()
+        for submission_id, values in prints.items():
+            for value in values:
+                posting = postings[value]
+                if len(posting) > common:
+                    continue
+                for other in posting:
+                    # Pairs of two new submissions are counted from the later one only
+                    if other != submission_id and (other not in prints or other < submission_id):
+                        hits[(min(other, submission_id), max(other, submission_id))] += 1
+        candidates = [pair for pair, count in hits.items() if count >= CANDIDATE_MIN_HITS]
+        if not candidates:
+            return []
+
+        involved = {submission_id for pair in candidates for submission_id in pair}
+        owners = dict(Submission.objects.filter(pk__in=involved).values_list('id', 'user_id'))
+        candidates = [(a, b) for a, b in candidates if owners[a] != owners[b]]
+        full = {submission_id: set(values) for submission_id, values in prints.items() if submission_id in involved}
+        old = involved - set(prints)
+        if old:
+            for submission_id, value in group.filter(submission_id__in=old).values_list('submission_id', 'hash').iterator():
+                full.setdefault(submission_id, set()).add(value)
+        sizes = {value: len(posting) for value, posting in postings.items()}
+        unknown = set().union(*full.values()) - set(sizes)
+        sizes.update(self._posting_sizes(group, unknown))
+        distinctive = {
+            submission_id: {value for value in values if sizes.get(value, 0) <= common}
+            for submission_id, values in full.items()
+        }
+
+        matches = []
+        for a, b in candidates:
+            shared = len(distinctive[a] & distinctive[b])
+            similarity = shared / max(1, min(len(distinctive[a]), len(distinctive[b])))
+            if shared >= self.min_shared and similarity >= self.threshold:
+                matches.append(SimilarityMatch(
+                    problem_id=problem_id,
+                    syntax=syntax,
+                    submission_a_id=a,
+                    submission_b_id=b,
+                    shared=shared,
+                    similarity=round(similarity, 4),
+                ))
+        return matches
+
+    def _postings(self, group, hashes) -> Dict[int, List[int]]:
+        postings = defaultdict(list)
+        hashes = sorted(hashes)
+        for start in range(0, len(hashes), 1000):
+            rows = group.filter(hash__in=hashes[start:start + 1000]).values_list('hash', 'submission_id')
+            for value, submission_id in rows.iterator():
+                postings[value].append(submission_id)
+        return postings
+
+    def _posting_sizes(self, group, hashes) -> Dict[int, int]:
+        sizes = {}
+        hashes = sorted(hashes)
+        for start in range(0, len(hashes), 1000):
+            rows = (
+                group.filter(hash__in=hashes[start:start + 1000])
+                .values('hash').annotate(count=Count('id')).order_by()
+                .values_list('hash', 'count')
+            )
+            sizes.update(rows)
+        return sizes
+
+
+def reset(submissions, drop_reviewed: bool = False):
+    """
+    Forgets fingerprints, postings and open matches of a Submission queryset so the
+    next run redoes them. Matches an admin has confirmed or dismissed are kept (the
+    next run finds them again and leaves their status alone) unless `drop_reviewed`.
+    """
+    ids = submissions.values('pk')
+    FingerprintPosting.objects.filter(submission_id__in=ids).delete()
+    SubmissionFingerprint.objects.filter(submission_id__in=ids).delete()
+    matches = SimilarityMatch.objects.filter(Q(submission_a_id__in=ids) | Q(submission_b_id__in=ids))
+    if not drop_reviewed:
+        matches = matches.filter(status='open')
+    matches.delete()
@@ -0,0 +1,105 @@
+"""
+Source normalization and winnowed fingerprints (Schleimer, Wilkerson, Aiken:
+"Winnowing: Local Algorithms for Document Fingerprinting", the MOSS algorithm).
+
+Code is reduced to a token stream in which identifiers become `V`, numbers `N`
+and string/char literals `S`, while keywords and operators are kept; comments and
+whitespace disappear. Renaming variables or reformatting therefore leaves the
+stream unchanged. Every k consecutive tokens are hashed, and from each window of
+w consecutive hashes the minimum is kept, which guarantees that any shared run of
+at least w + k - 1 tokens produces at least one shared fingerprint.
+
+Nothing here touches Django, so fingerprint_many() can run in worker processes.
+"""
+import hashlib
+import keyword
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+C_KEYWORDS = frozenset("""
+    auto bool break case catch char class const constexpr continue default delete do double
+    else enum explicit extern false float for friend goto if inline int long namespace new
+    nullptr operator private protected public register return short signed sizeof static
+    struct switch template this throw true try typedef typename union unsigned using virtual
+    void volatile while include define
+""".split())
+
+JAVA_KEYWORDS = frozenset("""
+    abstract assert boolean break byte case catch char class const continue default do double
+    else enum extends final finally float for goto if implements import instanceof int
+    interface long native new null package private protected public return short static
+    strictfp super switch synchronized this throw throws transient try void volatile while
+    true false var record
+""".split())
+
+PYTHON_KEYWORDS = frozenset(keyword.kwlist) | frozenset(keyword.softkwlist)
+
+_C_LIKE = re.compile(r"""
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+  | (?P<number>\b\d[\w.]*)
+  | (?P<word>[A-Za-z_]\w*)
+  | (?P<op>::|->|\+\+|--|<<=|>>=|<<|>>|<=|>=|==|!=|&&|\|\||[-+*/%&|^!~<>=]=?|[{}()\[\];,.?:#])
+""", re.VERBOSE | re.DOTALL)
+
+_PYTHON = re.compile(r"""
+    (?P<comment>\#[^\n]*)
+  | (?P<string>[rRbBuUfF]{0,2}(?:\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'))
+  | (?P<number>\b\d[\w.]*)
+  | (?P<word>[A-Za-z_]\w*)
+  | (?P<op>\*\*=?|//=?|->|:=|<<=|>>=|<<|>>|<=|>=|==|!=|[-+*/%&|^~<>=@]=?|[{}()\[\];,.:])
+""", re.VERBOSE)
+
+# Comparable languages share a syntax: python and pypy submissions are compared with each other
+SYNTAXES = {
+    'python': (_PYTHON, PYTHON_KEYWORDS),
+    'java': (_C_LIKE, JAVA_KEYWORDS),
+    'c': (_C_LIKE, C_KEYWORDS),
+}
+FAMILY_SYNTAX = {'python': 'python', 'jvm': 'java', 'native': 'c'}
+
+
+def tokenize(code: str, syntax: str) -> List[str]:
+    pattern, keywords = SYNTAXES[syntax]
+    tokens = []
+    for match in pattern.finditer(code):
+        kind = match.lastgroup
+        text = match.group()
+        if kind == 'comment':
+            continue
+        if kind == 'string':
+            tokens.append('S')
+        elif kind == 'number':
+            tokens.append('N')
+        elif kind == 'word':
+            tokens.append(text if text in keywords else 'V')
+        else:
+            tokens.append(text)
+    return tokens
+
+
+def _hash(gram: Sequence[str]) -> int:
+    """Stable across processes (unlike hash()); signed 64-bit to fit a BigIntegerField."""
+    digest = hashlib.blake2b('\x1f'.join(gram).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def winnow(tokens: Sequence[str], k: int, window: int) -> List[int]:
+    """Sorted, de-duplicated fingerprints of a token stream."""
+    if len(tokens) < k:
+        return []
+    hashes = [_hash(tokens[i:i + k]) for i in range(len(tokens) - k + 1)]
+    if len(hashes) <= window:
+        return sorted({min(hashes)})
+
+    # Positions are not needed for candidate search, so each window contributes its minimum value
+    return sorted({min(hashes[start:start + window]) for start in range(len(hashes) - window + 1)})
+
+
+def fingerprint(code: str, syntax: str, k: int = 5, window: int = 4) -> List[int]:
+    return winnow(tokenize(code, syntax), k, window)
+
+
+def fingerprint_many(items: Iterable[Tuple[int, str]], syntax: str, k: int, window: int) -> Dict[int, List[int]]:
+    """{submission id: fingerprints} for a chunk of (id, code) pairs; the unit of work of a process pool."""
+    return {submission_id: fingerprint(code, syntax, k, window) for submission_id, code in items}
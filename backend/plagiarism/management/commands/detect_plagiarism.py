@@ -0,0 +1,58 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from judge.models import Problem, Submission
+from plagiarism.detector import Detector, reset
+
+
+class Command(BaseCommand):
+    help = (
+        "Fingerprints accepted submissions not processed yet and records similar pairs. "
+        "Incremental: rerun it after every contest or on a schedule."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--problem', action='append', default=[], help='Problem slug (repeatable); default: all problems')
+        parser.add_argument('--contest', help='Only submissions made in this contest')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Fingerprinting processes')
+        parser.add_argument('--threshold', type=float, help='Minimum similarity to record (0-1)')
+        parser.add_argument('--min-shared', type=int, help='Minimum shared fingerprints to record')
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Forget previous results in scope and start over; confirmed and dismissed matches are kept'
+        )
+        parser.add_argument(
+            '--drop-reviewed', action='store_true',
+            help='With --rebuild, also delete confirmed and dismissed matches (their review is lost)'
+        )
+
+    def handle(self, *args, **options):
+        submissions = Submission.objects.filter(status='accepted')
+        if options['problem']:
+            problems = Problem.objects.filter(slug__in=options['problem'])
+            missing = set(options['problem']) - set(problems.values_list('slug', flat=True))
+            if missing:
+                raise CommandError(f"Unknown problem(s): {', '.join(sorted(missing))}")
+            submissions = submissions.filter(problem__in=problems)
+        if options['contest']:
+            from contests.models import Contest
+            try:
+                contest = Contest.objects.get(slug=options['contest'])
+            except Contest.DoesNotExist:
+                raise CommandError(f"Unknown contest: {options['contest']}")
+            submissions = submissions.filter(contest_entry__contest=contest)
+
+        if options['drop_reviewed'] and not options['rebuild']:
+            raise CommandError("--drop-reviewed only applies with --rebuild")
+        if options['rebuild']:
+            reset(submissions, drop_reviewed=options['drop_reviewed'])
+
+        detector = Detector(
+            workers=options['workers'],
+            threshold=options['threshold'],
+            min_shared=options['min_shared'],
+        )
+        summary = detector.run(submissions)
+        self.stdout.write(json.dumps(summary, indent=2))
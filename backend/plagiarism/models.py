@@ -0,0 +1,59 @@
+from django.db import models
+from judge.models import Problem, Submission
+
+
+class SubmissionFingerprint(models.Model):
+    """An accepted submission that has been fingerprinted and compared (the incremental watermark)."""
+    submission = models.OneToOneField(Submission, on_delete=models.CASCADE, primary_key=True, related_name='fingerprint')
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='+')
+    syntax = models.CharField(max_length=10)
+    fingerprint_count = models.PositiveIntegerField(default=0)
+    processed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['problem', 'syntax']),
+        ]
+
+
+class FingerprintPosting(models.Model):
+    """Inverted index: one row per (fingerprint hash, submission), scoped to a problem and syntax."""
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='+')
+    syntax = models.CharField(max_length=10)
+    hash = models.BigIntegerField()
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['problem', 'syntax', 'hash'], name='plagiarism_posting_lookup_idx'),
+        ]
+
+
+class SimilarityMatch(models.Model):
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('confirmed', 'Confirmed'),
+        ('dismissed', 'Dismissed'),
+    ]
+
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='similarity_matches')
+    syntax = models.CharField(max_length=10)
+    # submission_a is always the earlier submission
+    submission_a = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='+')
+    submission_b = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='+')
+    shared = models.PositiveIntegerField()
+    similarity = models.FloatField(help_text="Shared fingerprints / fingerprints of the smaller submission")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open')
+    detected_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-similarity']
+        constraints = [
+            models.UniqueConstraint(fields=['submission_a', 'submission_b'], name='unique_similarity_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['problem', '-similarity']),
+        ]
+
+    def __str__(self):
+        return f"{self.submission_a_id} ~ {self.submission_b_id} ({self.similarity:.0%})"
@@ -0,0 +1,17 @@
+from rest_framework import serializers
+from .models import SimilarityMatch
+
+
+class SimilarityMatchSerializer(serializers.ModelSerializer):
+    problem_slug = serializers.CharField(source='problem.slug', read_only=True)
+    user_a = serializers.CharField(source='submission_a.user.username', read_only=True)
+    user_b = serializers.CharField(source='submission_b.user.username', read_only=True)
+
+    class Meta:
+        model = SimilarityMatch
+        fields = [
+            'id', 'problem_slug', 'syntax',
+            'submission_a', 'user_a', 'submission_b', 'user_b',
+            'shared', 'similarity', 'status', 'detected_at',
+        ]
+        read_only_fields = [field for field in fields if field != 'status']
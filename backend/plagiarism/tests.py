@@ -0,0 +1,136 @@
+import json
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from judge.models import Problem, Submission
+from users.models import CustomUser
+
+from .detector import Detector
+from .models import SimilarityMatch
+
+ORIGINAL = '''
+import sys
+
+def solve(values, target):
+    seen = {}
+    for index, value in enumerate(values):
+        wanted = target - value
+        if wanted in seen:
+            return seen[wanted], index
+        seen[value] = index
+    return -1, -1
+
+def main():
+    data = sys.stdin.read().split()
+    count, target = int(data[0]), int(data[1])
+    values = [int(item) for item in data[2:2 + count]]
+    first, second = solve(values, target)
+    if first < 0:
+        print("NO")
+    else:
+        print(first + 1, second + 1)
+
+if __name__ == "__main__":
+    main()
+'''
+
+# The same program with every name changed and comments added
+RENAMED = '''
+import sys
+
+def find_pair(numbers, goal):
+    # remember where each number was
+    positions = {}
+    for i, x in enumerate(numbers):
+        need = goal - x
+        if need in positions:
+            return positions[need], i
+        positions[x] = i
+    return -1, -1
+
+def run():
+    tokens = sys.stdin.read().split()
+    n, goal = int(tokens[0]), int(tokens[1])
+    numbers = [int(t) for t in tokens[2:2 + n]]
+    a, b = find_pair(numbers, goal)
+    if a < 0:
+        print("NO")
+    else:
+        print(a + 1, b + 1)
+
+if __name__ == "__main__":
+    run()
+'''
+
+UNRELATED = '''
+n = int(input())
+total = 0
+while n > 0:
+    total += n % 10
+    n //= 10
+print(total)
+'''
+
+
+class DetectorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.problem = Problem.objects.create(title='Two Sum', description='Find two numbers.', difficulty='easy')
+        self.alice = CustomUser.objects.create_user(username='alice', email='alice@example.com', password='x')
+        self.bob = CustomUser.objects.create_user(username='bob', email='bob@example.com', password='x')
+
+    def accepted(self, user, code, language='python'):
+        submission = Submission.objects.create(user=user, problem=self.problem, code=code, language=language)
+        Submission.objects.filter(pk=submission.pk).update(status='accepted')
+        return submission
+
+    def detect(self, *args):
+        out = StringIO()
+        call_command('detect_plagiarism', '--workers', '1', *args, stdout=out)
+        return json.loads(out.getvalue())
+
+    def test_renamed_copy_is_flagged(self):
+        original = self.accepted(self.alice, ORIGINAL)
+        copy = self.accepted(self.bob, RENAMED)
+        self.accepted(self.bob, UNRELATED)
+
+        Detector().run()
+        match = SimilarityMatch.objects.get()
+        self.assertEqual((match.submission_a_id, match.submission_b_id), (original.id, copy.id))
+        self.assertEqual(match.similarity, 1.0)
+
+    def test_pairs_from_one_user_are_ignored(self):
+        self.accepted(self.alice, ORIGINAL)
+        self.accepted(self.alice, RENAMED)
+
+        Detector().run()
+        self.assertFalse(SimilarityMatch.objects.exists())
+
+    def test_second_run_compares_only_new_submissions(self):
+        self.accepted(self.alice, ORIGINAL)
+        self.accepted(self.bob, RENAMED)
+        self.assertEqual(self.detect()['submissions'], 2)
+
+        summary = self.detect()
+        self.assertEqual((summary['submissions'], summary['matches']), (0, 0))
+        self.assertEqual(SimilarityMatch.objects.count(), 1)
+
+        carol = CustomUser.objects.create_user(username='carol', email='carol@example.com', password='x')
+        self.accepted(carol, ORIGINAL)
+        summary = self.detect()
+        self.assertEqual((summary['submissions'], summary['matches']), (1, 2))
+
+    def test_rebuild_keeps_reviewed_matches(self):
+        self.accepted(self.alice, ORIGINAL)
+        self.accepted(self.bob, RENAMED)
+        self.detect()
+        SimilarityMatch.objects.update(status='confirmed')
+
+        self.assertEqual(self.detect('--rebuild')['submissions'], 2)
+        self.assertEqual(SimilarityMatch.objects.get().status, 'confirmed')
+
+        self.detect('--rebuild', '--drop-reviewed')
+        self.assertEqual(SimilarityMatch.objects.get().status, 'open')
@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('matches/', views.SimilarityMatchListView.as_view(), name='similarity-match-list'),
+    path('matches/<int:pk>/', views.SimilarityMatchDetailView.as_view(), name='similarity-match-detail'),
+]
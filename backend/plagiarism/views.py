@@ -0,0 +1,30 @@
+from rest_framework import generics
+from rest_framework.permissions import IsAdminUser
+
+from .models import SimilarityMatch
+from .serializers import SimilarityMatchSerializer
+
+
+class SimilarityMatchListView(generics.ListAPIView):
+    """Flagged pairs, most similar first; filter with `?problem=<slug>&status=open`."""
+    permission_classes = [IsAdminUser]
+    serializer_class = SimilarityMatchSerializer
+
+    def get_queryset(self):
+        queryset = SimilarityMatch.objects.select_related(
+            'problem', 'submission_a__user', 'submission_b__user'
+        ).defer('submission_a__code', 'submission_b__code', 'problem__description')
+        problem = self.request.query_params.get('problem')
+        if problem:
+            queryset = queryset.filter(problem__slug=problem)
+        match_status = self.request.query_params.get('status')
+        if match_status:
+            queryset = queryset.filter(status=match_status)
+        return queryset
+
+
+class SimilarityMatchDetailView(generics.RetrieveUpdateAPIView):
+    """Review a pair: PATCH {"status": "confirmed" | "dismissed"}."""
+    permission_classes = [IsAdminUser]
+    serializer_class = SimilarityMatchSerializer
+    queryset = SimilarityMatch.objects.select_related('problem', 'submission_a__user', 'submission_b__user')
@@ -10,6 +10,7 @@ from .models import CustomUser
 from django.core.mail import send_mail
 from django.utils.encoding import force_bytes, force_str
 from .utils import send_verification_email
+from judge.stats import user_summary
 from django.contrib.auth import logout
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
@@ -98,6 +99,7 @@ class ProfileAPIView(APIView):
         user = CustomUser.objects.get(username=username)
         user_info = user.get_user_info()
         user_info["is_author"] = user.is_author
+        user_info["stats"] = user_summary(user)
         return Response(user_info)
     
     def put(self, request, username):
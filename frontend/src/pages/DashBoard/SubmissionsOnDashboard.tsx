@@ -1,7 +1,7 @@
 import { useState, useEffect } from "react";
 import {
   submissionService,
-  type Submission,
+  type SubmissionSummary,
 } from "@/services/submissionService";
 import {
   Table,
@@ -26,7 +26,7 @@ export default function SubmissionsOnDashboard({
   username,
   limit,
 }: SubmissionsOnDashboardProps) {
-  const [submissions, setSubmissions] = useState<Submission[]>([]);
+  const [submissions, setSubmissions] = useState<SubmissionSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const navigate = useNavigate();
@@ -41,13 +41,11 @@ export default function SubmissionsOnDashboard({
           setLoading(false);
           return;
         }
-        const response = (await submissionService.getUserSubmissions(
-          username
-        )) as Submission[];
-        const limitedSubmissions = limit
-          ? response.slice(0, limit)
-          : response;
-        setSubmissions(limitedSubmissions);
+        const response = await submissionService.getUserSubmissions(
+          username,
+          limit
+        );
+        setSubmissions(response);
         setError(null);
       } catch (err) {
         setError("Failed to fetch submission history");
@@ -10,7 +10,7 @@ import { Badge } from "@/components/ui/badge";
 import { useAppSelector } from "@/redux/hook";
 import {
   problemService,
-  type Problem,
+  type ProblemListItem,
   type Topic,
 } from "@/services/problemService";
 import { useEffect, useState } from "react";
@@ -22,8 +22,8 @@ import { Search, SlidersHorizontal, Loader2 } from "lucide-react";
 import { motion } from "framer-motion";
 
 export default function AllProblemPage() {
-  const [problems, setProblems] = useState<Problem[]>([]);
-  const [filtered, setFiltered] = useState<Problem[]>([]);
+  const [problems, setProblems] = useState<ProblemListItem[]>([]);
+  const [filtered, setFiltered] = useState<ProblemListItem[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [search, setSearch] = useState("");
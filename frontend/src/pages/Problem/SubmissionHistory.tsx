@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { submissionService, type Submission } from '@/services/submissionService';
+import { submissionService, type SubmissionSummary } from '@/services/submissionService';
 import {
   Table,
   TableBody,
@@ -20,7 +20,7 @@ interface SubmissionHistoryProps {
 }
 
 export default function SubmissionHistory({ problemSlug, username }: SubmissionHistoryProps) {
-  const [submissions, setSubmissions] = useState<Submission[]>([]);
+  const [submissions, setSubmissions] = useState<SubmissionSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const navigate = useNavigate();
@@ -35,7 +35,7 @@ export default function SubmissionHistory({ problemSlug, username }: SubmissionH
           setLoading(false);
           return;
         }
-        const response = await submissionService.getUserSubmissionsByUsername(problemSlug, username) as Submission[];
+        const response = await submissionService.getUserSubmissionsByUsername(problemSlug, username);
         setSubmissions(response);
         setError(null);
       } catch (err) {
@@ -28,6 +28,25 @@ export interface Problem {
     updated_at: string;
 }
 
+// Row of the paginated problem list; `status` is only present for signed-in users
+export interface ProblemListItem {
+    id: number;
+    slug: string;
+    title: string;
+    difficulty: string;
+    topics: Topic[];
+    author: string | null;
+    solved_count: number;
+    acceptance_rate: number;
+    status?: 'solved' | 'attempted' | null;
+}
+
+interface CursorPage<T> {
+    next: string | null;
+    previous: string | null;
+    results: T[];
+}
+
 const API_URL = import.meta.env.VITE_API_URL;
 
 function getHeaders(token?: string) {
@@ -56,13 +75,20 @@ async function handleResponse<T>(response: Response): Promise<T> {
 }
 
 export const problemService = {
-    // Get all problems
-    async getAllProblems(token?: string): Promise<Problem[]> {
-        const response = await fetch(`${API_URL}/api/problems/`, {
-            method: 'GET',
-            headers: getHeaders(token),
-        });
-        return handleResponse<Problem[]>(response);
+    // Get all problems, following the cursor pages
+    async getAllProblems(token?: string): Promise<ProblemListItem[]> {
+        const problems: ProblemListItem[] = [];
+        let url: string | null = `${API_URL}/api/problems/?page_size=200`;
+        while (url) {
+            const response = await fetch(url, {
+                method: 'GET',
+                headers: getHeaders(token),
+            });
+            const page: CursorPage<ProblemListItem> = await handleResponse<CursorPage<ProblemListItem>>(response);
+            problems.push(...page.results);
+            url = page.next;
+        }
+        return problems;
     },
 
     // Get a single problem by slug
@@ -18,6 +18,30 @@ export interface Submission {
   problem_title?: string;
 }
 
+// Row of the paginated submission history; code, output and verdict come from getSubmissionById
+export type SubmissionSummary = Omit<Submission, "code" | "verdict" | "output"> & {
+  problem_slug: string;
+};
+
+interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+// Follows the cursor pages of a history endpoint until `limit` rows (or the end) are reached
+async function fetchHistory(endpoint: string, limit?: number): Promise<SubmissionSummary[]> {
+  const token = localStorage.getItem("authToken");
+  const rows: SubmissionSummary[] = [];
+  let next: string | null = limit ? `${endpoint}?page_size=${Math.min(limit, 100)}` : `${endpoint}?page_size=100`;
+  while (next && (!limit || rows.length < limit)) {
+    const page = (await api.get(next, token || undefined)) as CursorPage<SubmissionSummary>;
+    rows.push(...page.results);
+    next = page.next ? new URL(page.next).pathname + new URL(page.next).search : null;
+  }
+  return limit ? rows.slice(0, limit) : rows;
+}
+
 export const submissionService = {
   // Submit code for a problem (by username)
   submitCode: async (
@@ -45,16 +69,11 @@ export const submissionService = {
     problemSlug: string,
     username?: string
   ) => {
-    const token = localStorage.getItem("authToken");
-    return api.get(
-      `/api/problems/${problemSlug}/submissions/${username}/`,
-      token || undefined
-    );
+    return fetchHistory(`/api/problems/${problemSlug}/submissions/${username}/`);
   },
 
-  getUserSubmissions: async (username: string) => {
-    const token = localStorage.getItem("authToken");
-    return api.get(`/api/users/${username}/submissions/`, token || undefined);
+  getUserSubmissions: async (username: string, limit?: number) => {
+    return fetchHistory(`/api/users/${username}/submissions/`, limit);
   },
 
   getSubmissionById: async (submissionId: number) => {